@@ -1,18 +1,46 @@
+import numpy as np
 import yt_dlp
-from telegram import Update
+from telegram import (
+    Bot,
+    InlineQueryResultArticle,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+    MessageEntity,
+    Update,
+)
+from telegram.error import BadRequest, Forbidden, RetryAfter
 from telegram.ext import (
+    Application,
     ApplicationBuilder,
     CommandHandler,
+    InlineQueryHandler,
     MessageHandler,
     filters,
     ContextTypes,
 )
 from datetime import datetime, timedelta
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import re
 import os
+import math
+import html
+import heapq
+import bisect
+import struct
+import json
+import time
+import queue
+import sqlite3
 import logging
+import threading
+import statistics
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, fields
 from functools import wraps
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 import asyncio
 
 # ================================
@@ -29,9 +57,96 @@ class Config:
     MAX_DESCRIPTION_LENGTH = 400
     MAX_TAGS_DISPLAY = 8
     CACHE_EXPIRY_MINUTES = 30
+    CACHE_MAX_ENTRIES = 1024
+    METADATA_DB_PATH = os.getenv("METADATA_DB_PATH", "youtube_stats.db")
+    METADATA_SOFT_TTL_MINUTES = CACHE_EXPIRY_MINUTES
+    METADATA_HARD_TTL_HOURS = 7 * 24
+    # Count history behind the report's recent-velocity figures
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "youtube_stats_snapshots.bin")
+    SNAPSHOT_RETENTION_DAYS = 90
+    SNAPSHOT_MIN_INTERVAL = 60
+    SNAPSHOT_MIN_SPAN = 5 * 60
+    # Expired snapshots are dropped from memory this often while running
+    SNAPSHOT_PRUNE_INTERVAL = 3600
+    # /watch refreshes: at most WATCH_BATCH_SIZE extractions per tick
+    WATCH_DB_PATH = os.getenv("WATCH_DB_PATH", METADATA_DB_PATH)
+    WATCH_MAX_PER_CHAT = 20
+    WATCH_TICK_SECONDS = 60
+    WATCH_BATCH_SIZE = 10
+    WATCH_CONCURRENCY = 2
+    WATCH_MIN_INTERVAL = 10 * 60
+    WATCH_MAX_INTERVAL = 24 * 3600
+    WATCH_GROWTH_STEP = 0.02
+    # A claimed video comes due again if its refresh never finishes
+    WATCH_CLAIM_LEASE = 10 * 60
+    # "memory" for a single process, "sqlite" to share state between
+    # several bot processes pointed at the same STATE_DB_PATH
+    STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+    STATE_DB_PATH = os.getenv("STATE_DB_PATH", "youtube_stats_state.db")
+    EXTRACTION_LOCK_SECONDS = 60
+    PEER_POLL_INTERVAL = 0.25
+    # Local Prometheus endpoint (9464 stays clear of Prometheus' own 9090);
+    # set METRICS_PORT=0 to disable it
+    METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
     RATE_LIMIT_SECONDS = 3
+    RATE_LIMIT_BURST = 2
+    EXTRACTION_WORKERS = 4
+    EXTRACTION_EXECUTOR = "thread"  # "thread" or "process"
+    EXTRACTION_QUEUE_SIZE = 32
+    EXTRACTION_QUEUE_TIMEOUT = 30
+    SCHEDULER_MAX_PER_USER = 2
+    QUEUE_STATUS_INTERVAL = 2
+    # Outbound Bot API pacing (Telegram allows ~30 msg/s, ~20 msg/min per group)
+    SEND_GLOBAL_RATE = 28
+    SEND_GLOBAL_BURST = 10
+    SEND_CHAT_RATE = 1
+    SEND_GROUP_RATE = 20 / 60
+    SEND_CHAT_BURST = 3
+    SEND_MAX_ATTEMPTS = 5
+    # Cached videos are answered directly, without a processing message
+    SKIP_PROCESSING_ON_CACHE_HIT = True
+    # Inline mode: Telegram discards answers after ~10s, so stop waiting early
+    INLINE_DEADLINE_SECONDS = 6
+    # How long Telegram reuses an inline answer for the same query, for all users
+    INLINE_CACHE_TIME = CACHE_EXPIRY_MINUTES * 60
+    # "loading" and error answers must expire quickly so the next query retries
+    INLINE_RETRY_CACHE_TIME = 1
+    # Reply with the thumbnail photo, captioned by the report
+    PHOTO_REPORTS = os.getenv("PHOTO_REPORTS", "0") == "1"
+    CAPTION_LIMIT = 1024
+    MESSAGE_LIMIT = 4096
+    YDL_RECYCLE_AFTER = 200
+    EXTRACTION_PROFILE = "stats"  # "stats" (metadata only) or "full"
+    CONCURRENT_UPDATES = 256
+    MAX_LINKS_PER_MESSAGE = 10
+    MAX_CONCURRENT_LINKS = 3
+    PLAYLIST_MAX_VIDEOS = 1000
+    PLAYLIST_BATCH_SIZE = 8
+    PLAYLIST_TOP_N = 5
+    PLAYLIST_PROGRESS_INTERVAL = 3
+    COMPARE_MAX_VIDEOS = 50
+    COMPARE_CONCURRENCY = 8
+    # Extraction circuit breaker: opens when at least BREAKER_FAILURE_THRESHOLD
+    # calls in the window, and BREAKER_FAILURE_RATIO of them, were throttled
+    BREAKER_WINDOW_SECONDS = 60
+    BREAKER_FAILURE_THRESHOLD = 5
+    BREAKER_FAILURE_RATIO = 0.5
+    BREAKER_OPEN_SECONDS = 30
+    BREAKER_MAX_OPEN_SECONDS = 15 * 60
+    BREAKER_PROBES = 1
     LOG_LEVEL = logging.INFO
 
+    # Serving mode: "polling" or "webhook"
+    BOT_MODE = os.getenv("BOT_MODE", "polling")
+    # Public HTTPS base URL Telegram posts to, e.g. https://bot.example.com
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+    WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
 
 # ================================
 # LOGGING SETUP
@@ -62,6 +177,19 @@ class NumberFormatter:
             return f"{num / 1_000:.1f}K"
         return str(num)
 
+    @staticmethod
+    def parse_large(text: str) -> Optional[int]:
+        """Parse '2500', '250K', '1.5M' or '2B' into an integer"""
+        match = re.fullmatch(r"([\d.,]+)\s*([kmb]?)", text.strip().lower())
+        if not match:
+            return None
+        try:
+            value = float(match.group(1).replace(",", ""))
+        except ValueError:
+            return None
+        multiplier = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+        return int(value * multiplier[match.group(2)])
+
     @staticmethod
     def format_with_commas(num: int) -> str:
         """Format number with thousand separators"""
@@ -180,6 +308,78 @@ class VideoAnalyzer:
         else:
             return "E (Below Average)"
 
+    # Array counterparts of the methods above for ranking many videos in one
+    # pass; element i equals the scalar method applied to video i
+
+    QUALITY_THRESHOLDS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+    QUALITY_BADGES = (
+        "🌟 NEW CONTENT 🌟",
+        "🌱 GROWING 🌱",
+        "📈 RISING STAR 📈",
+        "🔥 TRENDING HOT 🔥",
+        "⭐ PLATINUM HIT ⭐",
+        "💎 DIAMOND STATUS 💎",
+        "🏆 MEGA VIRAL 🏆",
+    )
+    GRADE_THRESHOLDS = (1, 3, 5, 7, 10)
+    GRADES = (
+        "E (Below Average)",
+        "D (Average)",
+        "C (Good)",
+        "B (Very Good)",
+        "A (Excellent)",
+        "S+ (Outstanding)",
+    )
+
+    @classmethod
+    def get_quality_badge_array(cls, views: np.ndarray) -> list[str]:
+        """get_quality_badge for each element of views"""
+        tiers = np.searchsorted(cls.QUALITY_THRESHOLDS, views, side="right")
+        return [cls.QUALITY_BADGES[tier] for tier in tiers]
+
+    @staticmethod
+    def calculate_engagement_rate_array(
+        likes: np.ndarray, comments: np.ndarray, views: np.ndarray
+    ) -> np.ndarray:
+        """calculate_engagement_rate for each element; 0.0 where views is 0"""
+        rates = np.zeros(len(views))
+        np.divide(likes + comments, views, out=rates, where=views != 0)
+        return rates * 100
+
+    @staticmethod
+    def calculate_like_percentage_array(
+        likes: np.ndarray, views: np.ndarray
+    ) -> np.ndarray:
+        """calculate_like_percentage for each element; 0.0 where views is 0"""
+        percentages = np.zeros(len(views))
+        np.divide(likes, views, out=percentages, where=views != 0)
+        return percentages * 100
+
+    @staticmethod
+    def calculate_views_per_day_array(
+        views: np.ndarray, upload_dates: list[str]
+    ) -> np.ndarray:
+        """calculate_views_per_day for each element; NaN where it returns None"""
+        dates = np.full(len(upload_dates), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, upload_date in enumerate(upload_dates):
+            try:
+                dates[i] = datetime.strptime(upload_date, "%Y%m%d").date()
+            except (TypeError, ValueError):
+                pass
+
+        valid = ~np.isnat(dates)
+        today = np.datetime64(datetime.now().date(), "D")
+        days_ago = np.maximum((today - dates).astype(np.int64), 1)
+        per_day = np.full(len(views), np.nan)
+        np.divide(views, days_ago, out=per_day, where=valid)
+        return per_day
+
+    @classmethod
+    def get_performance_grade_array(cls, engagement_rates: np.ndarray) -> list[str]:
+        """get_performance_grade for each element of engagement_rates"""
+        grades = np.searchsorted(cls.GRADE_THRESHOLDS, engagement_rates, side="right")
+        return [cls.GRADES[grade] for grade in grades]
+
 
 class VisualElements:
     """Create visual elements for messages"""
@@ -207,15 +407,68 @@ class URLValidator:
     """Validate YouTube URLs"""
 
     YOUTUBE_REGEX = r"(https?://)?(www\.)?(youtube\.com|youtu\.be)/.+"
+    YOUTUBE_URL_PATTERN = re.compile(
+        r"(?:https?://)?(?:www\.|m\.)?(?:youtube\.com|youtu\.be)/[^\s<>\"']+"
+    )
 
     @classmethod
     def is_valid_youtube_url(cls, url: str) -> bool:
         """Check if URL is a valid YouTube link"""
         return bool(re.match(cls.YOUTUBE_REGEX, url))
 
+    @classmethod
+    def find_youtube_urls(
+        cls,
+        text: str,
+        extra_urls: Optional[list[str]] = None,
+        limit: int = Config.MAX_LINKS_PER_MESSAGE,
+    ) -> list[str]:
+        """Find distinct YouTube links in text, deduplicated by video ID"""
+        # Drop sentence punctuation that the pattern swallows at the end
+        candidates = [
+            match.rstrip(".,!?;:)]}")
+            for match in cls.YOUTUBE_URL_PATTERN.findall(text or "")
+        ]
+        candidates += [u for u in extra_urls or [] if cls.is_valid_youtube_url(u)]
+
+        urls = []
+        seen = set()
+        for url in candidates:
+            key = cls.extract_video_id(url) or url
+            if key in seen:
+                continue
+            seen.add(key)
+            urls.append(url)
+            if len(urls) >= limit:
+                break
+        return urls
+
+    COLLECTION_PATTERN = re.compile(
+        r"youtube\.com/(?:playlist\?(?:[^#\s]*&)?list=(?P<playlist>[\w-]+)"
+        r"|(?P<channel>@[\w.-]+|channel/[\w-]+|c/[\w.-]+|user/[\w.-]+))"
+    )
+
     @staticmethod
-    def extract_video_id(url: str) -> Optional[str]:
+    def canonical_url(video_id: str) -> str:
+        """Build the canonical watch URL for a video ID"""
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    @classmethod
+    def collection_url(cls, url: str) -> Optional[str]:
+        """Canonical playlist / channel uploads URL, or None for other links"""
+        match = cls.COLLECTION_PATTERN.search(url)
+        if not match:
+            return None
+        if match.group("playlist"):
+            return f"https://www.youtube.com/playlist?list={match.group('playlist')}"
+        return f"https://www.youtube.com/{match.group('channel')}/videos"
+
+    @classmethod
+    def extract_video_id(cls, url: str) -> Optional[str]:
         """Extract video ID from YouTube URL"""
+        if cls.collection_url(url):
+            return None
+
         patterns = [
             r"(?:v=|\/)([0-9A-Za-z_-]{11}).*",
             r"(?:embed\/)([0-9A-Za-z_-]{11})",
@@ -229,474 +482,3009 @@ class URLValidator:
 
 
 # ================================
-# RATE LIMITING
+# METRICS
 # ================================
 
 
-class RateLimiter:
-    """Simple rate limiter to prevent spam"""
+class Histogram:
+    """Fixed-bucket latency histogram (seconds)"""
 
-    def __init__(self):
-        self.user_timestamps: Dict[int, datetime] = {}
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
 
-    def is_allowed(
-        self, user_id: int, cooldown_seconds: int = Config.RATE_LIMIT_SECONDS
-    ) -> tuple[bool, int]:
-        """Check if user is allowed to make request"""
-        now = datetime.now()
+    __slots__ = ("counts", "sum", "count")
 
-        if user_id in self.user_timestamps:
-            time_diff = (now - self.user_timestamps[user_id]).total_seconds()
-            if time_diff < cooldown_seconds:
-                wait_time = int(cooldown_seconds - time_diff)
-                return False, wait_time
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
 
-        self.user_timestamps[user_id] = now
-        return True, 0
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
 
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing the q-th quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
 
-rate_limiter = RateLimiter()
 
+class Metrics:
+    """Counters, histograms and gauges with Prometheus text exposition"""
 
-def rate_limit(func):
-    """Decorator for rate limiting"""
+    def __init__(self):
+        self.started = time.time()
+        self._counters: Dict[tuple, float] = {}
+        self._histograms: Dict[tuple, Histogram] = {}
+        # name -> (Prometheus type, callable sampled at export time)
+        self._sampled: Dict[str, tuple[str, Any]] = {}
 
-    @wraps(func)
-    async def wrapper(
-        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
-    ):
-        user_id = update.effective_user.id
-        allowed, wait_time = rate_limiter.is_allowed(user_id)
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> tuple:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
 
-        if not allowed:
-            await update.message.reply_text(
-                f"⏳ <b>Slow down!</b>\n\n"
-                f"Please wait <b>{wait_time}</b> seconds before next request.\n\n"
-                f"<i>This prevents spam and ensures smooth operation for everyone! 😊</i>",
-                parse_mode="HTML",
-            )
-            return
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
 
-        return await func(update, context, *args, **kwargs)
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
 
-    return wrapper
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of the with-block into histogram name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
 
+    def gauge(self, name: str, func):
+        """Register a callable sampled at export time"""
+        self._sampled[name] = ("gauge", func)
 
-# ================================
-# MESSAGE TEMPLATES
-# ================================
+    def sampled_counter(self, name: str, func):
+        """Register a callable returning a running total, exported as a counter"""
+        self._sampled[name] = ("counter", func)
 
+    def counter_total(self, name: str) -> float:
+        return sum(v for (n, _), v in self._counters.items() if n == name)
 
-class MessageTemplates:
-    """Pre-formatted message templates"""
+    def counters_by_label(self, name: str, label: str) -> Dict[str, float]:
+        result = {}
+        for (n, labels), value in self._counters.items():
+            if n == name:
+                result[dict(labels).get(label, "")] = value
+        return result
 
-    @staticmethod
-    def welcome_message() -> str:
-        return (
-            "🎬═══════════════════════🎬\n"
-            "┏━━━━━━━━━━━━━━━━━━━━━━┓\n"
-            "┃  🌟 <b>YOUTUBE ANALYZER</b> 🌟  ┃\n"
-            "┃     〰️ PRO EDITION v3.0 〰️    ┃\n"
-            "┗━━━━━━━━━━━━━━━━━━━━━━┛\n"
-            "🎬═══════════════════════🎬\n\n"
-            "💡 <b>ADVANCED ANALYTICS INCLUDES:</b>\n\n"
-            "📊 <b>Performance Metrics</b>\n"
-            "   • Views, Likes, Comments\n"
-            "   • Engagement Rate & Grade\n"
-            "   • Views per Day Analysis\n"
-            "   • Performance Score\n\n"
-            "📺 <b>Channel Intelligence</b>\n"
-            "   • Subscriber Count & Growth\n"
-            "   • Channel Verification Status\n"
-            "   • Location & Country\n"
-            "   • Creator Details\n\n"
-            "🎯 <b>Content Analysis</b>\n"
-            "   • Full Description & Tags\n"
-            "   • Category & Age Rating\n"
-            "   • Video Quality Info\n"
-            "   • Thumbnail & Direct Links\n\n"
-            "✨ <b>Special Features</b>\n"
-            "   • Quality Badges\n"
-            "   • Visual Progress Bars\n"
-            "   • Trending Status\n"
-            "   • Quick Statistics\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "🚀 <b>QUICK START:</b>\n"
-            "Just paste any YouTube link and get instant detailed analysis!\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "📌 <b>Commands:</b>\n"
-            "• /start - Show this message\n"
-            "• /help - Detailed help guide\n"
-            "• /stats - Bot statistics\n"
-            "• /about - About this bot\n\n"
-            "✨ <i>Ready to explore YouTube like never before? Send me a link now!</i> ✨"
-        )
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._histograms.get(self._key(name, labels)) or Histogram()
 
     @staticmethod
-    def help_message() -> str:
-        return (
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "📚 <b>COMPREHENSIVE HELP</b> 📚\n"
-            "━━━━━━━━━━━━━━━━━━━━\n\n"
-            "🎯 <b>HOW TO USE:</b>\n\n"
-            "1️⃣ Copy any YouTube video URL\n"
-            "2️⃣ Paste it in this chat\n"
-            "3️⃣ Get instant comprehensive analysis\n"
-            "4️⃣ Share insights with friends!\n\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "📌 <b>SUPPORTED URL FORMATS:</b>\n\n"
-            "✅ <code>youtube.com/watch?v=VIDEO_ID</code>\n"
-            "✅ <code>youtu.be/VIDEO_ID</code>\n"
-            "✅ <code>youtube.com/shorts/VIDEO_ID</code>\n"
-            "✅ <code>youtube.com/embed/VIDEO_ID</code>\n\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "🎁 <b>ANALYTICS PROVIDED:</b>\n\n"
-            "📊 <b>Performance Metrics:</b>\n"
-            "• Total Views & Likes\n"
-            "• Comment Count\n"
-            "• Engagement Rate (%)\n"
-            "• Views per Day Average\n"
-            "• Performance Grade (S+ to E)\n"
-            "• Quality Badges\n\n"
-            "📺 <b>Channel Information:</b>\n"
-            "• Subscriber Count\n"
-            "• Channel Location/Country\n"
-            "• Verification Status\n"
-            "• Creator Username\n\n"
-            "🎥 <b>Video Details:</b>\n"
-            "• Upload Date & Time Ago\n"
-            "• Video Duration\n"
-            "• Category & Genre\n"
-            "• Tags & Keywords\n"
-            "• Age Rating\n"
-            "• Location Info\n\n"
-            "📈 <b>Visual Analytics:</b>\n"
-            "• Engagement Progress Bars\n"
-            "• Like Ratio Indicators\n"
-            "• Performance Meters\n"
-            "• Status Badges\n\n"
-            "🔗 <b>Quick Access Links:</b>\n"
-            "• Direct Video Player\n"
-            "• Channel Homepage\n"
-            "• HD Thumbnail Image\n\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "⚡ <b>PRO TIPS:</b>\n\n"
-            "💡 Works with public videos only\n"
-            "💡 Private/deleted videos won't work\n"
-            "💡 Age-restricted content may have limitations\n"
-            "💡 Rate limited to prevent spam (3s cooldown)\n\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "❓ <b>Need Help?</b> Type /help anytime!\n"
-            "━━━━━━━━━━━━━━━━━━━━"
-        )
+    def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
 
-    @staticmethod
-    def about_message() -> str:
-        return (
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "ℹ️ <b>ABOUT THIS BOT</b> ℹ️\n"
-            "━━━━━━━━━━━━━━━━━━━━\n\n"
-            "🤖 <b>YouTube Analyzer Bot v3.0</b>\n\n"
-            "🎯 <b>Purpose:</b>\n"
-            "Advanced YouTube video analytics and statistics bot "
-            "that provides comprehensive insights into any public YouTube video.\n\n"
-            "⚙️ <b>Technology Stack:</b>\n"
-            "• Python 3.x\n"
-            "• python-telegram-bot\n"
-            "• yt-dlp (YouTube data extraction)\n"
-            "• Modern async/await architecture\n\n"
-            "✨ <b>Features:</b>\n"
-            "• Real-time video statistics\n"
-            "• Advanced engagement analytics\n"
-            "• Performance grading system\n"
-            "• Visual progress indicators\n"
-            "• Channel intelligence\n"
-            "• Rate limiting & security\n"
-            "• Beautiful formatting\n\n"
-            "🔒 <b>Privacy & Security:</b>\n"
-            "• No data storage\n"
-            "• No tracking\n"
-            "• Rate-limited requests\n"
-            "• Public API usage only\n\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            "💝 Made with ❤️ for YouTube enthusiasts\n"
-            "━━━━━━━━━━━━━━━━━━━━"
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text format"""
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self._counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(Histogram.BUCKETS, histogram.counts):
+                cumulative += count
+                le = self._format_labels(labels, (("le", bound),))
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            le = self._format_labels(labels, (("le", "+Inf"),))
+            lines.append(f"{name}_bucket{le} {histogram.count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+
+        for name, (kind, func) in sorted(self._sampled.items()):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {float(func())}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.0 responder for GET /metrics"""
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+            status = "200 OK"
+            body = metrics.render_prometheus().encode()
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+
+        writer.write(
+            f"HTTP/1.0 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
         )
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"Metrics request failed: {e}")
+    finally:
+        writer.close()
 
 
 # ================================
-# COMMAND HANDLERS
+# VIDEO STATS RECORD
 # ================================
 
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /start command"""
-    user = update.effective_user
-    logger.info(f"User {user.id} ({user.username}) started the bot")
-    await update.message.reply_text(
-        MessageTemplates.welcome_message(), parse_mode="HTML"
-    )
+@dataclass(slots=True)
+class VideoStats:
+    """The fields of a yt-dlp info dict that reports use
 
+    Defaults are what the report shows when yt-dlp omits a field.
+    """
 
-async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /help command"""
-    await update.message.reply_text(MessageTemplates.help_message(), parse_mode="HTML")
+    id: str = "N/A"
+    title: Optional[str] = "N/A"
+    description: Optional[str] = "No description available"
+    channel: Optional[str] = "N/A"
+    channel_url: Optional[str] = ""
+    uploader: Optional[str] = "N/A"
+    channel_follower_count: Optional[int] = 0
+    channel_country: Optional[str] = "Global"
+    channel_is_verified: Optional[bool] = False
+    view_count: Optional[int] = 0
+    like_count: Optional[int] = 0
+    comment_count: Optional[int] = 0
+    upload_date: Optional[str] = ""
+    duration: Optional[float] = 0
+    categories: tuple = ()
+    tags: tuple = ()
+    location: Optional[str] = "Not specified"
+    age_limit: Optional[int] = 0
+    thumbnail: Optional[str] = ""
 
+    def __post_init__(self):
+        # JSON round trips turn tuples into lists
+        self.categories = tuple(self.categories or ())
+        self.tags = tuple(self.tags or ())
 
-async def about_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /about command"""
-    await update.message.reply_text(MessageTemplates.about_message(), parse_mode="HTML")
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "VideoStats":
+        """Project a full yt-dlp info dict; the dict can be dropped afterwards"""
+        data = {f.name: info[f.name] for f in fields(cls) if f.name in info}
+        if isinstance(data.get("description"), str):
+            # Keep one extra character so the report can still tell it was cut
+            data["description"] = data["description"][
+                : Config.MAX_DESCRIPTION_LENGTH + 1
+            ]
+        if data.get("categories"):
+            data["categories"] = data["categories"][:1]
+        if data.get("tags"):
+            data["tags"] = data["tags"][: Config.MAX_TAGS_DISPLAY]
 
+        # Unprocessed (stats profile) results lack fields yt-dlp derives later
+        if not data.get("thumbnail") and info.get("thumbnails"):
+            best = max(
+                info["thumbnails"],
+                key=lambda t: (t.get("preference") or 0, t.get("width") or 0),
+            )
+            data["thumbnail"] = best.get("url", "")
+        if not data.get("upload_date") and info.get("timestamp"):
+            data["upload_date"] = time.strftime(
+                "%Y%m%d", time.gmtime(info["timestamp"])
+            )
+        return cls(**data)
 
-async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /stats command - show bot statistics"""
-    stats_msg = (
-        "━━━━━━━━━━━━━━━━━━━━\n"
-        "📊 <b>BOT STATISTICS</b> 📊\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        "🤖 <b>Bot Version:</b> 3.0 Pro Edition\n"
-        "⚡ <b>Status:</b> Online & Active\n"
-        "🔄 <b>Response Time:</b> &lt;2 seconds\n"
-        "🛡️ <b>Rate Limit:</b> 3 seconds cooldown\n"
-        "📈 <b>Uptime:</b> Running smoothly\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n"
-        "✨ <b>Capabilities:</b>\n"
-        "• Video Analytics ✅\n"
-        "• Channel Insights ✅\n"
-        "• Engagement Metrics ✅\n"
-        "• Performance Grading ✅\n"
-        "• Visual Elements ✅\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n"
-        "💡 Send a YouTube link to get started!\n"
-        "━━━━━━━━━━━━━━━━━━━━"
-    )
-    await update.message.reply_text(stats_msg, parse_mode="HTML")
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VideoStats":
+        """Rebuild from to_dict() output, ignoring unknown keys"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
 # ================================
-# MAIN VIDEO ANALYSIS HANDLER
+# RESULT CACHE
 # ================================
 
 
-@rate_limit
-async def get_youtube_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Main handler for YouTube video analysis"""
-    url = update.message.text.strip()
-    user = update.effective_user
+class ResultCache:
+    """Bounded LRU cache of extraction results with a TTL"""
 
-    logger.info(f"User {user.id} requested analysis for: {url}")
+    def __init__(
+        self,
+        max_entries: int = Config.CACHE_MAX_ENTRIES,
+        ttl_seconds: float = Config.CACHE_EXPIRY_MINUTES * 60,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, VideoStats]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
-    # Validate YouTube URL
-    if not URLValidator.is_valid_youtube_url(url):
-        error_msg = (
-            "❌❌❌ <b>INVALID URL</b> ❌❌❌\n\n"
-            "⚠️ Please send a valid YouTube link:\n\n"
-            "✅ <code>youtube.com/watch?v=...</code>\n"
-            "✅ <code>youtu.be/...</code>\n"
-            "✅ <code>youtube.com/shorts/...</code>\n\n"
-            "💡 <i>Copy the link directly from YouTube's address bar!</i>"
-        )
-        await update.message.reply_text(error_msg, parse_mode="HTML")
-        return
+    def get(self, key: str, track: bool = True) -> Optional[VideoStats]:
+        """Return cached value for key, or None if missing or expired
 
-    # Show processing message
-    processing_msg = await update.message.reply_text(
-        "⏳ <b>Analyzing Video...</b>\n\n"
-        "🔍 Extracting video data...\n"
-        "📡 Fetching statistics...\n"
-        "📊 Calculating analytics...\n"
-        "🎨 Generating report...\n\n"
-        "<i>This will only take a moment...</i>",
-        parse_mode="HTML",
-    )
+        track=False leaves the hit/miss counters untouched.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            entry = None
 
-    try:
-        # Configure yt-dlp options
-        ydl_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "extract_flat": False,
-            "skip_download": True,
-        }
+        if entry is None:
+            self.misses += track
+            return None
 
-        # Extract video information
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        self._entries.move_to_end(key)
+        self.hits += track
+        return entry[1]
 
-            # ===========================
-            # EXTRACT VIDEO DATA
-            # ===========================
+    def set(self, key: str, value: VideoStats):
+        """Store value under key, evicting the least recently used entries"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
 
-            # Basic info
-            title = info.get("title", "N/A")
-            description = info.get("description", "No description available")[
-                : Config.MAX_DESCRIPTION_LENGTH
-            ]
-            video_id = info.get("id", "N/A")
-
-            # Channel info
-            channel = info.get("channel", "N/A")
-            channel_url = info.get("channel_url", "")
-            uploader = info.get("uploader", "N/A")
-            subscribers = info.get("channel_follower_count", 0)
-            channel_country = info.get("channel_country", "Global")
-            is_verified = info.get("channel_is_verified", False)
-
-            # Statistics
-            views = info.get("view_count", 0)
-            likes = info.get("like_count", 0)
-            comments = info.get("comment_count", 0)
-
-            # Time info
-            upload_date = info.get("upload_date", "")
-            duration = info.get("duration", 0)
-
-            # Content details
-            categories = info.get("categories", [])
-            category = categories[0] if categories else "Uncategorized"
-            tags = info.get("tags", [])[: Config.MAX_TAGS_DISPLAY]
-            location = info.get("location", "Not specified")
-            age_limit = info.get("age_limit", 0)
-
-            # Thumbnail
-            thumbnail = info.get("thumbnail", "")
-
-            # ===========================
-            # CALCULATE ANALYTICS
-            # ===========================
-
-            # Format numbers
-            views_fmt = NumberFormatter.format_large(views)
-            likes_fmt = NumberFormatter.format_large(likes)
-            comments_fmt = NumberFormatter.format_large(comments)
-            subscribers_fmt = NumberFormatter.format_large(subscribers)
-
-            # Time calculations
-            upload_formatted, time_ago = TimeFormatter.get_time_ago(upload_date)
-            duration_fmt = TimeFormatter.format_duration(duration)
-
-            # Analytics
-            quality_badge = VideoAnalyzer.get_quality_badge(views)
-            engagement_rate = VideoAnalyzer.calculate_engagement_rate(
-                likes, comments, views
-            )
-            like_percentage = VideoAnalyzer.calculate_like_percentage(likes, views)
-            views_per_day = VideoAnalyzer.calculate_views_per_day(views, upload_date)
-            performance_grade = VideoAnalyzer.get_performance_grade(engagement_rate)
-
-            # Visual elements
-            engagement_bar = VisualElements.create_bar(min(engagement_rate * 10, 100))
-            like_bar = VisualElements.create_bar(min(like_percentage * 20, 100))
-            performance_stars = VisualElements.create_emoji_meter(engagement_rate, 10)
-
-            # Age rating
-            age_icon = "🔞" if age_limit >= 18 else "✅"
-            age_text = "18+ Only" if age_limit >= 18 else "Family Friendly"
-
-            # Verification status
-            verify_icon = "✅" if is_verified else "⚪"
-            verify_text = "Verified" if is_verified else "Not Verified"
-
-            # ===========================
-            # BUILD RESPONSE MESSAGE
-            # ===========================
-
-            response = (
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                f"🎬 <b>{title}</b>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"✨ <b>STATUS:</b> {quality_badge}\n"
-                f"🎯 <b>PERFORMANCE:</b> {performance_stars} {performance_grade}\n\n"
-                "╔═══════════════════════════════╗\n"
-                "║  📺 <b>CHANNEL INFORMATION</b>        ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"🎯 <b>Channel:</b> <a href='{channel_url}'>{channel}</a>\n"
-                f"{verify_icon} <b>Status:</b> {verify_text}\n"
-                f"👤 <b>Creator:</b> {uploader}\n"
-                f"👥 <b>Subscribers:</b> {subscribers_fmt}\n"
-                f"   └─ <code>{NumberFormatter.format_with_commas(subscribers)}</code> subscribers\n"
-                f"🌍 <b>Country:</b> {channel_country}\n\n"
-                "╔═══════════════════════════════╗\n"
-                "║  📊 <b>PERFORMANCE ANALYTICS</b>      ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"👁️ <b>Total Views:</b> {views_fmt}\n"
-                f"   └─ <code>{NumberFormatter.format_with_commas(views)}</code> views\n"
-            )
-
-            # Add views per day if available
-            if views_per_day:
-                response += f"   └─ <code>{NumberFormatter.format_large(int(views_per_day))}</code> views/day avg\n"
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# ================================
+# PERSISTENT METADATA STORE
+# ================================
+
+
+class MetadataStore:
+    """SQLite (WAL) store of compact video metadata that survives restarts
+
+    Like SQLiteStateBackend, every database call runs on one dedicated
+    thread so another process holding the write lock never stalls the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.METADATA_DB_PATH,
+        soft_ttl_seconds: float = Config.METADATA_SOFT_TTL_MINUTES * 60,
+        hard_ttl_seconds: float = Config.METADATA_HARD_TTL_HOURS * 3600,
+    ):
+        self.path = path
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self.hard_ttl_seconds = hard_ttl_seconds
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="metadata-db")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS videos
+               (video_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL)""")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS thumbnail_files
+               (video_id TEXT PRIMARY KEY,
+                thumbnail_url TEXT NOT NULL,
+                file_id TEXT NOT NULL)""")
+        self._conn.commit()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def get(
+        self, video_id: str, allow_expired: bool = False
+    ) -> Optional[tuple[VideoStats, bool]]:
+        """Return (stats, is_stale) for video_id, or None if missing or too old"""
+        return await self._run(self._get, video_id, allow_expired)
+
+    async def put(self, video_id: str, stats: VideoStats):
+        """Insert or replace the stored metadata for video_id"""
+        await self._run(self._put, video_id, stats)
+
+    def _get(
+        self, video_id: str, allow_expired: bool
+    ) -> Optional[tuple[VideoStats, bool]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM videos WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        data, fetched_at = row
+        age = time.time() - fetched_at
+        if age > self.hard_ttl_seconds and not allow_expired:
+            return None
+        return VideoStats.from_dict(json.loads(data)), age > self.soft_ttl_seconds
+
+    def _put(self, video_id: str, stats: VideoStats):
+        data = json.dumps(stats.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, data, fetched_at) "
+                "VALUES (?, ?, ?)",
+                (video_id, data, time.time()),
+            )
+            self._conn.commit()
+
+    async def get_file_id(self, video_id: str, thumbnail_url: str) -> Optional[str]:
+        """Telegram file_id of the uploaded thumbnail, if it is still current"""
+        return await self._run(self._get_file_id, video_id, thumbnail_url)
+
+    async def put_file_id(self, video_id: str, thumbnail_url: str, file_id: str):
+        """Remember the file_id Telegram assigned to an uploaded thumbnail"""
+        await self._run(self._put_file_id, video_id, thumbnail_url, file_id)
+
+    async def forget_file_id(self, video_id: str):
+        """Drop a file_id Telegram no longer accepts"""
+        await self._run(self._forget_file_id, video_id)
+
+    def _get_file_id(self, video_id: str, thumbnail_url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_id FROM thumbnail_files "
+                "WHERE video_id = ? AND thumbnail_url = ?",
+                (video_id, thumbnail_url),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put_file_id(self, video_id: str, thumbnail_url: str, file_id: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnail_files "
+                "(video_id, thumbnail_url, file_id) VALUES (?, ?, ?)",
+                (video_id, thumbnail_url, file_id),
+            )
+            self._conn.commit()
+
+    def _forget_file_id(self, video_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM thumbnail_files WHERE video_id = ?", (video_id,)
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+metadata_store = MetadataStore()
+
+
+# ================================
+# SNAPSHOT HISTORY
+# ================================
+
+
+class VideoSeries:
+    """Columnar count history of one video, oldest snapshot first"""
+
+    __slots__ = ("times", "views", "likes", "comments")
+
+    def __init__(self):
+        self.times = array("I")
+        self.views = array("q")
+        self.likes = array("q")
+        self.comments = array("q")
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, at: int, views: int, likes: int, comments: int):
+        self.times.append(at)
+        self.views.append(views)
+        self.likes.append(likes)
+        self.comments.append(comments)
+
+    def drop_before(self, cutoff: int):
+        """Forget snapshots taken before cutoff"""
+        end = bisect.bisect_left(self.times, cutoff)
+        for column in (self.times, self.views, self.likes, self.comments):
+            del column[:end]
+
+    def _base_index(self, end: int, window: int) -> int:
+        """Index of the newest snapshot at least `window` before `end`
+
+        Falls back to the oldest snapshot when history is shorter.
+        """
+        return max(bisect.bisect_right(self.times, end - window) - 1, 0)
+
+    def views_gained(
+        self, window: int, min_span: int = Config.SNAPSHOT_MIN_SPAN
+    ) -> Optional[tuple[int, int]]:
+        """(views gained, seconds covered) over roughly the last window"""
+        if not self.times:
+            return None
+        end = len(self.times) - 1
+        base = self._base_index(self.times[end], window)
+        span = self.times[end] - self.times[base]
+        if span < min_span or self.views[base] < 0 or self.views[end] < 0:
+            return None
+        return self.views[end] - self.views[base], span
+
+    def acceleration(self, window: int) -> Optional[float]:
+        """Percent change in views/s between the last two windows"""
+        if len(self.times) < 3:
+            return None
+        end = len(self.times) - 1
+        mid = self._base_index(self.times[end], window)
+        start = self._base_index(self.times[mid], window)
+        if not start < mid < end or min(self.views[i] for i in (start, mid, end)) < 0:
+            return None
+
+        recent = (self.views[end] - self.views[mid]) / (
+            self.times[end] - self.times[mid]
+        )
+        before = (self.views[mid] - self.views[start]) / (
+            self.times[mid] - self.times[start]
+        )
+        if before <= 0:
+            return None
+        return (recent / before - 1) * 100
+
+
+class SnapshotStore:
+    """Append-only binary log of view/like/comment counts over time
+
+    Each extraction appends one fixed-size record; open() reads the log
+    back into per-video VideoSeries, dropping expired records and
+    compacting the file when they make up most of it. Until then the store
+    only keeps snapshots in memory. Expired snapshots are also pruned from
+    memory every SNAPSHOT_PRUNE_INTERVAL. Unknown counts are stored as -1.
+
+    A log has a single writer: the process holding the exclusive lock on
+    "<path>.lock". Compaction replaces the file, which would orphan another
+    process's append handle, so other processes sharing the path load its
+    history read-only and keep their own snapshots in memory. Give each
+    process its own SNAPSHOT_PATH to persist them all.
+    """
+
+    # video_id, unix time, views, likes, comments
+    RECORD = struct.Struct("<11sIqqq")
+
+    def __init__(
+        self,
+        path: str = Config.SNAPSHOT_PATH,
+        retention_seconds: int = Config.SNAPSHOT_RETENTION_DAYS * 86400,
+        min_interval: int = Config.SNAPSHOT_MIN_INTERVAL,
+    ):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.min_interval = min_interval
+        self._series: Dict[str, VideoSeries] = {}
+        self._file = None
+        self._lock_file = None
+        self._next_prune = 0
+
+    def open(self):
+        """Load the log, and append to it unless another process writes it"""
+        if not self.path:
+            return
+
+        self._lock_file = open(f"{self.path}.lock", "a+b")
+        if self._try_lock(self._lock_file):
+            self._load()
+            self._file = open(self.path, "ab", buffering=0)
+        else:
+            self._lock_file.close()
+            self._lock_file = None
+            logger.warning(
+                f"Snapshot log {self.path} is written by another process; "
+                "loading it read-only"
+            )
+            self._load(compact=False)
+
+    @staticmethod
+    def _try_lock(file) -> bool:
+        """Take a non-blocking exclusive lock, held until file is closed"""
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _load(self, compact: bool = True):
+        if not os.path.exists(self.path):
+            return
+
+        cutoff = time.time() - self.retention_seconds
+        total = expired = 0
+        size = self.RECORD.size
+        with open(self.path, "rb") as f:
+            while chunk := f.read(size * 65536):
+                usable = len(chunk) - len(chunk) % size
+                for raw_id, at, views, likes, comments in self.RECORD.iter_unpack(
+                    chunk[:usable]
+                ):
+                    total += 1
+                    if at < cutoff:
+                        expired += 1
+                        continue
+                    video_id = raw_id.decode("ascii")
+                    series = self._series.get(video_id)
+                    if series is None:
+                        series = self._series[video_id] = VideoSeries()
+                    series.append(at, views, likes, comments)
+                if usable < len(chunk):
+                    # Torn final record from an interrupted write
+                    logger.warning(f"Ignoring partial record at end of {self.path}")
+                    break
+
+        logger.info(
+            f"Loaded {total - expired} snapshots for {len(self._series)} videos"
+        )
+        if not compact:
+            return
+        if expired * 2 > total or (total and os.path.getsize(self.path) % size):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log with only the snapshots kept in memory"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for video_id, series in self._series.items():
+                raw_id = video_id.encode("ascii")
+                f.write(
+                    b"".join(
+                        self.RECORD.pack(raw_id, *row)
+                        for row in zip(
+                            series.times, series.views, series.likes, series.comments
+                        )
+                    )
+                )
+        os.replace(tmp_path, self.path)
+        logger.info(f"Compacted snapshot log {self.path}")
+
+    def _prune(self, now: int):
+        cutoff = now - self.retention_seconds
+        for video_id, series in list(self._series.items()):
+            if not series.times or series.times[-1] < cutoff:
+                del self._series[video_id]
+            elif series.times[0] < cutoff:
+                series.drop_before(cutoff)
+
+    def record(self, stats: VideoStats, at: Optional[int] = None):
+        """Append the current counts of stats"""
+        video_id = stats.id
+        if len(video_id) != 11 or not video_id.isascii():
+            return
+
+        at = int(at if at is not None else time.time())
+        if at >= self._next_prune:
+            self._prune(at)
+            self._next_prune = at + Config.SNAPSHOT_PRUNE_INTERVAL
+
+        series = self._series.get(video_id)
+        if series is None:
+            series = self._series[video_id] = VideoSeries()
+        elif series.times and at - series.times[-1] < self.min_interval:
+            return
+
+        counts = [
+            -1 if value is None else int(value)
+            for value in (stats.view_count, stats.like_count, stats.comment_count)
+        ]
+        series.append(at, *counts)
+        if self._file is not None:
+            self._file.write(self.RECORD.pack(video_id.encode("ascii"), at, *counts))
+
+    def history(self, video_id: str) -> Optional[VideoSeries]:
+        return self._series.get(video_id)
+
+    def __len__(self) -> int:
+        return sum(len(series) for series in self._series.values())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+snapshot_store = SnapshotStore()
+
+
+# ================================
+# WATCHLIST STORE
+# ================================
+
+
+class WatchStore:
+    """SQLite (WAL) store of watched videos and the chats watching them
+
+    Videos are refreshed once no matter how many chats watch them; each
+    watcher remembers the view count it was last evaluated at, so every
+    milestone is announced exactly once.
+
+    Like SQLiteStateBackend, every database call runs on one dedicated
+    thread so another process holding the write lock never stalls the
+    event loop.
+    """
+
+    def __init__(self, path: str = Config.WATCH_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="watch-db")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS watched_videos
+               (video_id TEXT PRIMARY KEY,
+                title TEXT,
+                views INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                next_due REAL NOT NULL,
+                interval REAL NOT NULL)""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS watched_videos_due ON watched_videos (next_due)"
+        )
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS watchers
+               (chat_id INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                target INTEGER,
+                notified_views INTEGER NOT NULL,
+                PRIMARY KEY (chat_id, video_id))""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS watchers_video ON watchers (video_id)"
+        )
+        self._conn.commit()
+        # Watched videos across all processes, refreshed by adds, removes
+        # and every refresh tick, for the metrics gauge
+        self.watched = 0
+        self._count_watched()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def add(self, chat_id: int, stats: VideoStats, target: Optional[int]) -> bool:
+        """Watch stats.id in chat_id; False if the chat's limit is reached"""
+        return await self._run(self._add, chat_id, stats, target)
+
+    async def remove(self, chat_id: int, video_id: Optional[str] = None) -> int:
+        """Stop watching video_id (or everything) in chat_id"""
+        return await self._run(self._remove, chat_id, video_id)
+
+    async def for_chat(self, chat_id: int) -> list[tuple]:
+        """(video_id, title, views, next_due, target) for each watch in chat_id"""
+        return await self._run(self._for_chat, chat_id)
+
+    async def due(self, now: float, limit: int) -> list[tuple]:
+        """Claim the most overdue videos: (video_id, views, checked_at, interval)
+
+        Claiming pushes next_due WATCH_CLAIM_LEASE ahead in the same
+        statement, so processes sharing the database never refresh (and
+        alert on) the same video twice.
+        """
+        return await self._run(self._due, now, limit)
+
+    async def release(self, video_id: str, next_due: float):
+        """Give up a claim without refreshing, keeping video_id due at next_due"""
+        await self._run(self._release, video_id, next_due)
+
+    async def watchers(self, video_id: str) -> list[tuple]:
+        """(chat_id, target, notified_views) for each chat watching video_id"""
+        return await self._run(self._watchers, video_id)
+
+    async def update(
+        self,
+        stats: VideoStats,
+        checked_at: float,
+        interval: float,
+        notified: Iterable[int],
+    ):
+        """Store a refresh result, scheduling the next check
+
+        Only the chats in notified move on to the new view count; the others
+        are evaluated against it again on the next refresh.
+        """
+        await self._run(self._update, stats, checked_at, interval, notified)
+
+    async def postpone(self, video_id: str, interval: float):
+        """Push the next check of video_id back by interval seconds"""
+        await self._run(self._postpone, video_id, interval)
+
+    def _add(self, chat_id: int, stats: VideoStats, target: Optional[int]) -> bool:
+        now = time.time()
+        views = stats.view_count or 0
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM watchers WHERE chat_id = ? AND video_id != ?",
+                (chat_id, stats.id),
+            ).fetchone()
+            if count >= Config.WATCH_MAX_PER_CHAT:
+                return False
+
+            self._conn.execute(
+                "INSERT OR IGNORE INTO watched_videos "
+                "(video_id, title, views, checked_at, next_due, interval) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    stats.id,
+                    stats.title,
+                    views,
+                    now,
+                    now + Config.WATCH_MIN_INTERVAL,
+                    Config.WATCH_MIN_INTERVAL,
+                ),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watchers "
+                "(chat_id, video_id, target, notified_views) VALUES (?, ?, ?, ?)",
+                (chat_id, stats.id, target, views),
+            )
+            self._conn.commit()
+            self._count_watched()
+        return True
+
+    def _remove(self, chat_id: int, video_id: Optional[str] = None) -> int:
+        with self._lock:
+            if video_id is None:
+                cursor = self._conn.execute(
+                    "DELETE FROM watchers WHERE chat_id = ?", (chat_id,)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM watchers WHERE chat_id = ? AND video_id = ?",
+                    (chat_id, video_id),
+                )
+            self._conn.execute(
+                "DELETE FROM watched_videos WHERE video_id NOT IN "
+                "(SELECT video_id FROM watchers)"
+            )
+            self._conn.commit()
+            self._count_watched()
+            return cursor.rowcount
+
+    def _for_chat(self, chat_id: int) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT v.video_id, v.title, v.views, v.next_due, w.target "
+                "FROM watchers w JOIN watched_videos v USING (video_id) "
+                "WHERE w.chat_id = ? ORDER BY v.views DESC",
+                (chat_id,),
+            ).fetchall()
+
+    def _due(self, now: float, limit: int) -> list[tuple]:
+        with self._lock:
+            rows = self._conn.execute(
+                "UPDATE watched_videos SET next_due = ? WHERE video_id IN "
+                "(SELECT video_id FROM watched_videos WHERE next_due <= ? "
+                "ORDER BY next_due LIMIT ?) "
+                "RETURNING video_id, views, checked_at, interval",
+                (now + Config.WATCH_CLAIM_LEASE, now, limit),
+            ).fetchall()
+            self._conn.commit()
+            self._count_watched()
+            return rows
+
+    def _release(self, video_id: str, next_due: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watched_videos SET next_due = ? WHERE video_id = ?",
+                (next_due, video_id),
+            )
+            self._conn.commit()
+
+    def _watchers(self, video_id: str) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT chat_id, target, notified_views FROM watchers "
+                "WHERE video_id = ?",
+                (video_id,),
+            ).fetchall()
+
+    def _update(
+        self,
+        stats: VideoStats,
+        checked_at: float,
+        interval: float,
+        notified: Iterable[int],
+    ):
+        views = stats.view_count or 0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watched_videos SET title = ?, views = ?, checked_at = ?, "
+                "next_due = ?, interval = ? WHERE video_id = ?",
+                (
+                    stats.title,
+                    views,
+                    checked_at,
+                    checked_at + interval,
+                    interval,
+                    stats.id,
+                ),
+            )
+            self._conn.executemany(
+                "UPDATE watchers SET notified_views = ? "
+                "WHERE video_id = ? AND chat_id = ?",
+                [(views, stats.id, chat_id) for chat_id in notified],
+            )
+            self._conn.commit()
+
+    def _postpone(self, video_id: str, interval: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watched_videos SET next_due = ?, interval = ? "
+                "WHERE video_id = ?",
+                (time.time() + interval, interval, video_id),
+            )
+            self._conn.commit()
+
+    def _count_watched(self):
+        (self.watched,) = self._conn.execute(
+            "SELECT COUNT(*) FROM watched_videos"
+        ).fetchone()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+watch_store = WatchStore()
+
+
+# ================================
+# SHARED STATE BACKENDS
+# ================================
+
+
+class StateBackend(ABC):
+    """Rate-limit buckets, result cache and in-flight locks
+
+    Every bot process using the same shared backend behaves as one bot:
+    users get one allowance, cache hits are shared and a video is only
+    extracted by one process at a time. Methods are coroutines so that
+    backends doing I/O keep it off the event loop.
+    """
+
+    # Tracked cache lookups served by this process
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @staticmethod
+    def _refill(
+        tokens: float, last: float, now: float, rate: float, burst: float
+    ) -> tuple[bool, float, float]:
+        """Token bucket step: returns (allowed, seconds to wait, new tokens)"""
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens < 1:
+            return False, (1 - tokens) / rate, tokens
+        return True, 0.0, tokens - 1
+
+    @abstractmethod
+    async def take_token(
+        self, key: str, rate: float, burst: float
+    ) -> tuple[bool, float]:
+        """Take one token from the bucket at key"""
+
+    @abstractmethod
+    async def cache_get(self, key: str, track: bool = True) -> Optional[VideoStats]:
+        """Return the cached value for key, or None if missing or expired
+
+        Lookups with track=False (e.g. polling for a peer's result) are
+        not counted in cache_hits / cache_misses.
+        """
+
+    @abstractmethod
+    async def cache_set(self, key: str, value: VideoStats, ttl: float):
+        """Cache value under key for ttl seconds"""
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        """Try to take a lock that expires by itself after ttl seconds"""
+
+    @abstractmethod
+    async def release_lock(self, key: str):
+        """Release a lock taken with acquire_lock"""
+
+    def close(self):
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state for a single bot process"""
+
+    def __init__(self):
+        self.cache = ResultCache()
+        # key -> (tokens, last_update); ordered by last update
+        self._buckets: Dict[str, tuple[float, float]] = {}
+        self._locks: Dict[str, float] = {}
+
+    async def take_token(
+        self, key: str, rate: float, burst: float
+    ) -> tuple[bool, float]:
+        now = time.monotonic()
+        self._evict_idle(now, burst / rate)
+
+        tokens, last = self._buckets.pop(key, (burst, now))
+        allowed, wait, tokens = self._refill(tokens, last, now, rate, burst)
+        self._buckets[key] = (tokens, now)
+        return allowed, wait
+
+    def _evict_idle(self, now: float, refill_seconds: float):
+        # A bucket that has refilled completely carries no state. Entries
+        # are re-inserted on every update, so the oldest come first and
+        # the scan stops at the first bucket that is still refilling.
+        for key, (_, last) in list(self._buckets.items()):
+            if now - last < refill_seconds:
+                break
+            del self._buckets[key]
+
+    async def cache_get(self, key: str, track: bool = True) -> Optional[VideoStats]:
+        return self.cache.get(key, track)
+
+    async def cache_set(self, key: str, value: VideoStats, ttl: float):
+        self.cache.set(key, value)
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        if self._locks.get(key, 0) > now:
+            return False
+        self._locks[key] = now + ttl
+        return True
+
+    async def release_lock(self, key: str):
+        self._locks.pop(key, None)
+
+    @property
+    def cache_hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self.cache.misses
+
+
+class SQLiteStateBackend(StateBackend):
+    """State in a WAL-mode SQLite file shared by processes on one host
+
+    Every database call runs on one dedicated thread: waiting up to the
+    busy timeout for another process's write lock must not stall the
+    event loop.
+    """
+
+    # Expired rows are purged every this many writes
+    SWEEP_EVERY = 500
+
+    def __init__(self, path: str = Config.STATE_DB_PATH):
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="state-db")
+        # Writes per table since startup, for the periodic sweeps
+        self._writes: Dict[str, int] = {}
+        # Autocommit mode; write paths open BEGIN IMMEDIATE themselves
+        self._conn = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""CREATE TABLE IF NOT EXISTS buckets
+                   (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+               CREATE TABLE IF NOT EXISTS cache
+                   (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL);
+               CREATE TABLE IF NOT EXISTS locks
+                   (key TEXT PRIMARY KEY, expires_at REAL NOT NULL);""")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def take_token(
+        self, key: str, rate: float, burst: float
+    ) -> tuple[bool, float]:
+        return await self._run(self._take_token, key, rate, burst)
+
+    async def cache_get(self, key: str, track: bool = True) -> Optional[VideoStats]:
+        return await self._run(self._cache_get, key, track)
+
+    async def cache_set(self, key: str, value: VideoStats, ttl: float):
+        await self._run(self._cache_set, key, value, ttl)
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        return await self._run(self._acquire_lock, key, ttl)
+
+    async def release_lock(self, key: str):
+        await self._run(self._release_lock, key)
+
+    def _sweep_due(self, table: str) -> bool:
+        self._writes[table] = self._writes.get(table, 0) + 1
+        return self._writes[table] % self.SWEEP_EVERY == 0
+
+    def _take_token(self, key: str, rate: float, burst: float) -> tuple[bool, float]:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, last = row if row else (burst, now)
+            allowed, wait, tokens = self._refill(tokens, last, now, rate, burst)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            # Only here is the refill window known; a full bucket has no state
+            if self._sweep_due("buckets"):
+                conn.execute(
+                    "DELETE FROM buckets WHERE updated < ?", (now - burst / rate,)
+                )
+        return allowed, wait
+
+    def _cache_get(self, key: str, track: bool) -> Optional[VideoStats]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            self.cache_misses += track
+            return None
+        self.cache_hits += track
+        return VideoStats.from_dict(json.loads(row[0]))
+
+    def _cache_set(self, key: str, value: VideoStats, ttl: float):
+        data = json.dumps(value.to_dict(), ensure_ascii=False)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, now + ttl),
+            )
+            if self._sweep_due("cache"):
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+
+    def _acquire_lock(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, expires_at) VALUES (?, ?)",
+                (key, now + ttl),
+            )
+            return cursor.rowcount == 1
+
+    def _release_lock(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM locks WHERE key = ?", (key,))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def create_state_backend() -> StateBackend:
+    """Build the backend selected by Config.STATE_BACKEND"""
+    if Config.STATE_BACKEND == "sqlite":
+        return SQLiteStateBackend()
+    return MemoryStateBackend()
+
+
+state_backend = create_state_backend()
+
+
+# ================================
+# RATE LIMITING
+# ================================
+
+
+class RateLimiter:
+    """Per-user token bucket kept in the shared state backend"""
+
+    def __init__(
+        self,
+        backend: "StateBackend",
+        seconds_per_token: float = Config.RATE_LIMIT_SECONDS,
+        burst: int = Config.RATE_LIMIT_BURST,
+    ):
+        self.backend = backend
+        self.rate = 1 / seconds_per_token
+        self.burst = burst
+
+    async def is_allowed(self, user_id: int) -> tuple[bool, int]:
+        """Take a token for user_id; returns (allowed, seconds to wait)"""
+        allowed, wait = await self.backend.take_token(
+            f"rate:{user_id}", self.rate, self.burst
+        )
+        return allowed, math.ceil(wait)
+
+
+rate_limiter = RateLimiter(state_backend)
+
+
+def rate_limit(func):
+    """Decorator for rate limiting"""
+
+    @wraps(func)
+    async def wrapper(
+        update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
+    ):
+        user_id = update.effective_user.id
+        allowed, wait_time = await rate_limiter.is_allowed(user_id)
+
+        if not allowed:
+            metrics.inc("ytbot_rate_limited_total")
+            await reply(
+                update.message,
+                f"⏳ <b>Slow down!</b>\n\n"
+                f"Please wait <b>{wait_time}</b> seconds before next request.\n\n"
+                f"<i>This prevents spam and ensures smooth operation for everyone! 😊</i>",
+                SendQueue.REPLY,
+                parse_mode="HTML",
+            )
+            return
+
+        return await func(update, context, *args, **kwargs)
+
+    return wrapper
+
+
+# ================================
+# OUTBOUND MESSAGE QUEUE
+# ================================
+
+
+@dataclass(slots=True)
+class SendJob:
+    """One queued Bot API call"""
+
+    priority: int
+    seq: int
+    chat_id: int
+    call: Any
+    future: asyncio.Future
+    key: Any = None
+    attempts: int = 0
+    queued_at: float = 0.0
+
+
+class SendQueue:
+    """Paces Bot API calls under Telegram's global and per-chat limits
+
+    Calls are made through submit() and dispatched by priority, lowest
+    first. A chat never has more than one call in flight, so edits of one
+    message cannot overtake each other. PROGRESS calls may be dropped:
+    a newer call with the same key replaces a pending one, and they are
+    not retried after RetryAfter. Buckets are per process, so with
+    several processes SEND_GLOBAL_RATE should be split between them.
+    """
+
+    RESULT, REPLY, PROGRESS = 0, 1, 2
+
+    def __init__(
+        self,
+        global_rate: float = Config.SEND_GLOBAL_RATE,
+        global_burst: float = Config.SEND_GLOBAL_BURST,
+        chat_rate: float = Config.SEND_CHAT_RATE,
+        group_rate: float = Config.SEND_GROUP_RATE,
+        chat_burst: float = Config.SEND_CHAT_BURST,
+        max_attempts: int = Config.SEND_MAX_ATTEMPTS,
+    ):
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self._pending: list[SendJob] = []
+        self._seq = 0
+        self._global = (global_burst, time.monotonic())
+        # chat_id -> (tokens, last_update); ordered by last update
+        self._chats: Dict[int, tuple[float, float]] = {}
+        self._blocked_until: Dict[int, float] = {}
+        self._busy: set = set()
+        # Strong references to in-flight sends
+        self._running: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.retries = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, chat_id: int, call, priority: int = REPLY, key=None):
+        """Run call() when limits allow and return its result
+
+        call is a zero-argument function returning an awaitable, so it can
+        be repeated after RetryAfter. Returns None if a PROGRESS call is
+        dropped.
+        """
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+        if key is not None:
+            # A newer call for the same message supersedes queued progress
+            for job in [j for j in self._pending if j.key == key]:
+                if job.priority == self.PROGRESS:
+                    self._drop(job)
+
+        self._seq += 1
+        job = SendJob(
+            priority,
+            self._seq,
+            chat_id,
+            call,
+            asyncio.get_running_loop().create_future(),
+            key,
+            queued_at=time.perf_counter(),
+        )
+        self._pending.append(job)
+        self._wakeup.set()
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            if job in self._pending:
+                self._pending.remove(job)
+            raise
+
+    def _drop(self, job: SendJob):
+        self._pending.remove(job)
+        self.dropped += 1
+        if not job.future.done():
+            job.future.set_result(None)
+
+    def _chat_rate(self, chat_id: int) -> float:
+        # Group and channel chat IDs are negative
+        return self.group_rate if chat_id < 0 else self.chat_rate
+
+    def _next_ready(self, now: float) -> tuple[Optional[SendJob], float, float]:
+        """Best dispatchable job, its chat's new tokens, or the time to wait"""
+        best, best_tokens, wait = None, 0.0, 1.0
+        for job in self._pending:
+            if job.chat_id in self._busy:
+                continue
+            if best is not None and (job.priority, job.seq) > (best.priority, best.seq):
+                continue
+
+            blocked = self._blocked_until.get(job.chat_id, 0) - now
+            if blocked > 0:
+                wait = min(wait, blocked)
+                continue
+
+            rate = self._chat_rate(job.chat_id)
+            tokens, last = self._chats.get(job.chat_id, (self.chat_burst, now))
+            allowed, chat_wait, tokens = StateBackend._refill(
+                tokens, last, now, rate, self.chat_burst
+            )
+            if allowed:
+                best, best_tokens = job, tokens
+            else:
+                wait = min(wait, chat_wait)
+        return best, best_tokens, wait
+
+    def _evict_idle(self, now: float):
+        # Same scheme as MemoryStateBackend: full buckets carry no state
+        refill_seconds = self.chat_burst / min(self.chat_rate, self.group_rate)
+        for chat_id, (_, last) in list(self._chats.items()):
+            if now - last < refill_seconds:
+                break
+            del self._chats[chat_id]
+        # A flood block can outlast the refill window; keep it until it ends
+        for chat_id, until in list(self._blocked_until.items()):
+            if until <= now:
+                del self._blocked_until[chat_id]
+
+    async def _sleep(self, seconds: float):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _dispatch_loop(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            allowed, wait, global_tokens = StateBackend._refill(
+                *self._global, now, self.global_rate, self.global_burst
+            )
+            if not allowed:
+                await self._sleep(wait)
+                continue
+
+            job, chat_tokens, wait = self._next_ready(now)
+            if job is None:
+                await self._sleep(wait)
+                continue
+
+            self._evict_idle(now)
+            self._global = (global_tokens, now)
+            self._chats.pop(job.chat_id, None)
+            self._chats[job.chat_id] = (chat_tokens, now)
+            self._pending.remove(job)
+            self._busy.add(job.chat_id)
+            metrics.observe(
+                "ytbot_phase_seconds",
+                time.perf_counter() - job.queued_at,
+                phase="send_wait",
+            )
+            task = asyncio.create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, job: SendJob):
+        try:
+            result = await job.call()
+        except RetryAfter as e:
+            delay = e.retry_after
+            if isinstance(delay, timedelta):
+                delay = delay.total_seconds()
+            job.attempts += 1
+            # Back off at least exponentially even if Telegram asks for less
+            delay = max(float(delay), 0.5 * 2**job.attempts)
+            self._blocked_until[job.chat_id] = time.monotonic() + delay
+            logger.warning(f"Flood control for chat {job.chat_id}: retry in {delay}s")
+
+            if job.priority == self.PROGRESS:
+                self.dropped += 1
+                job.future.set_result(None)
+            elif job.attempts >= self.max_attempts:
+                job.future.set_exception(e)
+            else:
+                self.retries += 1
+                self._pending.append(job)
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+        finally:
+            self._busy.discard(job.chat_id)
+            self._wakeup.set()
+
+    async def close(self):
+        """Stop dispatching; in-flight calls finish, queued ones are abandoned"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        for job in self._pending:
+            job.future.cancel()
+        self._pending.clear()
+
+
+send_queue = SendQueue()
+
+
+async def reply(message, text: str, priority: int = SendQueue.RESULT, **kwargs):
+    """Queue message.reply_text"""
+    return await send_queue.submit(
+        message.chat_id, lambda: message.reply_text(text, **kwargs), priority
+    )
+
+
+async def edit(message, text: str, priority: int = SendQueue.RESULT, **kwargs):
+    """Queue message.edit_text; pending progress edits of it are dropped"""
+    return await send_queue.submit(
+        message.chat_id,
+        lambda: message.edit_text(text, **kwargs),
+        priority,
+        key=(message.chat_id, message.message_id),
+    )
+
+
+# ================================
+# MESSAGE TEMPLATES
+# ================================
+
+
+class MessageTemplates:
+    """Pre-formatted message templates"""
+
+    @staticmethod
+    def welcome_message() -> str:
+        return (
+            "🎬═══════════════════════🎬\n"
+            "┏━━━━━━━━━━━━━━━━━━━━━━┓\n"
+            "┃  🌟 <b>YOUTUBE ANALYZER</b> 🌟  ┃\n"
+            "┃     〰️ PRO EDITION v3.0 〰️    ┃\n"
+            "┗━━━━━━━━━━━━━━━━━━━━━━┛\n"
+            "🎬═══════════════════════🎬\n\n"
+            "💡 <b>ADVANCED ANALYTICS INCLUDES:</b>\n\n"
+            "📊 <b>Performance Metrics</b>\n"
+            "   • Views, Likes, Comments\n"
+            "   • Engagement Rate & Grade\n"
+            "   • Views per Day Analysis\n"
+            "   • Performance Score\n\n"
+            "📺 <b>Channel Intelligence</b>\n"
+            "   • Subscriber Count & Growth\n"
+            "   • Channel Verification Status\n"
+            "   • Location & Country\n"
+            "   • Creator Details\n\n"
+            "🎯 <b>Content Analysis</b>\n"
+            "   • Full Description & Tags\n"
+            "   • Category & Age Rating\n"
+            "   • Video Quality Info\n"
+            "   • Thumbnail & Direct Links\n\n"
+            "✨ <b>Special Features</b>\n"
+            "   • Quality Badges\n"
+            "   • Visual Progress Bars\n"
+            "   • Trending Status\n"
+            "   • Quick Statistics\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🚀 <b>QUICK START:</b>\n"
+            "Just paste any YouTube link and get instant detailed analysis!\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "📌 <b>Commands:</b>\n"
+            "• /start - Show this message\n"
+            "• /help - Detailed help guide\n"
+            "• /stats - Bot statistics\n"
+            "• /watch - Get alerts when a video hits new milestones\n"
+            "• /watchlist - Videos you are watching\n"
+            "• /compare - Rank several videos side by side\n"
+            "• /about - About this bot\n\n"
+            "✨ <i>Ready to explore YouTube like never before? Send me a link now!</i> ✨"
+        )
+
+    @staticmethod
+    def help_message() -> str:
+        return (
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "📚 <b>COMPREHENSIVE HELP</b> 📚\n"
+            "━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🎯 <b>HOW TO USE:</b>\n\n"
+            "1️⃣ Copy any YouTube video URL\n"
+            "2️⃣ Paste it in this chat\n"
+            "3️⃣ Get instant comprehensive analysis\n"
+            "4️⃣ Share insights with friends!\n\n"
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "📌 <b>SUPPORTED URL FORMATS:</b>\n\n"
+            "✅ <code>youtube.com/watch?v=VIDEO_ID</code>\n"
+            "✅ <code>youtu.be/VIDEO_ID</code>\n"
+            "✅ <code>youtube.com/shorts/VIDEO_ID</code>\n"
+            "✅ <code>youtube.com/embed/VIDEO_ID</code>\n"
+            "✅ <code>youtube.com/playlist?list=LIST_ID</code>\n"
+            "✅ <code>youtube.com/@channel</code>\n\n"
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "🎁 <b>ANALYTICS PROVIDED:</b>\n\n"
+            "📊 <b>Performance Metrics:</b>\n"
+            "• Total Views & Likes\n"
+            "• Comment Count\n"
+            "• Engagement Rate (%)\n"
+            "• Views per Day Average\n"
+            "• Performance Grade (S+ to E)\n"
+            "• Quality Badges\n\n"
+            "📺 <b>Channel Information:</b>\n"
+            "• Subscriber Count\n"
+            "• Channel Location/Country\n"
+            "• Verification Status\n"
+            "• Creator Username\n\n"
+            "🎥 <b>Video Details:</b>\n"
+            "• Upload Date & Time Ago\n"
+            "• Video Duration\n"
+            "• Category & Genre\n"
+            "• Tags & Keywords\n"
+            "• Age Rating\n"
+            "• Location Info\n\n"
+            "📈 <b>Visual Analytics:</b>\n"
+            "• Engagement Progress Bars\n"
+            "• Like Ratio Indicators\n"
+            "• Performance Meters\n"
+            "• Status Badges\n\n"
+            "🔗 <b>Quick Access Links:</b>\n"
+            "• Direct Video Player\n"
+            "• Channel Homepage\n"
+            "• HD Thumbnail Image\n\n"
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "⚡ <b>PRO TIPS:</b>\n\n"
+            "💡 Works with public videos only\n"
+            "💡 Private/deleted videos won't work\n"
+            "💡 Age-restricted content may have limitations\n"
+            "💡 Rate limited to prevent spam (3s cooldown after 2 quick requests)\n"
+            "💡 Send up to 10 links in one message\n"
+            "💡 <code>/watch &lt;link&gt; [target]</code> alerts you at new view tiers\n"
+            "💡 Type my @username and a link in any chat to share a stats card\n\n"
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "❓ <b>Need Help?</b> Type /help anytime!\n"
+            "━━━━━━━━━━━━━━━━━━━━"
+        )
+
+    @staticmethod
+    def busy_message() -> str:
+        return (
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🚦 <b>BOT IS BUSY</b> 🚦\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "😅 Too many videos are being analyzed right now.\n\n"
+            "💡 <i>Please try again in a few seconds!</i>"
+        )
+
+    @staticmethod
+    def throttled_message(retry_after: float) -> str:
+        minutes = max(1, math.ceil(retry_after / 60))
+        return (
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🛑 <b>YOUTUBE IS LIMITING US</b> 🛑\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "😔 YouTube is temporarily refusing new lookups from this bot.\n"
+            "Videos analyzed recently still work.\n\n"
+            f"💡 <i>Please try again in about {minutes} minute(s)!</i>"
+        )
+
+    @staticmethod
+    def unexpected_error_message(error: Exception) -> str:
+        return (
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            "⚠️ <b>UNEXPECTED ERROR</b> ⚠️\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🔧 <b>Something went wrong!</b>\n\n"
+            "<b>Please try:</b>\n"
+            "✓ Verifying the URL is correct\n"
+            "✓ Trying a different video\n"
+            "✓ Waiting a moment and retrying\n"
+            "✓ Using /help for guidance\n\n"
+            f"📝 <b>Error:</b>\n<code>{html.escape(str(error)[:200])}</code>\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "💡 If this persists, the video may have special restrictions."
+        )
+
+    @staticmethod
+    def about_message() -> str:
+        return (
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "ℹ️ <b>ABOUT THIS BOT</b> ℹ️\n"
+            "━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🤖 <b>YouTube Analyzer Bot v3.0</b>\n\n"
+            "🎯 <b>Purpose:</b>\n"
+            "Advanced YouTube video analytics and statistics bot "
+            "that provides comprehensive insights into any public YouTube video.\n\n"
+            "⚙️ <b>Technology Stack:</b>\n"
+            "• Python 3.x\n"
+            "• python-telegram-bot\n"
+            "• yt-dlp (YouTube data extraction)\n"
+            "• Modern async/await architecture\n\n"
+            "✨ <b>Features:</b>\n"
+            "• Real-time video statistics\n"
+            "• Advanced engagement analytics\n"
+            "• Performance grading system\n"
+            "• Visual progress indicators\n"
+            "• Channel intelligence\n"
+            "• Rate limiting & security\n"
+            "• Beautiful formatting\n\n"
+            "🔒 <b>Privacy & Security:</b>\n"
+            "• Only public video stats are cached\n"
+            "• No tracking\n"
+            "• Rate-limited requests\n"
+            "• Public API usage only\n\n"
+            "━━━━━━━━━━━━━━━━━━━━\n"
+            "💝 Made with ❤️ for YouTube enthusiasts\n"
+            "━━━━━━━━━━━━━━━━━━━━"
+        )
+
+
+# ================================
+# COMMAND HANDLERS
+# ================================
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /start command"""
+    user = update.effective_user
+    logger.info(f"User {user.id} ({user.username}) started the bot")
+    await reply(update.message, MessageTemplates.welcome_message(), parse_mode="HTML")
+
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /help command"""
+    await reply(update.message, MessageTemplates.help_message(), parse_mode="HTML")
+
+
+async def about_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /about command"""
+    await reply(update.message, MessageTemplates.about_message(), parse_mode="HTML")
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /stats command - show live bot statistics"""
+
+    def ms(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "n/a"
+        if seconds == float("inf"):
+            return f"&gt;{Histogram.BUCKETS[-1]:.0f}s"
+        return f"&lt;{seconds * 1000:.0f} ms" if seconds < 1 else f"&lt;{seconds:g} s"
+
+    request = metrics.histogram("ytbot_phase_seconds", phase="request")
+    extraction = metrics.histogram("ytbot_phase_seconds", phase="extraction")
+    hits, misses = state_backend.cache_hits, state_backend.cache_misses
+    hit_ratio = hits / (hits + misses) if hits + misses else 0.0
+    errors = metrics.counters_by_label("ytbot_errors_total", "type")
+    error_lines = "".join(
+        f"• {html.escape(name)}: {count:.0f}\n"
+        for name, count in sorted(errors.items(), key=lambda kv: -kv[1])[:3]
+    )
+    scheduler = extraction_pool.scheduler
+
+    stats_msg = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "📊 <b>BOT STATISTICS</b> 📊\n"
+        "━━━━━━━━━━━━━━━━━━━━\n\n"
+        "🤖 <b>Bot Version:</b> 3.0 Pro Edition\n"
+        f"📈 <b>Uptime:</b> {TimeFormatter.format_duration(max(1, int(time.time() - metrics.started)))}\n"
+        f"📨 <b>Requests:</b> {NumberFormatter.format_large(request.count)}\n"
+        f"🔄 <b>Response Time:</b> p50 {ms(request.quantile(0.5))}"
+        f" · p95 {ms(request.quantile(0.95))}\n"
+        f"📡 <b>Extraction:</b> p50 {ms(extraction.quantile(0.5))}"
+        f" · p95 {ms(extraction.quantile(0.95))}\n"
+        f"🎯 <b>Cache Hit Ratio:</b> {hit_ratio:.0%}"
+        f" ({NumberFormatter.format_large(hits)} hits)\n"
+        f"⚙️ <b>Workers:</b> {scheduler.active}/{scheduler.max_active} busy,"
+        f" {scheduler.waiting} queued\n"
+        f"🛡️ <b>Rate Limit:</b> {Config.RATE_LIMIT_SECONDS}s cooldown"
+        f" after {Config.RATE_LIMIT_BURST} quick requests"
+        f" ({metrics.counter_total('ytbot_rate_limited_total'):.0f} throttled)\n"
+        f"🔌 <b>YouTube Circuit:</b> {extraction_breaker.state}"
+        f" ({extraction_breaker.rejected} fast-failed)\n\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        f"⚠️ <b>Errors:</b> {sum(errors.values()):.0f}\n"
+        f"{error_lines}\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "💡 Send a YouTube link to get started!\n"
+        "━━━━━━━━━━━━━━━━━━━━"
+    )
+    await reply(update.message, stats_msg, parse_mode="HTML")
+
+
+# ================================
+# VIDEO EXTRACTION
+# ================================
+
+
+class ExtractionQueueFull(Exception):
+    """Raised when the extraction pool cannot accept more work"""
+
+
+class FairScheduler:
+    """Round-robin admission across users with per-user in-flight caps"""
+
+    def __init__(
+        self,
+        max_active: int,
+        max_waiting: int,
+        timeout: float,
+        max_per_owner: int = Config.SCHEDULER_MAX_PER_USER,
+    ):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.max_per_owner = max_per_owner
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+        # Running estimate used for the "estimated wait" shown to users
+        self.avg_job_seconds = 5.0
+        # owner -> queued gates; dict order is the round-robin rotation
+        self._queues: "OrderedDict[Any, deque[asyncio.Future]]" = OrderedDict()
+        self._running: Dict[Any, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, owner: Any = None):
+        """Hold one unit of capacity; raises ExtractionQueueFull when shed"""
+        queued_at = time.perf_counter()
+        gate = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(owner, deque()).append(gate)
+        self.waiting += 1
+        self._dispatch()
+
+        if not gate.done():
+            if self.waiting > self.max_waiting:
+                self._remove(owner, gate)
+                self.shed += 1
+                raise ExtractionQueueFull(f"{self.waiting} requests already queued")
+
+            try:
+                await asyncio.wait_for(gate, self.timeout)
+            except BaseException as e:
+                if gate.done() and not gate.cancelled():
+                    # Dispatched at the same moment we gave up
+                    self._release(owner)
+                else:
+                    self._remove(owner, gate)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.shed += 1
+                    raise ExtractionQueueFull(f"no capacity within {self.timeout}s")
+                raise
+
+        metrics.observe(
+            "ytbot_phase_seconds", time.perf_counter() - queued_at, phase="queue"
+        )
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * elapsed
+            self._release(owner)
+
+    def _dispatch(self):
+        while self.active < self.max_active:
+            for owner, gates in self._queues.items():
+                if self._running.get(owner, 0) < self.max_per_owner:
+                    break
+            else:
+                # Nothing queued, or every queued owner is at its cap
+                return
+
+            gate = gates.popleft()
+            if gates:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            self.waiting -= 1
+            self.active += 1
+            self._running[owner] = self._running.get(owner, 0) + 1
+            gate.set_result(None)
+
+    def _remove(self, owner: Any, gate: asyncio.Future):
+        gates = self._queues.get(owner)
+        if gates is not None and gate in gates:
+            gates.remove(gate)
+            if not gates:
+                del self._queues[owner]
+            self.waiting -= 1
+
+    def _release(self, owner: Any):
+        self.active -= 1
+        self._running[owner] -= 1
+        if not self._running[owner]:
+            del self._running[owner]
+        self._dispatch()
+
+    def queue_status(self, owner: Any) -> Optional[tuple[int, float]]:
+        """(position, estimated wait seconds) of owner's next job, if queued"""
+        if owner not in self._queues:
+            return None
+
+        # Every owner ahead in the rotation gets one dispatch first
+        position = 1
+        for queued_owner in self._queues:
+            if queued_owner == owner:
+                break
+            position += 1
+        rounds = math.ceil(position / self.max_active)
+        return position, rounds * self.avg_job_seconds
+
+
+class ExtractionPool:
+    """Runs blocking yt-dlp extraction off the event loop"""
+
+    def __init__(
+        self,
+        workers: int = Config.EXTRACTION_WORKERS,
+        executor_type: str = Config.EXTRACTION_EXECUTOR,
+        queue_size: int = Config.EXTRACTION_QUEUE_SIZE,
+        queue_timeout: float = Config.EXTRACTION_QUEUE_TIMEOUT,
+    ):
+        self.workers = workers
+        self.executor_type = executor_type
+        # Work waits here rather than in the executor's unbounded queue
+        self.scheduler = FairScheduler(workers, queue_size, queue_timeout)
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Create the underlying executor on first use"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="yt-extract"
+                )
+        return self._executor
+
+    async def run(self, func, *args, owner: Any = None):
+        """Run func(*args) on the pool on behalf of owner (a user ID)"""
+        async with self.scheduler.slot(owner):
+            loop = asyncio.get_running_loop()
+            with metrics.timer("ytbot_phase_seconds", phase="extraction"):
+                return await loop.run_in_executor(self.executor, func, *args)
+
+    def shutdown(self):
+        """Stop worker threads/processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+extraction_pool = ExtractionPool()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, factory):
+        """Await factory() once per key; concurrent callers share the result"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight extraction for: {key}")
+
+        # Shield so one caller giving up does not cancel it for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+extraction_flights = SingleFlight()
+
+
+class CircuitOpen(ExtractionQueueFull):
+    """Raised instead of extracting while YouTube is throttling the bot"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"YouTube is throttling extraction, retry in {retry_after:.0f}s"
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stop extracting while YouTube throttles the bot
+
+    Failures are classified and kept for a sliding window. Enough
+    throttling failures open the circuit: calls fail fast with
+    CircuitOpen. After the open period, up to `probes` calls are let
+    through (half-open); a success closes the circuit, another throttle
+    reopens it for twice as long, up to max_open_seconds.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half-open", "open"
+
+    # Substrings of yt-dlp errors caused by rate limiting, not by the video
+    THROTTLE_MARKERS = (
+        "http error 429",
+        "too many requests",
+        "sign in to confirm",
+        "not a bot",
+    )
+
+    def __init__(
+        self,
+        window_seconds: float = Config.BREAKER_WINDOW_SECONDS,
+        threshold: int = Config.BREAKER_FAILURE_THRESHOLD,
+        ratio: float = Config.BREAKER_FAILURE_RATIO,
+        open_seconds: float = Config.BREAKER_OPEN_SECONDS,
+        max_open_seconds: float = Config.BREAKER_MAX_OPEN_SECONDS,
+        probes: int = Config.BREAKER_PROBES,
+    ):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.ratio = ratio
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probes = probes
+        self.state = self.CLOSED
+        self.opened_until = 0.0
+        self.backoff = open_seconds
+        self.rejected = 0
+        self._events: deque[tuple[float, str]] = deque()
+        self._probing = 0
+
+    @classmethod
+    def classify(cls, exc: BaseException) -> str:
+        """'throttled', 'unavailable' (the video itself) or 'error'"""
+        message = str(exc).lower()
+        if any(marker in message for marker in cls.THROTTLE_MARKERS):
+            return "throttled"
+        if isinstance(exc, yt_dlp.utils.DownloadError):
+            return "unavailable"
+        return "error"
+
+    def counts(self) -> Dict[str, int]:
+        """Outcomes per class inside the sliding window"""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+        counts: Dict[str, int] = {}
+        for _, outcome in self._events:
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+    def _admit(self) -> bool:
+        """Return whether this call is a probe; raise CircuitOpen to reject it"""
+        now = time.monotonic()
+        if self.state == self.OPEN and now >= self.opened_until:
+            self.state = self.HALF_OPEN
+            logger.info("Extraction circuit half-open, probing YouTube")
+        if self.state == self.CLOSED:
+            return False
+        if self.state == self.HALF_OPEN and self._probing < self.probes:
+            self._probing += 1
+            return True
+
+        self.rejected += 1
+        raise CircuitOpen(max(self.opened_until - now, 1.0))
+
+    def _open(self, seconds: float):
+        self.state = self.OPEN
+        self.opened_until = time.monotonic() + seconds
+        logger.warning(f"Extraction circuit open for {seconds:.0f}s: {self.counts()}")
+
+    def _record(self, outcome: Optional[str], probe: bool):
+        if probe:
+            self._probing -= 1
+        if outcome is None:
+            return
+        self._events.append((time.monotonic(), outcome))
+        metrics.inc("ytbot_extraction_outcomes_total", outcome=outcome)
+
+        if probe and outcome == "ok":
+            self.state = self.CLOSED
+            self.backoff = self.open_seconds
+            self._events.clear()
+            logger.info("Extraction circuit closed")
+        elif probe and outcome == "throttled":
+            self.backoff = min(self.backoff * 2, self.max_open_seconds)
+            self._open(self.backoff)
+        elif self.state == self.CLOSED and outcome == "throttled":
+            counts = self.counts()
+            throttled = counts.get("throttled", 0)
+            if (
+                throttled >= self.threshold
+                and throttled / sum(counts.values()) >= self.ratio
+            ):
+                self._open(self.backoff)
+
+    async def call(self, factory):
+        """Await factory() unless the circuit is open"""
+        probe = self._admit()
+        try:
+            result = await factory()
+        except ExtractionQueueFull:
+            # Local overload says nothing about YouTube
+            self._record(None, probe)
+            raise
+        except Exception as e:
+            self._record(self.classify(e), probe)
+            raise
+        except BaseException:
+            self._record(None, probe)
+            raise
+        self._record("ok", probe)
+        return result
+
+
+extraction_breaker = CircuitBreaker()
+
+
+YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": False,
+    "skip_download": True,
+}
+
+# Metadata-only profile: no player JS download, no signature/n-parameter
+# deciphering, no DASH/HLS manifests and no format selection
+STATS_YDL_OPTS = {
+    **YDL_OPTS,
+    "extractor_args": {
+        "youtube": {
+            "player_skip": ["js", "configs"],
+            "skip": ["dash", "hls", "translated_subs"],
+        }
+    },
+}
+
+# Playlist/channel listing: entries are only enumerated, never resolved
+FLAT_YDL_OPTS = {
+    **YDL_OPTS,
+    "extract_flat": "in_playlist",
+    "lazy_playlist": True,
+    # One extra entry tells a playlist of exactly the limit from a longer one
+    "playlistend": Config.PLAYLIST_MAX_VIDEOS + 1,
+}
+
+YDL_PROFILES = {"full": YDL_OPTS, "stats": STATS_YDL_OPTS, "flat": FLAT_YDL_OPTS}
+
+# Fields the stats profile must return, otherwise the full profile is used
+REQUIRED_STATS_FIELDS = ("id", "title", "view_count")
+
+# URLs are validated as YouTube before extraction, so only this extractor
+# is loaded instead of probing yt-dlp's full extractor list
+VIDEO_IE_KEY = "Youtube"
+COLLECTION_IE_KEY = "YoutubeTab"
+
+
+class YoutubeDLPool:
+    """Pool of long-lived YoutubeDL instances, one checked out per worker"""
+
+    def __init__(
+        self,
+        ydl_opts: Dict[str, Any],
+        ie_keys: tuple[str, ...] = (VIDEO_IE_KEY,),
+        size: int = Config.EXTRACTION_WORKERS,
+        recycle_after: int = Config.YDL_RECYCLE_AFTER,
+    ):
+        self.ydl_opts = ydl_opts
+        self.ie_keys = ie_keys
+        self.size = size
+        self.recycle_after = recycle_after
+        self._idle: "queue.LifoQueue[tuple[yt_dlp.YoutubeDL, int]]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> tuple[yt_dlp.YoutubeDL, int]:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            return self._create(), 0
+        return self._idle.get()
+
+    def _create(self) -> yt_dlp.YoutubeDL:
+        # auto_init=False skips registering every default extractor
+        ydl = yt_dlp.YoutubeDL(self.ydl_opts, auto_init=False)
+        for ie_key in self.ie_keys:
+            ydl.get_info_extractor(ie_key)
+        return ydl
+
+    def _discard(self, ydl: yt_dlp.YoutubeDL):
+        with self._lock:
+            self._created -= 1
+        try:
+            ydl.close()
+        except Exception as e:
+            logger.warning(f"Error closing YoutubeDL instance: {e}")
+
+    @contextmanager
+    def checkout(self):
+        """Borrow an instance for one extraction and return it afterwards"""
+        ydl, uses = self._acquire()
+        try:
+            yield ydl
+        finally:
+            uses += 1
+            if uses >= self.recycle_after:
+                # Recycle so per-instance caches and cookies cannot grow forever
+                self._discard(ydl)
+            else:
+                self._idle.put((ydl, uses))
+
+    def close(self):
+        """Close every idle instance"""
+        while True:
+            try:
+                ydl, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(ydl)
+
+
+# Created lazily so each worker process builds its own pools
+_ydl_pools: Dict[str, YoutubeDLPool] = {}
+
+
+def get_ydl_pool(profile: str) -> YoutubeDLPool:
+    pool = _ydl_pools.get(profile)
+    if pool is None:
+        ie_keys = (
+            (COLLECTION_IE_KEY, VIDEO_IE_KEY) if profile == "flat" else (VIDEO_IE_KEY,)
+        )
+        pool = _ydl_pools.setdefault(
+            profile, YoutubeDLPool(YDL_PROFILES[profile], ie_keys=ie_keys)
+        )
+    return pool
+
+
+def extract_video_info(
+    url: str, profile: str = Config.EXTRACTION_PROFILE
+) -> Dict[str, Any]:
+    """Run yt-dlp metadata extraction for a single video"""
+    if profile == "stats":
+        with get_ydl_pool("stats").checkout() as ydl:
+            # process=False skips format sorting/selection entirely
+            info = ydl.extract_info(
+                url, download=False, ie_key=VIDEO_IE_KEY, process=False
+            )
+        missing = [f for f in REQUIRED_STATS_FIELDS if info.get(f) is None]
+        if not missing:
+            return info
+        logger.info(f"Stats profile missed {missing} for {url}, using full profile")
+
+    with get_ydl_pool("full").checkout() as ydl:
+        return ydl.extract_info(url, download=False, ie_key=VIDEO_IE_KEY)
+
+
+def extract_collection_entries(url: str) -> Dict[str, Any]:
+    """List a playlist or channel cheaply, returning its title and video IDs
+
+    At most PLAYLIST_MAX_VIDEOS IDs are returned; "truncated" says whether
+    the collection had more, and "total" is its size when YouTube reports it.
+    """
+    with get_ydl_pool("flat").checkout() as ydl:
+        info = ydl.extract_info(url, download=False, ie_key=COLLECTION_IE_KEY)
+
+    # Only the IDs leave the worker; the flat entry dicts are dropped here
+    video_ids = []
+    listed = 0
+    for entry in info.get("entries") or []:
+        listed += 1
+        if listed > Config.PLAYLIST_MAX_VIDEOS:
+            break
+        if entry and entry.get("ie_key", VIDEO_IE_KEY) == VIDEO_IE_KEY:
+            video_ids.append(entry["id"])
+
+    total = info.get("playlist_count")
+    return {
+        "title": info.get("title") or "Playlist",
+        "video_ids": video_ids,
+        "truncated": listed > Config.PLAYLIST_MAX_VIDEOS
+        or (total or 0) > Config.PLAYLIST_MAX_VIDEOS,
+        "total": total,
+    }
+
+
+def fetch_video_stats(url: str) -> VideoStats:
+    """Extract a video and keep only its VideoStats (runs in workers)
+
+    The raw info dict, with its formats, thumbnails and heatmap, is
+    dropped here so only the small record crosses back to the bot.
+    """
+    return VideoStats.from_info(extract_video_info(url))
+
+
+# Strong references to fire-and-forget refresh tasks
+_background_tasks: set = set()
+
+
+async def _lock_or_peer_result(video_id: str) -> Optional[VideoStats]:
+    """Take the cross-process extraction lock for video_id
+
+    Returns None once the lock is held, or the result another process
+    stored while holding it.
+    """
+    lock_key = f"extract:{video_id}"
+    while not await state_backend.acquire_lock(
+        lock_key, Config.EXTRACTION_LOCK_SECONDS
+    ):
+        await asyncio.sleep(Config.PEER_POLL_INTERVAL)
+        stats = await state_backend.cache_get(video_id, track=False)
+        if stats is not None:
+            return stats
+    return None
+
+
+async def _extract_and_store(
+    url: str, video_id: Optional[str], user_id: Optional[int] = None
+) -> VideoStats:
+    if not video_id:
+        stats = await extraction_breaker.call(
+            lambda: extraction_pool.run(fetch_video_stats, url, owner=user_id)
+        )
+        if stats.id != "N/A":
+            await state_backend.cache_set(
+                stats.id, stats, Config.CACHE_EXPIRY_MINUTES * 60
+            )
+            await metadata_store.put(stats.id, stats)
+            snapshot_store.record(stats)
+        return stats
+
+    peer_stats = await _lock_or_peer_result(video_id)
+    if peer_stats is not None:
+        return peer_stats
+
+    try:
+        stats = await extraction_breaker.call(
+            lambda: extraction_pool.run(
+                fetch_video_stats, URLValidator.canonical_url(video_id), owner=user_id
+            )
+        )
+        await state_backend.cache_set(video_id, stats, Config.CACHE_EXPIRY_MINUTES * 60)
+        await metadata_store.put(video_id, stats)
+        snapshot_store.record(stats)
+        return stats
+    finally:
+        await state_backend.release_lock(f"extract:{video_id}")
+
+
+async def _refresh_in_background(url: str, video_id: str):
+    try:
+        await extraction_flights.do(video_id, lambda: _extract_and_store(url, video_id))
+        logger.info(f"Refreshed stale metadata for video: {video_id}")
+    except Exception as e:
+        logger.warning(f"Background refresh failed for {video_id}: {str(e)}")
+
+
+def schedule_refresh(url: str, video_id: str):
+    """Refresh a stale video in the background without blocking the caller"""
+    task = asyncio.create_task(_refresh_in_background(url, video_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_cached_video_info(url: str) -> Optional[VideoStats]:
+    """Get video info from memory or disk without extracting"""
+    video_id = URLValidator.extract_video_id(url)
+    if not video_id:
+        return None
+
+    cached = await state_backend.cache_get(video_id)
+    if cached is not None:
+        logger.info(f"Cache hit for video: {video_id}")
+        return cached
+
+    stored = await metadata_store.get(video_id)
+    if stored is not None:
+        stats, is_stale = stored
+        if is_stale:
+            # Serve the stale copy now and revalidate behind the scenes
+            logger.info(f"Serving stale metadata for video: {video_id}")
+            schedule_refresh(url, video_id)
+        await state_backend.cache_set(video_id, stats, Config.CACHE_EXPIRY_MINUTES * 60)
+        return stats
+    return None
+
+
+async def get_video_info(
+    url: str, user_id: Optional[int] = None, cache_checked: bool = False
+) -> VideoStats:
+    """Get video info from memory, then disk, then yt-dlp
+
+    cache_checked skips the memory/disk lookup the caller has just made,
+    so a miss is neither looked up nor counted twice.
+    """
+    if not cache_checked:
+        cached = await get_cached_video_info(url)
+        if cached is not None:
+            return cached
+
+    video_id = URLValidator.extract_video_id(url)
+    try:
+        return await extraction_flights.do(
+            video_id or url, lambda: _extract_and_store(url, video_id, user_id)
+        )
+    except CircuitOpen:
+        # Any copy beats none while YouTube is throttling us
+        stored = (
+            await metadata_store.get(video_id, allow_expired=True) if video_id else None
+        )
+        if stored is None:
+            raise
+        logger.info(f"Circuit open, serving expired metadata for: {video_id}")
+        return stored[0]
+
+
+# ================================
+# REPORT RENDERING
+# ================================
+
+
+def format_momentum(label: str, gained: tuple[int, int], window: int) -> str:
+    """One report line for views gained over a recent window"""
+    views, span = gained
+    sign = "+" if views >= 0 else "-"
+    line = f"   └─ {label}: <code>{sign}{NumberFormatter.format_large(abs(views))}</code> views"
+    if span < window:
+        # Not enough history yet; say what the figure actually covers
+        covered = f"{span // 60}m" if span < 3600 else f"{span / 3600:.1f}h"
+        line += f" <i>(last {covered})</i>"
+    return line + "\n"
+
+
+def build_video_report(
+    info: VideoStats, url: str, history: Optional[VideoSeries] = None
+) -> str:
+    """Render the full analysis report for one video"""
+    # ===========================
+    # EXTRACT VIDEO DATA
+    # ===========================
+
+    # Basic info
+    title = info.title
+    description = (info.description or "")[: Config.MAX_DESCRIPTION_LENGTH]
+    video_id = info.id
+
+    # Channel info
+    channel = info.channel
+    channel_url = info.channel_url
+    uploader = info.uploader
+    subscribers = info.channel_follower_count
+    channel_country = info.channel_country
+    is_verified = info.channel_is_verified
+
+    # Statistics
+    views = info.view_count
+    likes = info.like_count
+    comments = info.comment_count
+
+    # Time info
+    upload_date = info.upload_date
+    duration = info.duration
+
+    # Content details
+    categories = info.categories
+    category = categories[0] if categories else "Uncategorized"
+    tags = info.tags[: Config.MAX_TAGS_DISPLAY]
+    location = info.location
+    age_limit = info.age_limit
+
+    # Thumbnail
+    thumbnail = info.thumbnail
+
+    # ===========================
+    # CALCULATE ANALYTICS
+    # ===========================
+
+    # Format numbers
+    views_fmt = NumberFormatter.format_large(views)
+    likes_fmt = NumberFormatter.format_large(likes)
+    comments_fmt = NumberFormatter.format_large(comments)
+    subscribers_fmt = NumberFormatter.format_large(subscribers)
+
+    # Time calculations
+    upload_formatted, time_ago = TimeFormatter.get_time_ago(upload_date)
+    duration_fmt = TimeFormatter.format_duration(duration)
+
+    # Analytics
+    quality_badge = VideoAnalyzer.get_quality_badge(views)
+    engagement_rate = VideoAnalyzer.calculate_engagement_rate(likes, comments, views)
+    like_percentage = VideoAnalyzer.calculate_like_percentage(likes, views)
+    views_per_day = VideoAnalyzer.calculate_views_per_day(views, upload_date)
+    performance_grade = VideoAnalyzer.get_performance_grade(engagement_rate)
+
+    # Visual elements
+    engagement_bar = VisualElements.create_bar(min(engagement_rate * 10, 100))
+    like_bar = VisualElements.create_bar(min(like_percentage * 20, 100))
+    performance_stars = VisualElements.create_emoji_meter(engagement_rate, 10)
+
+    # Age rating
+    age_icon = "🔞" if age_limit >= 18 else "✅"
+    age_text = "18+ Only" if age_limit >= 18 else "Family Friendly"
+
+    # Verification status
+    verify_icon = "✅" if is_verified else "⚪"
+    verify_text = "Verified" if is_verified else "Not Verified"
+
+    # ===========================
+    # BUILD RESPONSE MESSAGE
+    # ===========================
+
+    response = (
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        f"🎬 <b>{title}</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"✨ <b>STATUS:</b> {quality_badge}\n"
+        f"🎯 <b>PERFORMANCE:</b> {performance_stars} {performance_grade}\n\n"
+        "╔═══════════════════════════════╗\n"
+        "║  📺 <b>CHANNEL INFORMATION</b>        ║\n"
+        "╚═══════════════════════════════╝\n\n"
+        f"🎯 <b>Channel:</b> <a href='{channel_url}'>{channel}</a>\n"
+        f"{verify_icon} <b>Status:</b> {verify_text}\n"
+        f"👤 <b>Creator:</b> {uploader}\n"
+        f"👥 <b>Subscribers:</b> {subscribers_fmt}\n"
+        f"   └─ <code>{NumberFormatter.format_with_commas(subscribers)}</code> subscribers\n"
+        f"🌍 <b>Country:</b> {channel_country}\n\n"
+        "╔═══════════════════════════════╗\n"
+        "║  📊 <b>PERFORMANCE ANALYTICS</b>      ║\n"
+        "╚═══════════════════════════════╝\n\n"
+        f"👁️ <b>Total Views:</b> {views_fmt}\n"
+        f"   └─ <code>{NumberFormatter.format_with_commas(views)}</code> views\n"
+    )
+
+    # Add views per day if available
+    if views_per_day:
+        response += f"   └─ <code>{NumberFormatter.format_large(int(views_per_day))}</code> views/day avg\n"
+
+    # Recent velocity from recorded snapshots
+    if history is not None:
+        last_hour = history.views_gained(3600)
+        last_day = history.views_gained(86400)
+        if last_hour:
+            response += format_momentum("Last hour", last_hour, 3600)
+        if last_day and last_day != last_hour:
+            response += format_momentum("Last 24h", last_day, 86400)
+        trend = history.acceleration(3600)
+        if trend is not None:
+            icon = "📈" if trend >= 0 else "📉"
+            response += (
+                f"   └─ {icon} Velocity <code>{trend:+.0f}%</code> vs previous hour\n"
+            )
+
+    response += (
+        f"\n👍 <b>Likes:</b> {likes_fmt}\n"
+        f"   └─ <code>{NumberFormatter.format_with_commas(likes)}</code> people liked\n\n"
+        f"💬 <b>Comments:</b> {comments_fmt}\n"
+        f"   └─ <code>{NumberFormatter.format_with_commas(comments)}</code> comments\n\n"
+        f"📈 <b>Engagement Rate:</b> {engagement_rate:.2f}%\n"
+        f"   {engagement_bar} <code>{engagement_rate:.2f}%</code>\n"
+        f"   └─ Grade: <b>{performance_grade}</b>\n\n"
+        f"⭐ <b>Like Ratio:</b> {like_percentage:.2f}%\n"
+        f"   {like_bar} <code>{like_percentage:.2f}%</code>\n\n"
+        "╔═══════════════════════════════╗\n"
+        "║  🎥 <b>VIDEO DETAILS</b>              ║\n"
+        "╚═══════════════════════════════╝\n\n"
+        f"🆔 <b>Video ID:</b> <code>{video_id}</code>\n"
+        f"📅 <b>Published:</b> {upload_formatted}\n"
+        f"⏰ <b>Uploaded:</b> {time_ago}\n"
+        f"⏱️ <b>Duration:</b> <code>{duration_fmt}</code>\n"
+        f"📁 <b>Category:</b> {category}\n"
+        f"📍 <b>Location:</b> {location}\n"
+        f"{age_icon} <b>Age Rating:</b> {age_text}\n\n"
+    )
+
+    # Tags section
+    if tags:
+        tags_display = " • ".join(f"#{tag}" for tag in tags)
+        response += (
+            "╔═══════════════════════════════╗\n"
+            "║  🏷️ <b>TAGS & KEYWORDS</b>           ║\n"
+            "╚═══════════════════════════════╝\n\n"
+            f"<code>{tags_display}</code>\n\n"
+        )
+
+    # Description
+    response += (
+        "╔═══════════════════════════════╗\n"
+        "║  📝 <b>DESCRIPTION</b>                ║\n"
+        "╚═══════════════════════════════╝\n\n"
+        f"<i>{description}{'...' if len(info.description or '') > Config.MAX_DESCRIPTION_LENGTH else ''}</i>\n\n"
+    )
+
+    # Quick links
+    response += (
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        "🔗 <b>QUICK ACCESS LINKS</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"▶️ <a href='{url}'>Watch Video</a>\n"
+        f"📺 <a href='{channel_url}'>Visit Channel</a>\n"
+    )
+
+    if thumbnail:
+        response += f"🖼️ <a href='{thumbnail}'>View Thumbnail</a>\n"
+
+    response += (
+        "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        "✅ <b>Analysis Complete!</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        "💡 <i>Share this analysis with friends or analyze another video!</i>"
+    )
+
+    return response
+
+
+def build_inline_card(
+    info: VideoStats, url: str, history: Optional[VideoSeries] = None
+) -> str:
+    """Render the compact stats card shared through inline mode"""
+    # Fields yt-dlp reported as null are None, not the VideoStats defaults
+    views = info.view_count or 0
+    likes = info.like_count or 0
+    comments = info.comment_count or 0
+    engagement_rate = VideoAnalyzer.calculate_engagement_rate(likes, comments, views)
+    _, time_ago = TimeFormatter.get_time_ago(info.upload_date)
+
+    channel = html.escape(info.channel or "N/A")
+    if info.channel_url:
+        channel = f"<a href='{html.escape(info.channel_url)}'>{channel}</a>"
+    card = (
+        f"🎬 <b>{html.escape(info.title or 'N/A')}</b>\n"
+        f"📺 {channel}\n\n"
+        f"✨ {VideoAnalyzer.get_quality_badge(views)}\n\n"
+        f"👁️ <b>Views:</b> {NumberFormatter.format_large(views)}\n"
+    )
+    if history is not None:
+        last_day = history.views_gained(86400)
+        if last_day:
+            card += format_momentum("Last 24h", last_day, 86400)
+    card += (
+        f"👍 <b>Likes:</b> {NumberFormatter.format_large(likes)}\n"
+        f"💬 <b>Comments:</b> {NumberFormatter.format_large(comments)}\n"
+        f"📈 <b>Engagement:</b> {engagement_rate:.2f}% · "
+        f"{VideoAnalyzer.get_performance_grade(engagement_rate)}\n"
+        f"⏱️ {TimeFormatter.format_duration(info.duration)} · ⏰ {time_ago}\n\n"
+        f"▶️ <a href='{url}'>Watch Video</a>"
+    )
+    return card
+
+
+HTML_TAG = re.compile(r"<(/?)([a-z]+)[^>]*>", re.IGNORECASE)
+
+
+def visible_length(text: str) -> int:
+    """Length Telegram checks against its limits: UTF-16 units after parsing"""
+    plain = html.unescape(HTML_TAG.sub("", text))
+    return len(plain.encode("utf-16-le")) // 2
+
+
+def split_report(
+    text: str,
+    first_limit: int = Config.MESSAGE_LIMIT,
+    limit: int = Config.MESSAGE_LIMIT,
+) -> list[str]:
+    """Split an HTML report on line boundaries, never inside a tag pair
+
+    The first part fits first_limit (e.g. a photo caption) and may be
+    empty; the others fit limit.
+    """
+    blocks, block, depth = [], [], 0
+    for line in text.split("\n"):
+        block.append(line)
+        depth += sum(-1 if closing else 1 for closing, _ in HTML_TAG.findall(line))
+        if depth <= 0:
+            blocks.append("\n".join(block))
+            block, depth = [], 0
+    if block:
+        blocks.append("\n".join(block))
+
+    parts, current, budget = [], [], first_limit
+    for block in blocks:
+        too_long = visible_length("\n".join([*current, block])) > budget
+        if too_long and (current or not parts):
+            parts.append("\n".join(current).strip("\n"))
+            current, budget = [], limit
+        current.append(block)
+    parts.append("\n".join(current).strip("\n"))
+    return parts[:1] + [part for part in parts[1:] if part.strip()]
+
+
+class PlaylistAggregate:
+    """Running totals for a playlist; memory is O(videos) integers only"""
+
+    def __init__(
+        self,
+        title: str,
+        expected: int,
+        top_n: int = Config.PLAYLIST_TOP_N,
+        truncated: bool = False,
+        total: Optional[int] = None,
+    ):
+        self.title = title
+        self.expected = expected
+        # The listing stopped at PLAYLIST_MAX_VIDEOS; total may be unknown
+        self.truncated = truncated
+        self.total = total
+        self.top_n = top_n
+        self.analyzed = 0
+        self.failed = 0
+        self.total_views = 0
+        self.total_likes = 0
+        self.total_comments = 0
+        self.total_duration = 0
+        self._views = array("q")
+        self._top: list[tuple[int, str, str]] = []
+
+    def add(self, stats: VideoStats):
+        views = stats.view_count or 0
+        self.analyzed += 1
+        self.total_views += views
+        self.total_likes += stats.like_count or 0
+        self.total_comments += stats.comment_count or 0
+        self.total_duration += stats.duration or 0
+        self._views.append(views)
+
+        entry = (views, stats.id, stats.title or "N/A")
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, entry)
+        else:
+            heapq.heappushpop(self._top, entry)
+
+    @property
+    def median_views(self) -> float:
+        return statistics.median(self._views) if self._views else 0
+
+    def top_videos(self) -> list[tuple[int, str, str]]:
+        return sorted(self._top, reverse=True)
+
+
+def build_playlist_report(agg: PlaylistAggregate, done: bool) -> str:
+    """Render playlist/channel totals; shows progress until done"""
+    processed = agg.analyzed + agg.failed
+    engagement_rate = VideoAnalyzer.calculate_engagement_rate(
+        agg.total_likes, agg.total_comments, agg.total_views
+    )
+    average_views = agg.total_views // agg.analyzed if agg.analyzed else 0
+
+    response = (
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        f"📚 <b>{html.escape(agg.title)}</b>\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+    )
+
+    if not done:
+        percentage = processed / agg.expected * 100 if agg.expected else 100
+        response += (
+            f"⏳ <b>Analyzing...</b> {processed}/{agg.expected}\n"
+            f"   {VisualElements.create_bar(percentage)} <code>{percentage:.0f}%</code>\n\n"
+        )
+
+    response += (
+        "╔═══════════════════════════════╗\n"
+        "║  📊 <b>PLAYLIST TOTALS</b>            ║\n"
+        "╚═══════════════════════════════╝\n\n"
+        f"📼 <b>Videos Analyzed:</b> {agg.analyzed}\n"
+    )
+    if agg.truncated:
+        total = (
+            NumberFormatter.format_with_commas(agg.total)
+            if agg.total
+            else f"{NumberFormatter.format_with_commas(Config.PLAYLIST_MAX_VIDEOS)}+"
+        )
+        response += (
+            "   └─ ⚠️ Only the first "
+            f"{NumberFormatter.format_with_commas(Config.PLAYLIST_MAX_VIDEOS)} of "
+            f"{total} videos are included\n"
+        )
+    if agg.failed:
+        response += f"   └─ ⚠️ {agg.failed} unavailable\n"
+
+    response += (
+        f"👁️ <b>Total Views:</b> {NumberFormatter.format_large(agg.total_views)}\n"
+        f"   └─ <code>{NumberFormatter.format_with_commas(agg.total_views)}</code> views\n"
+        f"👍 <b>Total Likes:</b> {NumberFormatter.format_large(agg.total_likes)}\n"
+        f"💬 <b>Total Comments:</b> {NumberFormatter.format_large(agg.total_comments)}\n"
+        f"⏱️ <b>Total Duration:</b> <code>{TimeFormatter.format_duration(agg.total_duration)}</code>\n\n"
+        f"📊 <b>Median Views:</b> {NumberFormatter.format_large(int(agg.median_views))}\n"
+        f"📈 <b>Average Views:</b> {NumberFormatter.format_large(average_views)}\n"
+        f"🎯 <b>Engagement Rate:</b> {engagement_rate:.2f}%\n"
+        f"   └─ Grade: <b>{VideoAnalyzer.get_performance_grade(engagement_rate)}</b>\n\n"
+    )
+
+    top = agg.top_videos()
+    if top:
+        response += (
+            "╔═══════════════════════════════╗\n"
+            f"║  🏆 <b>TOP {len(top)} VIDEOS</b>               ║\n"
+            "╚═══════════════════════════════╝\n\n"
+        )
+        for rank, (views, video_id, title) in enumerate(top, 1):
+            response += (
+                f"{rank}. <a href='{URLValidator.canonical_url(video_id)}'>"
+                f"{html.escape(title)}</a>\n"
+                f"   └─ <code>{NumberFormatter.format_large(views)}</code> views\n"
+            )
+
+    if done:
+        response += (
+            "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            "✅ <b>Analysis Complete!</b>\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+        )
+    return response
+
+
+def build_comparison_report(videos: list[VideoStats], failed: int = 0) -> str:
+    """Render /compare: videos ranked by views with their derived metrics"""
+    views = np.array([v.view_count or 0 for v in videos], dtype=np.int64)
+    likes = np.array([v.like_count or 0 for v in videos], dtype=np.int64)
+    comments = np.array([v.comment_count or 0 for v in videos], dtype=np.int64)
+
+    engagement = VideoAnalyzer.calculate_engagement_rate_array(likes, comments, views)
+    like_percentage = VideoAnalyzer.calculate_like_percentage_array(likes, views)
+    views_per_day = VideoAnalyzer.calculate_views_per_day_array(
+        views, [v.upload_date for v in videos]
+    )
+    grades = VideoAnalyzer.get_performance_grade_array(engagement)
+    order = np.argsort(-views, kind="stable")
+
+    response = (
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        f"⚖️ <b>VIDEO COMPARISON</b> ({len(videos)} videos)\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+    )
+    if failed:
+        response += f"⚠️ {failed} unavailable video(s) skipped\n\n"
+
+    response += "<code> #  VIEWS   ENG%  LIKE%   /DAY GR</code>\n"
+    for rank, i in enumerate(order, 1):
+        per_day = (
+            NumberFormatter.format_large(int(views_per_day[i]))
+            if not np.isnan(views_per_day[i])
+            else "N/A"
+        )
+        response += (
+            f"<code>{rank:>2} {NumberFormatter.format_large(int(views[i])):>6} "
+            f"{engagement[i]:>6.2f} {like_percentage[i]:>6.2f} {per_day:>6} "
+            f"{grades[i].split()[0]:<2}</code> "
+            f"<a href='{URLValidator.canonical_url(videos[i].id)}'>"
+            f"{html.escape((videos[i].title or 'N/A')[:32])}</a>\n"
+        )
+
+    best_engagement = int(np.argmax(engagement))
+    response += (
+        "\n🏆 <b>Most viewed:</b> "
+        f"{html.escape(videos[order[0]].title or 'N/A')}\n"
+        "🎯 <b>Best engagement:</b> "
+        f"{html.escape(videos[best_engagement].title or 'N/A')} "
+        f"(<code>{engagement[best_engagement]:.2f}%</code>)\n"
+    )
+    if not np.isnan(views_per_day).all():
+        fastest = int(np.nanargmax(views_per_day))
+        response += (
+            "🚀 <b>Fastest growing:</b> "
+            f"{html.escape(videos[fastest].title or 'N/A')} "
+            f"(<code>{NumberFormatter.format_large(int(views_per_day[fastest]))}</code>"
+            " views/day)\n"
+        )
+
+    response += (
+        "\n<i>ENG = engagement rate, LIKE = like ratio, "
+        "/DAY = average views per day, GR = grade</i>"
+    )
+    return response
+
+
+# ================================
+# MAIN VIDEO ANALYSIS HANDLER
+# ================================
+
+
+async def report_queue_position(processing_msg, user_id: int):
+    """Edit the processing message whenever the user's queue position changes"""
+    last_position = None
+    while True:
+        await asyncio.sleep(Config.QUEUE_STATUS_INTERVAL)
+        status = extraction_pool.scheduler.queue_status(user_id)
+        if status is None or status[0] == last_position:
+            continue
+
+        position, eta = status
+        last_position = position
+        try:
+            await edit(
+                processing_msg,
+                "⏳ <b>Analyzing Video...</b>\n\n"
+                f"🚦 <b>Queue position:</b> #{position}\n"
+                f"⏱️ <b>Estimated wait:</b> ~{math.ceil(eta)}s\n\n"
+                "<i>Lots of requests right now, thanks for waiting...</i>",
+                SendQueue.PROGRESS,
+                parse_mode="HTML",
+            )
+        except Exception as e:
+            logger.debug(f"Could not update queue position: {e}")
+
+
+def report_photo_url(info: VideoStats) -> Optional[str]:
+    """Thumbnail URL in a format Telegram accepts for photos"""
+    thumbnail = (info.thumbnail or "").split("?")[0]
+    if thumbnail.lower().endswith((".jpg", ".jpeg", ".png")):
+        return thumbnail
+    if info.id != "N/A":
+        # Every video has this JPEG, unlike the WebP yt-dlp often prefers
+        return f"https://i.ytimg.com/vi/{info.id}/hqdefault.jpg"
+    return None
+
+
+async def send_photo_report(message, info: VideoStats, response: str) -> bool:
+    """Reply with the thumbnail captioned by the report
+
+    The first time, Telegram fetches the photo from its URL; the file_id
+    it returns is stored per video so later reports re-send it without
+    any transfer. Returns False if no photo could be sent.
+    """
+    photo_url = report_photo_url(info)
+    if not photo_url:
+        return False
+
+    caption, *rest = split_report(response, Config.CAPTION_LIMIT)
+    file_id = await metadata_store.get_file_id(info.id, photo_url)
+    for photo in (file_id, photo_url):
+        if not photo:
+            continue
+        try:
+            sent = await send_queue.submit(
+                message.chat_id,
+                lambda photo=photo: message.reply_photo(
+                    photo, caption=caption or None, parse_mode="HTML"
+                ),
+                SendQueue.RESULT,
+            )
+        except BadRequest as e:
+            logger.warning(f"Photo report for {info.id} rejected: {str(e)}")
+            if photo == file_id:
+                await metadata_store.forget_file_id(info.id)
+            continue
+
+        if photo == file_id:
+            metrics.inc("ytbot_photo_reports_total", source="file_id")
+        else:
+            metrics.inc("ytbot_photo_reports_total", source="url")
+            await metadata_store.put_file_id(info.id, photo_url, sent.photo[-1].file_id)
+        for part in rest:
+            await reply(message, part, parse_mode="HTML", disable_web_page_preview=True)
+        return True
+    return False
 
-            response += (
-                f"\n👍 <b>Likes:</b> {likes_fmt}\n"
-                f"   └─ <code>{NumberFormatter.format_with_commas(likes)}</code> people liked\n\n"
-                f"💬 <b>Comments:</b> {comments_fmt}\n"
-                f"   └─ <code>{NumberFormatter.format_with_commas(comments)}</code> comments\n\n"
-                f"📈 <b>Engagement Rate:</b> {engagement_rate:.2f}%\n"
-                f"   {engagement_bar} <code>{engagement_rate:.2f}%</code>\n"
-                f"   └─ Grade: <b>{performance_grade}</b>\n\n"
-                f"⭐ <b>Like Ratio:</b> {like_percentage:.2f}%\n"
-                f"   {like_bar} <code>{like_percentage:.2f}%</code>\n\n"
-                "╔═══════════════════════════════╗\n"
-                "║  🎥 <b>VIDEO DETAILS</b>              ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"🆔 <b>Video ID:</b> <code>{video_id}</code>\n"
-                f"📅 <b>Published:</b> {upload_formatted}\n"
-                f"⏰ <b>Uploaded:</b> {time_ago}\n"
-                f"⏱️ <b>Duration:</b> <code>{duration_fmt}</code>\n"
-                f"📁 <b>Category:</b> {category}\n"
-                f"📍 <b>Location:</b> {location}\n"
-                f"{age_icon} <b>Age Rating:</b> {age_text}\n\n"
-            )
-
-            # Tags section
-            if tags:
-                tags_display = " • ".join(f"#{tag}" for tag in tags)
-                response += (
-                    "╔═══════════════════════════════╗\n"
-                    "║  🏷️ <b>TAGS & KEYWORDS</b>           ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    f"<code>{tags_display}</code>\n\n"
-                )
 
-            # Description
-            response += (
-                "╔═══════════════════════════════╗\n"
-                "║  📝 <b>DESCRIPTION</b>                ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"<i>{description}{'...' if len(info.get('description', '')) > Config.MAX_DESCRIPTION_LENGTH else ''}</i>\n\n"
-            )
+async def analyze_video(update: Update, url: str):
+    """Analyze one video link and reply with its report
 
-            # Quick links
-            response += (
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                "🔗 <b>QUICK ACCESS LINKS</b>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"▶️ <a href='{url}'>Watch Video</a>\n"
-                f"📺 <a href='{channel_url}'>Visit Channel</a>\n"
+    The processing message is edited into the report or error, so each
+    analysis costs two Bot API calls instead of three. Photo reports
+    replace it with a new photo message instead.
+    """
+    user = update.effective_user
+
+    if Config.SKIP_PROCESSING_ON_CACHE_HIT:
+        try:
+            info = await get_cached_video_info(url)
+            if info is not None:
+                with metrics.timer("ytbot_phase_seconds", phase="render"):
+                    response = build_video_report(
+                        info, url, snapshot_store.history(info.id)
+                    )
+                with metrics.timer("ytbot_phase_seconds", phase="send"):
+                    if not (
+                        Config.PHOTO_REPORTS
+                        and await send_photo_report(update.message, info, response)
+                    ):
+                        await reply(
+                            update.message,
+                            response,
+                            parse_mode="HTML",
+                            disable_web_page_preview=True,
+                        )
+                logger.info(f"Served cached video: {url} for user {user.id}")
+                return
+        except Exception as e:
+            metrics.inc("ytbot_errors_total", type=type(e).__name__)
+            logger.error(
+                f"Unexpected error for user {user.id}: {str(e)}", exc_info=True
+            )
+            await reply(
+                update.message,
+                MessageTemplates.unexpected_error_message(e),
+                parse_mode="HTML",
             )
+            return
+
+    # Show processing message
+    processing_msg = await reply(
+        update.message,
+        "⏳ <b>Analyzing Video...</b>\n\n"
+        "🔍 Extracting video data...\n"
+        "📡 Fetching statistics...\n"
+        "📊 Calculating analytics...\n"
+        "🎨 Generating report...\n\n"
+        "<i>This will only take a moment...</i>",
+        SendQueue.REPLY,
+        parse_mode="HTML",
+    )
 
-            if thumbnail:
-                response += f"🖼️ <a href='{thumbnail}'>View Thumbnail</a>\n"
+    # Keep the processing message updated while the job waits its turn
+    status_task = asyncio.create_task(report_queue_position(processing_msg, user.id))
 
-            response += (
-                "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                "✅ <b>Analysis Complete!</b>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "💡 <i>Share this analysis with friends or analyze another video!</i>"
+    try:
+        # Extract video information (served from cache when possible)
+        try:
+            info = await get_video_info(
+                url, user.id, cache_checked=Config.SKIP_PROCESSING_ON_CACHE_HIT
             )
+        finally:
+            status_task.cancel()
 
-            # Delete processing message and send result
-            await processing_msg.delete()
-            await update.message.reply_text(
-                response, parse_mode="HTML", disable_web_page_preview=True
-            )
+        with metrics.timer("ytbot_phase_seconds", phase="render"):
+            response = build_video_report(info, url, snapshot_store.history(info.id))
+
+        # Replace the processing message with the result
+        with metrics.timer("ytbot_phase_seconds", phase="send"):
+            if Config.PHOTO_REPORTS and await send_photo_report(
+                update.message, info, response
+            ):
+                await send_queue.submit(
+                    processing_msg.chat_id,
+                    processing_msg.delete,
+                    SendQueue.RESULT,
+                    key=(processing_msg.chat_id, processing_msg.message_id),
+                )
+            else:
+                await edit(
+                    processing_msg,
+                    response,
+                    parse_mode="HTML",
+                    disable_web_page_preview=True,
+                )
+
+        logger.info(f"Successfully analyzed video: {url} for user {user.id}")
 
-            logger.info(f"Successfully analyzed video: {video_id} for user {user.id}")
+    except CircuitOpen as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
+        await edit(
+            processing_msg,
+            MessageTemplates.throttled_message(e.retry_after),
+            parse_mode="HTML",
+        )
+
+    except ExtractionQueueFull as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
+        logger.warning(f"Extraction queue full for user {user.id}: {str(e)}")
+        await edit(processing_msg, MessageTemplates.busy_message(), parse_mode="HTML")
 
     except yt_dlp.utils.DownloadError as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
         logger.error(f"Download error for user {user.id}: {str(e)}")
-        await processing_msg.delete()
         error_msg = (
             "━━━━━━━━━━━━━━━━━━━━━━━━\n"
             "❌ <b>VIDEO UNAVAILABLE</b> ❌\n"
@@ -715,26 +3503,639 @@ async def get_youtube_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"📝 <code>{str(e)[:200]}</code>\n\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━"
         )
-        await update.message.reply_text(error_msg, parse_mode="HTML")
+        await edit(processing_msg, error_msg, parse_mode="HTML")
 
     except Exception as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
         logger.error(f"Unexpected error for user {user.id}: {str(e)}", exc_info=True)
-        await processing_msg.delete()
-        error_msg = (
+        await edit(
+            processing_msg,
+            MessageTemplates.unexpected_error_message(e),
+            parse_mode="HTML",
+        )
+
+
+async def analyze_collection(update: Update, url: str):
+    """Analyze a playlist or channel, streaming totals as batches finish"""
+    user = update.effective_user
+    processing_msg = await reply(
+        update.message,
+        "⏳ <b>Analyzing Playlist...</b>\n\n"
+        "📜 Listing videos...\n\n"
+        "<i>Large playlists are processed in batches...</i>",
+        SendQueue.REPLY,
+        parse_mode="HTML",
+    )
+
+    try:
+        listing = await extraction_breaker.call(
+            lambda: extraction_pool.run(extract_collection_entries, url, owner=user.id)
+        )
+        video_ids = listing["video_ids"]
+        agg = PlaylistAggregate(
+            listing["title"],
+            len(video_ids),
+            truncated=listing["truncated"],
+            total=listing["total"],
+        )
+        last_edit = time.monotonic()
+
+        for start in range(0, len(video_ids), Config.PLAYLIST_BATCH_SIZE):
+            batch = video_ids[start : start + Config.PLAYLIST_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(
+                    get_video_info(URLValidator.canonical_url(v), user.id)
+                    for v in batch
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, ExtractionQueueFull):
+                    raise result
+                if isinstance(result, Exception):
+                    agg.failed += 1
+                else:
+                    agg.add(result)
+
+            # Throttle edits to stay well clear of Telegram's flood limits
+            if time.monotonic() - last_edit >= Config.PLAYLIST_PROGRESS_INTERVAL:
+                await edit(
+                    processing_msg,
+                    build_playlist_report(agg, done=False),
+                    SendQueue.PROGRESS,
+                    parse_mode="HTML",
+                    disable_web_page_preview=True,
+                )
+                last_edit = time.monotonic()
+
+        await edit(
+            processing_msg,
+            build_playlist_report(agg, done=True),
+            parse_mode="HTML",
+            disable_web_page_preview=True,
+        )
+        logger.info(
+            f"Analyzed playlist {url} ({agg.analyzed}/{agg.expected}) for user {user.id}"
+        )
+
+    except CircuitOpen as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
+        await edit(
+            processing_msg,
+            MessageTemplates.throttled_message(e.retry_after),
+            parse_mode="HTML",
+        )
+
+    except ExtractionQueueFull as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
+        logger.warning(f"Extraction queue full for user {user.id}: {str(e)}")
+        await edit(processing_msg, MessageTemplates.busy_message(), parse_mode="HTML")
+
+    except Exception as e:
+        metrics.inc("ytbot_errors_total", type=type(e).__name__)
+        logger.error(f"Playlist error for user {user.id}: {str(e)}", exc_info=True)
+        await edit(
+            processing_msg,
             "━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "⚠️ <b>UNEXPECTED ERROR</b> ⚠️\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "🔧 <b>Something went wrong!</b>\n\n"
-            "<b>Please try:</b>\n"
-            "✓ Verifying the URL is correct\n"
-            "✓ Trying a different video\n"
-            "✓ Waiting a moment and retrying\n"
-            "✓ Using /help for guidance\n\n"
-            f"📝 <b>Error:</b>\n<code>{str(e)[:200]}</code>\n\n"
+            "❌ <b>PLAYLIST UNAVAILABLE</b> ❌\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "💡 If this persists, the video may have special restrictions."
+            "😔 <b>Unable to list this playlist or channel</b>\n\n"
+            f"📝 <code>{html.escape(str(e)[:200])}</code>",
+            parse_mode="HTML",
+        )
+
+
+@rate_limit
+async def get_youtube_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Main handler for YouTube video analysis"""
+    user = update.effective_user
+    started = time.perf_counter()
+    with metrics.timer("ytbot_phase_seconds", phase="validation"):
+        entity_urls = [
+            entity.url or text
+            for entity, text in update.message.parse_entities(
+                [MessageEntity.URL, MessageEntity.TEXT_LINK]
+            ).items()
+        ]
+        urls = URLValidator.find_youtube_urls(update.message.text, entity_urls)
+
+    logger.info(f"User {user.id} requested analysis for: {urls}")
+
+    # Validate YouTube URL
+    if not urls:
+        error_msg = (
+            "❌❌❌ <b>INVALID URL</b> ❌❌❌\n\n"
+            "⚠️ Please send a valid YouTube link:\n\n"
+            "✅ <code>youtube.com/watch?v=...</code>\n"
+            "✅ <code>youtu.be/...</code>\n"
+            "✅ <code>youtube.com/shorts/...</code>\n\n"
+            "💡 <i>Copy the link directly from YouTube's address bar!</i>"
+        )
+        metrics.inc("ytbot_requests_total", kind="invalid")
+        await reply(update.message, error_msg, parse_mode="HTML")
+        return
+
+    # Each report is sent as soon as its video finishes
+    semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_LINKS)
+
+    async def analyze_limited(url: str):
+        async with semaphore:
+            collection_url = URLValidator.collection_url(url)
+            if collection_url:
+                metrics.inc("ytbot_requests_total", kind="collection")
+                await analyze_collection(update, collection_url)
+            else:
+                metrics.inc("ytbot_requests_total", kind="video")
+                await analyze_video(update, url)
+
+    await asyncio.gather(*(analyze_limited(url) for url in urls))
+    metrics.observe(
+        "ytbot_phase_seconds", time.perf_counter() - started, phase="request"
+    )
+
+
+# ================================
+# WATCHLIST
+# ================================
+
+# Every refresh runs as this one scheduler owner, so the watchlist can
+# never hold more than SCHEDULER_MAX_PER_USER extraction workers
+WATCH_OWNER = "watchlist"
+
+# Boundaries between VideoAnalyzer.get_quality_badge tiers
+WATCH_MILESTONES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+_watch_refresh_lock = asyncio.Lock()
+
+
+def crossed_marks(before: int, after: int, target: Optional[int] = None) -> list[int]:
+    """Milestones (and target) passed while views went from before to after"""
+    marks = [m for m in WATCH_MILESTONES if before < m <= after]
+    if target and before < target <= after and target not in marks:
+        marks.append(target)
+    return sorted(marks)
+
+
+def next_watch_interval(
+    views: int, prev_views: int, elapsed: float, targets: tuple = ()
+) -> float:
+    """Seconds until a watched video is checked again
+
+    Growing videos are checked about every WATCH_GROWTH_STEP of growth and
+    around the time their next milestone should be crossed; videos that
+    stopped growing back off to WATCH_MAX_INTERVAL.
+    """
+    rate = (views - prev_views) / elapsed if elapsed > 0 else 0.0
+    if rate <= 0:
+        return Config.WATCH_MAX_INTERVAL
+
+    interval = Config.WATCH_GROWTH_STEP * max(views, WATCH_MILESTONES[0]) / rate
+    upcoming = [m for m in (*WATCH_MILESTONES, *targets) if m and m > views]
+    if upcoming:
+        interval = min(interval, (min(upcoming) - views) / rate)
+    return min(max(interval, Config.WATCH_MIN_INTERVAL), Config.WATCH_MAX_INTERVAL)
+
+
+def _video_id_arg(context: ContextTypes.DEFAULT_TYPE) -> Optional[str]:
+    if not context.args or not URLValidator.is_valid_youtube_url(context.args[0]):
+        return None
+    return URLValidator.extract_video_id(context.args[0])
+
+
+@rate_limit
+async def watch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /watch <link> [target views]"""
+    video_id = _video_id_arg(context)
+    target = None
+    if video_id and len(context.args) > 1:
+        target = NumberFormatter.parse_large(context.args[1])
+    if not video_id or (len(context.args) > 1 and not target):
+        await reply(
+            update.message,
+            "👀 <b>Usage:</b> <code>/watch &lt;video link&gt; [target views]</code>\n\n"
+            "I'll message you when the video reaches a new quality tier "
+            "(1K, 10K, 100K, 1M, 10M, 100M views) or your target, "
+            "e.g. <code>/watch youtu.be/VIDEO_ID 250K</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    try:
+        stats = await get_video_info(
+            URLValidator.canonical_url(video_id), update.effective_user.id
+        )
+    except ExtractionQueueFull:
+        await reply(update.message, MessageTemplates.busy_message(), parse_mode="HTML")
+        return
+    except yt_dlp.utils.DownloadError as e:
+        await reply(
+            update.message,
+            "❌ <b>Unable to fetch this video</b>\n\n"
+            f"📝 <code>{html.escape(str(e)[:200])}</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    views = stats.view_count or 0
+    if target and target <= views:
+        await reply(
+            update.message,
+            f"ℹ️ This video already has <b>{NumberFormatter.format_large(views)}</b> "
+            "views. Pick a higher target.",
+            parse_mode="HTML",
+        )
+        return
+
+    if not await watch_store.add(update.effective_chat.id, stats, target):
+        await reply(
+            update.message,
+            f"⚠️ You can watch up to <b>{Config.WATCH_MAX_PER_CHAT}</b> videos per "
+            "chat. Use /unwatch to free a slot.",
+            parse_mode="HTML",
+        )
+        return
+
+    upcoming = [m for m in (*WATCH_MILESTONES, target) if m and m > views]
+    next_line = (
+        f"🎯 <b>Next alert:</b> {NumberFormatter.format_large(min(upcoming))} views\n"
+        if upcoming
+        else ""
+    )
+    await reply(
+        update.message,
+        "👀 <b>NOW WATCHING</b>\n\n"
+        f"🎬 <b>{html.escape(stats.title or 'N/A')}</b>\n"
+        f"👁️ <b>Views:</b> {NumberFormatter.format_large(views)}\n"
+        f"✨ <b>Status:</b> {VideoAnalyzer.get_quality_badge(views)}\n"
+        f"{next_line}\n"
+        "<i>Checks speed up while the video grows fast. /watchlist shows all.</i>",
+        parse_mode="HTML",
+    )
+
+
+async def unwatch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /unwatch <link>"""
+    video_id = _video_id_arg(context)
+    if not video_id:
+        await reply(
+            update.message,
+            "Usage: <code>/unwatch &lt;video link&gt;</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    if await watch_store.remove(update.effective_chat.id, video_id):
+        await reply(update.message, "✅ Stopped watching this video.")
+    else:
+        await reply(update.message, "ℹ️ This video is not on your watchlist.")
+
+
+async def watchlist_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /watchlist"""
+    rows = await watch_store.for_chat(update.effective_chat.id)
+    if not rows:
+        await reply(
+            update.message,
+            "📭 Your watchlist is empty. Add a video with "
+            "<code>/watch &lt;video link&gt;</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    lines = []
+    now = time.time()
+    for video_id, title, views, next_due, target in rows:
+        target_note = f" · 🎯 {NumberFormatter.format_large(target)}" if target else ""
+        minutes = max(0, math.ceil((next_due - now) / 60))
+        lines.append(
+            f"• <a href='{URLValidator.canonical_url(video_id)}'>"
+            f"{html.escape((title or video_id)[:40])}</a>\n"
+            f"   └─ {NumberFormatter.format_large(views)} views{target_note}"
+            f" · next check in {minutes}m"
+        )
+    await reply(
+        update.message,
+        f"👀 <b>WATCHLIST</b> ({len(rows)}/{Config.WATCH_MAX_PER_CHAT})\n\n"
+        + "\n".join(lines),
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+    )
+
+
+async def notify_watchers(
+    bot: Bot, stats: VideoStats, watchers: list[tuple]
+) -> list[int]:
+    """Announce milestones each watcher has not been told about yet
+
+    Returns the chats that are up to date: told, or with nothing to tell.
+    """
+    views = stats.view_count or 0
+    url = URLValidator.canonical_url(stats.id)
+    notified = []
+    for chat_id, target, notified_views in watchers:
+        marks = crossed_marks(notified_views, views, target)
+        if not marks:
+            notified.append(chat_id)
+            continue
+
+        target_line = (
+            f"🎯 <b>Your target of {NumberFormatter.format_large(target)} views "
+            "was reached!</b>\n"
+            if target in marks
+            else ""
+        )
+        text = (
+            "🔔 <b>WATCHLIST ALERT</b> 🔔\n\n"
+            f"🎬 <b>{html.escape(stats.title or 'N/A')}</b> just passed "
+            f"<b>{NumberFormatter.format_large(marks[-1])}</b> views!\n\n"
+            f"{target_line}"
+            f"✨ <b>Status:</b> {VideoAnalyzer.get_quality_badge(views)}\n"
+            f"👁️ <b>Now at:</b> <code>{NumberFormatter.format_with_commas(views)}</code>"
+            " views\n\n"
+            f"▶️ <a href='{url}'>Watch Video</a>"
+        )
+        try:
+            await send_queue.submit(
+                chat_id,
+                lambda chat_id=chat_id, text=text: bot.send_message(
+                    chat_id, text, parse_mode="HTML", disable_web_page_preview=True
+                ),
+                SendQueue.RESULT,
+            )
+            notified.append(chat_id)
+        except Forbidden:
+            # The user blocked the bot or removed it from the group
+            logger.info(f"Dropping watchlist of unreachable chat {chat_id}")
+            await watch_store.remove(chat_id)
+        except Exception as e:
+            logger.warning(f"Watchlist alert to {chat_id} failed: {e}")
+    return notified
+
+
+async def refresh_watched_video(
+    bot: Bot, video_id: str, views: int, checked_at: float, interval: float
+):
+    url = URLValidator.canonical_url(video_id)
+    try:
+        stats = await extraction_flights.do(
+            video_id, lambda: _extract_and_store(url, video_id, WATCH_OWNER)
+        )
+    except ExtractionQueueFull:
+        # Users come first; the video stays due for the next tick
+        await watch_store.release(video_id, checked_at + interval)
+        return
+    except Exception as e:
+        logger.warning(f"Watchlist refresh failed for {video_id}: {str(e)}")
+        await watch_store.postpone(
+            video_id, min(interval * 2, Config.WATCH_MAX_INTERVAL)
+        )
+        return
+
+    now = time.time()
+    watchers = await watch_store.watchers(video_id)
+    targets = tuple(target for _, target, _ in watchers if target)
+    new_interval = next_watch_interval(
+        stats.view_count or 0, views, now - checked_at, targets
+    )
+    notified = await notify_watchers(bot, stats, watchers)
+    await watch_store.update(stats, now, new_interval, notified)
+
+
+async def refresh_watchlist(context: ContextTypes.DEFAULT_TYPE):
+    """JobQueue callback: refresh at most WATCH_BATCH_SIZE due videos
+
+    Extraction cost is bounded by WATCH_BATCH_SIZE per WATCH_TICK_SECONDS
+    however many videos are watched; overdue videos simply wait their turn.
+    """
+    if _watch_refresh_lock.locked():
+        return
+
+    async with _watch_refresh_lock:
+        due = await watch_store.due(time.time(), Config.WATCH_BATCH_SIZE)
+        if not due:
+            return
+
+        semaphore = asyncio.Semaphore(Config.WATCH_CONCURRENCY)
+
+        async def refresh_limited(row):
+            async with semaphore:
+                await refresh_watched_video(context.bot, *row)
+
+        await asyncio.gather(*(refresh_limited(row) for row in due))
+        logger.info(f"Refreshed {len(due)} watched videos")
+
+
+# ================================
+# VIDEO COMPARISON
+# ================================
+
+
+@rate_limit
+async def compare_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /compare <link> <link> ...: rank up to COMPARE_MAX_VIDEOS videos"""
+    user = update.effective_user
+    entity_urls = [
+        entity.url or text
+        for entity, text in update.message.parse_entities(
+            [MessageEntity.URL, MessageEntity.TEXT_LINK]
+        ).items()
+    ]
+    urls = URLValidator.find_youtube_urls(
+        update.message.text, entity_urls, limit=Config.COMPARE_MAX_VIDEOS
+    )
+    video_ids = [v for v in map(URLValidator.extract_video_id, urls) if v]
+    if len(video_ids) < 2:
+        await reply(
+            update.message,
+            "⚖️ <b>Usage:</b> <code>/compare &lt;link&gt; &lt;link&gt; ...</code>\n\n"
+            f"Send 2 to {Config.COMPARE_MAX_VIDEOS} video links and I'll rank them "
+            "by views with engagement, like ratio and views per day.",
+            parse_mode="HTML",
+        )
+        return
+
+    metrics.inc("ytbot_requests_total", kind="compare")
+    processing_msg = await reply(
+        update.message,
+        f"⏳ <b>Comparing {len(video_ids)} videos...</b>\n\n"
+        "<i>Fetching statistics for every video...</i>",
+        SendQueue.REPLY,
+        parse_mode="HTML",
+    )
+
+    # Bounded so a long list never overflows the shared extraction queue
+    semaphore = asyncio.Semaphore(Config.COMPARE_CONCURRENCY)
+
+    async def fetch(video_id: str) -> VideoStats:
+        async with semaphore:
+            return await get_video_info(URLValidator.canonical_url(video_id), user.id)
+
+    results = await asyncio.gather(
+        *(fetch(v) for v in video_ids), return_exceptions=True
+    )
+    throttled = [r for r in results if isinstance(r, CircuitOpen)]
+    if throttled:
+        metrics.inc("ytbot_errors_total", type=CircuitOpen.__name__)
+        await edit(
+            processing_msg,
+            MessageTemplates.throttled_message(max(e.retry_after for e in throttled)),
+            parse_mode="HTML",
+        )
+        return
+    if any(isinstance(r, ExtractionQueueFull) for r in results):
+        metrics.inc("ytbot_errors_total", type=ExtractionQueueFull.__name__)
+        await edit(processing_msg, MessageTemplates.busy_message(), parse_mode="HTML")
+        return
+
+    videos = [r for r in results if isinstance(r, VideoStats)]
+    if len(videos) < 2:
+        await edit(
+            processing_msg,
+            "❌ <b>Not enough videos to compare</b>\n\n"
+            "At least two of the links must be public, available videos.",
+            parse_mode="HTML",
         )
-        await update.message.reply_text(error_msg, parse_mode="HTML")
+        return
+
+    with metrics.timer("ytbot_phase_seconds", phase="render"):
+        first, *rest = split_report(
+            build_comparison_report(videos, failed=len(results) - len(videos))
+        )
+    await edit(processing_msg, first, parse_mode="HTML", disable_web_page_preview=True)
+    for part in rest:
+        await reply(
+            update.message, part, parse_mode="HTML", disable_web_page_preview=True
+        )
+    logger.info(f"Compared {len(videos)} videos for user {user.id}")
+
+
+# ================================
+# INLINE MODE
+# ================================
+
+
+def _forget_task(task: asyncio.Task):
+    _background_tasks.discard(task)
+    # Nobody may be awaiting an inline extraction that missed its deadline
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Inline extraction failed: {task.exception()}")
+
+
+def inline_article(info: VideoStats, url: str) -> InlineQueryResultArticle:
+    """Stats card result for one video"""
+    views = NumberFormatter.format_large(info.view_count or 0)
+    likes = NumberFormatter.format_large(info.like_count or 0)
+    comments = NumberFormatter.format_large(info.comment_count or 0)
+    return InlineQueryResultArticle(
+        id=info.id,
+        title=info.title or "N/A",
+        description=(
+            f"👁️ {views} · 👍 {likes} · 💬 {comments} · {info.channel or 'N/A'}"
+        ),
+        thumbnail_url=info.thumbnail or None,
+        input_message_content=InputTextMessageContent(
+            build_inline_card(info, url, snapshot_store.history(info.id)),
+            parse_mode="HTML",
+            disable_web_page_preview=True,
+        ),
+    )
+
+
+def inline_notice(result_id: str, title: str, description: str, url: str):
+    """Placeholder result that shares the plain link when chosen"""
+    return InlineQueryResultArticle(
+        id=result_id,
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(url),
+    )
+
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer @bot <link> with a stats card
+
+    Cached videos are answered at once and cached by Telegram for
+    INLINE_CACHE_TIME, so repeats never reach the bot. Misses race
+    extraction against INLINE_DEADLINE_SECONDS; a late extraction keeps
+    running and fills the cache, and the short-lived "loading" answer
+    makes Telegram ask again. Misses take a token from the user's rate
+    limit bucket, so typing links cannot flood the extraction queue.
+    """
+    query = update.inline_query
+    urls = URLValidator.find_youtube_urls(query.query, limit=1)
+    video_id = URLValidator.extract_video_id(urls[0]) if urls else None
+    if not video_id:
+        await query.answer(
+            [],
+            cache_time=Config.INLINE_CACHE_TIME,
+            button=InlineQueryResultsButton(
+                text="Paste a YouTube video link", start_parameter="inline"
+            ),
+        )
+        return
+
+    metrics.inc("ytbot_requests_total", kind="inline")
+    user_id = query.from_user.id
+    url = URLValidator.canonical_url(video_id)
+    cache_time = Config.INLINE_CACHE_TIME
+
+    info = await get_cached_video_info(url)
+    if info is None:
+        allowed, wait_time = await rate_limiter.is_allowed(user_id)
+    if info is not None:
+        metrics.inc("ytbot_inline_answers_total", result="cached")
+        result = inline_article(info, url)
+    elif not allowed:
+        metrics.inc("ytbot_rate_limited_total")
+        metrics.inc("ytbot_inline_answers_total", result="rate_limited")
+        cache_time = Config.INLINE_RETRY_CACHE_TIME
+        result = inline_notice(
+            f"slow:{video_id}",
+            "⏳ Slow down!",
+            f"Try again in {wait_time} seconds",
+            url,
+        )
+    else:
+        task = asyncio.ensure_future(get_video_info(url, user_id, cache_checked=True))
+        _background_tasks.add(task)
+        task.add_done_callback(_forget_task)
+        try:
+            info = await asyncio.wait_for(
+                asyncio.shield(task), Config.INLINE_DEADLINE_SECONDS
+            )
+            metrics.inc("ytbot_inline_answers_total", result="extracted")
+            result = inline_article(info, url)
+        except asyncio.TimeoutError:
+            metrics.inc("ytbot_inline_answers_total", result="loading")
+            cache_time = Config.INLINE_RETRY_CACHE_TIME
+            result = inline_notice(
+                f"loading:{video_id}",
+                "⏳ Fetching stats...",
+                "Still loading, type a space to refresh in a few seconds",
+                url,
+            )
+        except Exception as e:
+            metrics.inc("ytbot_errors_total", type=type(e).__name__)
+            metrics.inc("ytbot_inline_answers_total", result="error")
+            cache_time = Config.INLINE_RETRY_CACHE_TIME
+            busy = isinstance(e, ExtractionQueueFull)
+            result = inline_notice(
+                f"error:{video_id}",
+                "🚦 Bot is busy" if busy else "❌ Video unavailable",
+                (
+                    "Try again in a moment"
+                    if busy
+                    else "Private, deleted or restricted video"
+                ),
+                url,
+            )
+
+    try:
+        # Inline answers are not chat messages, so they bypass send_queue
+        await query.answer([result], cache_time=cache_time)
+    except BadRequest as e:
+        # The user kept typing and Telegram expired this query
+        logger.debug(f"Inline answer dropped: {e}")
 
 
 # ================================
@@ -742,6 +4143,114 @@ async def get_youtube_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ================================
 
 
+async def on_startup(app):
+    """Open runtime stores, register sampled metrics, start the endpoint"""
+    # Opened here, not at import, so tools importing the module never take
+    # the snapshot log's writer lock away from the bot
+    snapshot_store.open()
+    scheduler = extraction_pool.scheduler
+    metrics.gauge("ytbot_uptime_seconds", lambda: time.time() - metrics.started)
+    metrics.gauge("ytbot_extraction_active", lambda: scheduler.active)
+    metrics.gauge("ytbot_extraction_queued", lambda: scheduler.waiting)
+    metrics.gauge("ytbot_send_queued", lambda: len(send_queue))
+    metrics.gauge("ytbot_watched_videos", lambda: watch_store.watched)
+    metrics.gauge(
+        "ytbot_breaker_open",
+        lambda: int(extraction_breaker.state != CircuitBreaker.CLOSED),
+    )
+    metrics.sampled_counter("ytbot_cache_hits_total", lambda: state_backend.cache_hits)
+    metrics.sampled_counter(
+        "ytbot_cache_misses_total", lambda: state_backend.cache_misses
+    )
+    metrics.sampled_counter("ytbot_extraction_shed_total", lambda: scheduler.shed)
+    metrics.sampled_counter(
+        "ytbot_singleflight_coalesced_total", lambda: extraction_flights.coalesced
+    )
+    metrics.sampled_counter("ytbot_send_retries_total", lambda: send_queue.retries)
+    metrics.sampled_counter("ytbot_send_dropped_total", lambda: send_queue.dropped)
+    metrics.sampled_counter(
+        "ytbot_breaker_rejected_total", lambda: extraction_breaker.rejected
+    )
+
+    if Config.METRICS_PORT:
+        try:
+            app.bot_data["metrics_server"] = await asyncio.start_server(
+                _serve_metrics, Config.METRICS_LISTEN, Config.METRICS_PORT
+            )
+        except OSError as e:
+            # e.g. another bot process on this host already owns the port;
+            # give each process its own METRICS_PORT to scrape them all
+            logger.warning(
+                f"Metrics endpoint disabled, cannot listen on "
+                f"{Config.METRICS_LISTEN}:{Config.METRICS_PORT}: {e}"
+            )
+            return
+        logger.info(
+            f"Metrics at http://{Config.METRICS_LISTEN}:{Config.METRICS_PORT}/metrics"
+        )
+
+
+async def on_shutdown(app):
+    """Release worker pools when the application stops"""
+    server = app.bot_data.pop("metrics_server", None)
+    if server:
+        server.close()
+        await server.wait_closed()
+    await send_queue.close()
+    extraction_pool.shutdown()
+    for pool in _ydl_pools.values():
+        pool.close()
+    metadata_store.close()
+    snapshot_store.close()
+    watch_store.close()
+    state_backend.close()
+
+
+def build_application(
+    bot: Optional[Bot] = None, concurrent_updates=Config.CONCURRENT_UPDATES
+) -> Application:
+    """Build the application with every handler registered
+
+    bot replaces the token-based Bot, e.g. one with a local request
+    backend for load testing.
+    """
+    builder = ApplicationBuilder()
+    builder = builder.bot(bot) if bot else builder.token(Config.BOT_TOKEN)
+    app = (
+        builder.concurrent_updates(concurrent_updates)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
+
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("help", help_command))
+    app.add_handler(CommandHandler("about", about_command))
+    app.add_handler(CommandHandler("stats", stats_command))
+    app.add_handler(CommandHandler("watch", watch_command))
+    app.add_handler(CommandHandler("unwatch", unwatch_command))
+    app.add_handler(CommandHandler("watchlist", watchlist_command))
+    app.add_handler(CommandHandler("compare", compare_command))
+    app.add_handler(InlineQueryHandler(inline_query))
+
+    if app.job_queue is not None:
+        app.job_queue.run_repeating(
+            refresh_watchlist,
+            interval=Config.WATCH_TICK_SECONDS,
+            first=Config.WATCH_TICK_SECONDS,
+            name="watchlist",
+        )
+    else:
+        logger.warning(
+            "JobQueue unavailable (install python-telegram-bot[job-queue]); "
+            "/watch alerts are disabled"
+        )
+
+    # Message handler for YouTube links
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, get_youtube_info))
+    return app
+
+
 def main():
     """Main function to start the bot"""
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
@@ -757,35 +4266,49 @@ def main():
         print("❌ ERROR: Bot token not configured!")
         return
 
+    if Config.BOT_MODE not in ("polling", "webhook"):
+        logger.error(f"Unknown BOT_MODE: {Config.BOT_MODE}")
+        print("❌ ERROR: BOT_MODE must be 'polling' or 'webhook'!")
+        return
+
+    if Config.BOT_MODE == "webhook" and not (
+        Config.WEBHOOK_URL and Config.WEBHOOK_SECRET_TOKEN
+    ):
+        logger.error("Webhook mode needs WEBHOOK_URL and WEBHOOK_SECRET_TOKEN.")
+        print("❌ ERROR: Webhook URL or secret token not configured!")
+        return
+
     try:
         # Build application
         print("🔧 Building application...")
-        app = ApplicationBuilder().token(Config.BOT_TOKEN).build()
-
-        # Register command handlers
         print("📡 Registering command handlers...")
-        app.add_handler(CommandHandler("start", start))
-        app.add_handler(CommandHandler("help", help_command))
-        app.add_handler(CommandHandler("about", about_command))
-        app.add_handler(CommandHandler("stats", stats_command))
-
-        # Register message handler for YouTube links
         print("🔗 Registering YouTube link handler...")
-        app.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, get_youtube_info)
-        )
+        app = build_application()
 
         print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         print("✅ Bot is ONLINE and ready!")
-        print("📻 Listening for YouTube links...")
+        print(f"📻 Listening for YouTube links ({Config.BOT_MODE})...")
         print("🛡️ Rate limiting: Active")
         print("📊 Analytics: Enhanced")
         print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
 
         logger.info("Bot started successfully")
 
-        # Start polling
-        app.run_polling()
+        if Config.BOT_MODE == "webhook":
+            # Telegram's secret token header is checked on every request.
+            # Several processes on different WEBHOOK_PORTs can sit behind
+            # one reverse proxy; re-registering the same URL is harmless.
+            app.run_webhook(
+                listen=Config.WEBHOOK_LISTEN,
+                port=Config.WEBHOOK_PORT,
+                url_path=Config.WEBHOOK_PATH,
+                webhook_url=f"{Config.WEBHOOK_URL.rstrip('/')}/{Config.WEBHOOK_PATH}",
+                secret_token=Config.WEBHOOK_SECRET_TOKEN,
+                max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+            )
+        else:
+            # Start polling
+            app.run_polling()
 
     except Exception as e:
         logger.error(f"Failed to start bot: {str(e)}", exc_info=True)
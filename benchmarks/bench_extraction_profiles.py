@@ -0,0 +1,83 @@
+"""Compare yt-dlp latency of the "stats" and "full" extraction profiles.
+
+Usage:
+    python benchmarks/bench_extraction_profiles.py URL [URL ...] [--rounds N]
+
+Needs network access to YouTube. Each round runs both profiles through
+the bot's pooled YoutubeDL instances, so connection reuse is the same
+for both. The table shows median latency per video and the time saved.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("METADATA_DB_PATH", ":memory:")
+os.environ.setdefault("SNAPSHOT_PATH", "")
+os.environ.setdefault("WATCH_DB_PATH", ":memory:")
+os.environ.setdefault("STATE_BACKEND", "memory")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import YoutubeStats_bot as bot  # noqa: E402
+
+
+def time_profile(url: str, profile: str) -> tuple[float, bool]:
+    """Return (seconds, complete) for one extraction with the given profile"""
+    start = time.perf_counter()
+    with bot.get_ydl_pool(profile).checkout() as ydl:
+        info = ydl.extract_info(
+            url,
+            download=False,
+            ie_key=bot.VIDEO_IE_KEY,
+            process=(profile == "full"),
+        )
+    elapsed = time.perf_counter() - start
+    complete = all(info.get(f) is not None for f in bot.REQUIRED_STATS_FIELDS)
+    return elapsed, complete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", nargs="+", help="YouTube video URLs")
+    parser.add_argument("--rounds", type=int, default=5, help="runs per profile")
+    args = parser.parse_args()
+
+    # Warm both pools so one-time extractor setup is not counted
+    for profile in ("full", "stats"):
+        time_profile(args.urls[0], profile)
+
+    print(f"{'video':<14}{'full ms':>10}{'stats ms':>10}{'saved ms':>10}{'saved':>8}")
+    total_full = total_stats = 0.0
+    incomplete = 0
+    for url in args.urls:
+        timings = {"full": [], "stats": []}
+        for _ in range(args.rounds):
+            for profile in ("full", "stats"):
+                elapsed, complete = time_profile(url, profile)
+                timings[profile].append(elapsed)
+                if profile == "stats" and not complete:
+                    incomplete += 1
+
+        full = statistics.median(timings["full"]) * 1000
+        stats = statistics.median(timings["stats"]) * 1000
+        total_full += full
+        total_stats += stats
+        video_id = bot.URLValidator.extract_video_id(url) or url[:12]
+        print(
+            f"{video_id:<14}{full:>10.0f}{stats:>10.0f}{full - stats:>10.0f}"
+            f"{(full - stats) / full:>8.0%}"
+        )
+
+    count = len(args.urls)
+    print(
+        f"{'mean':<14}{total_full / count:>10.0f}{total_stats / count:>10.0f}"
+        f"{(total_full - total_stats) / count:>10.0f}"
+        f"{(total_full - total_stats) / total_full:>8.0%}"
+    )
+    print(f"\nstats runs missing required fields (would fall back): {incomplete}")
+
+
+if __name__ == "__main__":
+    main()
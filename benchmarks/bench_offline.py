@@ -0,0 +1,199 @@
+"""Benchmark get_youtube_info offline against a recorded corpus.
+
+Usage:
+    python benchmarks/bench_offline.py [--requests N] [--concurrency C]
+                                       [--scenario NAME ...] [--json PATH]
+    python benchmarks/bench_offline.py --record URL [URL ...]
+
+YoutubeDL is replaced by a replay of benchmarks/corpus/*.json and the
+Bot API by an in-process fake, so no network is needed. Each scenario
+reports throughput, p50/p95/p99 handler latency and, from a separate
+tracemalloc pass, peak and retained memory per request. --record saves
+real extract_info results (needs network) as new corpus files.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import offline_fakes as fakes
+from offline_fakes import bot
+
+# Share of requests per kind in the "mixed" scenario
+MIXED_WEIGHTS = {"hit": 0.70, "miss": 0.20, "large": 0.05, "error": 0.05}
+
+# A fresh user per request keeps the rate limiter out of the numbers
+user_ids = itertools.count(10_000_000)
+
+
+def link(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def make_workload(kind: str, count: int, hot_ids: list[str]) -> list[str]:
+    """Return count message texts for one scenario"""
+    rng = random.Random(42)
+    kinds = [kind] * count
+    if kind == "mixed":
+        kinds = rng.choices(
+            list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()), k=count
+        )
+
+    texts = []
+    for k in kinds:
+        if k == "hit":
+            video_id = rng.choice(hot_ids)
+        elif k == "miss":
+            video_id = fakes.video_ids.new(rng.choice(["standard", "short"]))
+        elif k == "large":
+            video_id = fakes.video_ids.new("long_description")
+        else:
+            video_id = fakes.video_ids.error()
+        texts.append(f"check this {link(video_id)}")
+    return texts
+
+
+async def drive(fake_bot, texts: list[str], concurrency: int) -> list[float]:
+    """Feed each text through get_youtube_info and return per-request latency"""
+    context = SimpleNamespace(bot=fake_bot)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(text: str):
+        update = fakes.make_update(fake_bot, next(user_ids), text)
+        async with semaphore:
+            start = time.perf_counter()
+            await bot.get_youtube_info(update, context)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(text) for text in texts))
+    return latencies
+
+
+async def measure_allocations(fake_bot, texts: list[str]) -> tuple[float, float]:
+    """Return (peak KiB, retained bytes) per request, run sequentially"""
+    context = SimpleNamespace(bot=fake_bot)
+    peaks = []
+    tracemalloc.start()
+    retained_start = tracemalloc.get_traced_memory()[0]
+    for text in texts:
+        update = fakes.make_update(fake_bot, next(user_ids), text)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await bot.get_youtube_info(update, context)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        # The fake keeps the last reply per chat; that is not the bot's memory
+        fake_bot.request.last_text.clear()
+    retained = tracemalloc.get_traced_memory()[0] - retained_start
+    tracemalloc.stop()
+    return statistics.mean(peaks) / 1024, retained / len(texts)
+
+
+async def run(args) -> list[dict]:
+    fakes.install_fake_extractor(args.extract_ms / 1000)
+    fake_bot = await fakes.make_bot(args.send_ms / 1000)
+    # Measure the bot itself, not Telegram's flood limits
+    bot.send_queue = bot.SendQueue(*[1e9] * 5)
+
+    # Warm a hot set so "hit" requests are served from the cache
+    hot_ids = [fakes.video_ids.new("standard") for _ in range(50)]
+    await drive(fake_bot, [link(v) for v in hot_ids], concurrency=8)
+
+    results = []
+    for scenario in args.scenario:
+        texts = make_workload(scenario, args.requests, hot_ids)
+        calls_before = fakes.FakeYoutubeDL.calls
+        shed_before = bot.extraction_pool.scheduler.shed
+        start = time.perf_counter()
+        latencies = await drive(fake_bot, texts, args.concurrency)
+        wall = time.perf_counter() - start
+        extractions = fakes.FakeYoutubeDL.calls - calls_before
+        shed = bot.extraction_pool.scheduler.shed - shed_before
+
+        alloc_texts = make_workload(scenario, args.alloc_requests, hot_ids)
+        peak_kib, retained = await measure_allocations(fake_bot, alloc_texts)
+
+        cuts = statistics.quantiles(latencies, n=100)
+        results.append(
+            {
+                "scenario": scenario,
+                "requests": len(latencies),
+                "extractions": extractions,
+                "shed": shed,
+                "throughput": len(latencies) / wall,
+                "p50_ms": cuts[49] * 1000,
+                "p95_ms": cuts[94] * 1000,
+                "p99_ms": cuts[98] * 1000,
+                "peak_kib_per_request": peak_kib,
+                "retained_bytes_per_request": retained,
+            }
+        )
+
+    await fake_bot.shutdown()
+    bot.extraction_pool.shutdown()
+    return results
+
+
+def record(urls: list[str]):
+    """Save real unprocessed extract_info results into the corpus directory"""
+    for url in urls:
+        info = bot.extract_video_info(url, profile="stats")
+        path = os.path.join(fakes.CORPUS_DIR, f"{info['id']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=1, default=str)
+        print(f"recorded {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        default=["hit", "miss", "large", "error", "mixed"],
+        choices=["hit", "miss", "large", "error", "mixed"],
+    )
+    parser.add_argument("--alloc-requests", type=int, default=200)
+    parser.add_argument("--extract-ms", type=float, default=0.0, help="fake yt-dlp")
+    parser.add_argument("--send-ms", type=float, default=0.0, help="fake Bot API")
+    parser.add_argument("--json", metavar="PATH", help="also write results here")
+    parser.add_argument("--record", nargs="+", metavar="URL")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    # Per-request logs (including the expected download errors) would
+    # dominate the output
+    logging.disable(logging.ERROR)
+    results = asyncio.run(run(args))
+
+    print(
+        f"{'scenario':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'extract':>9}{'shed':>6}{'peak KiB':>10}{'kept B':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['scenario']:<10}{r['throughput']:>9.0f}{r['p50_ms']:>9.2f}"
+            f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['extractions']:>9}{r['shed']:>6}"
+            f"{r['peak_kib_per_request']:>10.1f}"
+            f"{r['retained_bytes_per_request']:>9.0f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
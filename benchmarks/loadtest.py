@@ -0,0 +1,225 @@
+"""Find where the bot saturates under open-loop load.
+
+Usage:
+    python benchmarks/loadtest.py [--rates 5,10,20,40] [--workers 2,4,8]
+                                  [--rate-limit 3:2,off] [--concurrency 1,256]
+                                  [--duration S] [--csv PATH]
+
+Synthetic message Updates arrive with Poisson spacing at each offered
+rate and are pushed into the update queue of the Application that
+build_application() returns, exactly as polling or the webhook would.
+The Bot API is answered locally with a fixed delay and yt-dlp is a
+fake that blocks for a lognormally distributed time. Every combination
+of worker pool size, rate-limiter setting and concurrent_updates value
+gives one saturation curve: served latency and outcome mix against
+offered load.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import logging
+import random
+import statistics
+import time
+
+from telegram import Update
+from telegram.ext import TypeHandler
+
+import offline_fakes as fakes
+from offline_fakes import bot
+
+HOT_SET_SIZE = 200
+_chat_ids = itertools.count(1)
+
+
+def parse_rate_limit(value: str) -> tuple[float, int]:
+    """'SECONDS:BURST' or 'off' -> RateLimiter arguments"""
+    if value == "off":
+        return 1e-9, 10**9
+    seconds, burst = value.split(":")
+    return float(seconds), int(burst)
+
+
+def reset_bot_state(args, workers: int, rate_limit: tuple[float, int]):
+    """Give each run fresh caches, counters, pools, buckets and breaker"""
+    bot.metrics = bot.Metrics()
+    bot.state_backend = bot.MemoryStateBackend()
+    bot.metadata_store = bot.MetadataStore(":memory:")
+    bot.snapshot_store = bot.SnapshotStore("")
+    bot.watch_store = bot.WatchStore(":memory:")
+    bot.extraction_breaker = bot.CircuitBreaker()
+    bot.extraction_flights = bot.SingleFlight()
+    bot.extraction_pool = bot.ExtractionPool(
+        workers=workers, queue_size=args.queue_size
+    )
+    bot.rate_limiter = bot.RateLimiter(bot.state_backend, *rate_limit)
+    bot.send_queue = bot.SendQueue(global_rate=args.send_rate)
+    fakes.install_fake_extractor(args.extract_ms / 1000, args.extract_sigma)
+
+
+async def warm_hot_set() -> list[str]:
+    """Cache a set of popular videos the way a running bot would have"""
+    hot_ids = []
+    for _ in range(HOT_SET_SIZE):
+        video_id = fakes.video_ids.new("standard")
+        info = dict(fakes.CORPUS["standard"], id=video_id)
+        await bot.state_backend.cache_set(
+            video_id,
+            bot.VideoStats.from_info(info),
+            bot.Config.CACHE_EXPIRY_MINUTES * 60,
+        )
+        hot_ids.append(video_id)
+    return hot_ids
+
+
+async def run_point(args, workers, rate_limit, concurrency, rate) -> dict:
+    """Offer `rate` updates/s for args.duration seconds and measure outcomes"""
+    reset_bot_state(args, workers, rate_limit)
+    hot_ids = await warm_hot_set()
+    rng = random.Random(7)
+
+    fake_bot = await fakes.make_bot(args.send_ms / 1000)
+    fake_request = fake_bot.request
+    app = bot.build_application(fake_bot, concurrent_updates=concurrency)
+
+    busy_text = bot.MessageTemplates.busy_message()
+    enqueued_at: dict[int, float] = {}
+    served: list[float] = []
+    outcomes = {"served": 0, "throttled": 0, "shed": 0, "failed": 0}
+
+    async def mark_done(update: Update, context):
+        # Group 1 runs only after the bot's own handler has finished
+        latency = time.perf_counter() - enqueued_at.pop(update.update_id)
+        text = fake_request.last_text.pop(update.effective_chat.id, "")
+        if "Slow down" in text:
+            outcomes["throttled"] += 1
+        elif text == busy_text:
+            outcomes["shed"] += 1
+        elif "Analysis Complete" in text:
+            outcomes["served"] += 1
+            served.append(latency)
+        else:
+            outcomes["failed"] += 1
+
+    app.add_handler(TypeHandler(Update, mark_done), group=1)
+
+    async with app:
+        await app.start()
+        start = time.perf_counter()
+        next_at = start
+        sent = 0
+        while next_at < start + args.duration:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            video_id = (
+                rng.choice(hot_ids)
+                if rng.random() < args.hit_ratio
+                else fakes.video_ids.new(rng.choice(["standard", "short"]))
+            )
+            update = fakes.make_update(
+                fake_bot,
+                user_id=rng.randrange(args.users) + 1,
+                text=f"https://youtu.be/{video_id}",
+                chat_id=next(_chat_ids),
+            )
+            enqueued_at[update.update_id] = time.perf_counter()
+            await app.update_queue.put(update)
+            sent += 1
+            next_at += rng.expovariate(rate)
+
+        drain_deadline = time.perf_counter() + args.drain
+        while enqueued_at and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        unfinished = len(enqueued_at)
+        await app.stop()
+
+    bot.extraction_pool.shutdown()
+    cuts = statistics.quantiles(served, n=100) if len(served) > 1 else [0.0] * 99
+    return {
+        "workers": workers,
+        "rate_limit": args.rate_limit_labels[rate_limit],
+        "concurrency": concurrency,
+        "offered_rps": sent / args.duration,
+        "served_rps": outcomes["served"] / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        **{k: v / sent for k, v in outcomes.items()},
+        "unfinished": unfinished / sent,
+    }
+
+
+async def run(args) -> list[dict]:
+    results = []
+    for workers, rate_limit, concurrency in itertools.product(
+        args.workers, args.rate_limits, args.concurrency
+    ):
+        label = args.rate_limit_labels[rate_limit]
+        print(
+            f"\nworkers={workers} rate_limit={label} concurrent_updates={concurrency}"
+        )
+        print(
+            f"{'offered':>8}{'served':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'ok':>6}{'limit':>7}{'shed':>6}{'fail':>6}{'stuck':>7}"
+        )
+        for rate in args.rates:
+            r = await run_point(args, workers, rate_limit, concurrency, rate)
+            results.append(r)
+            print(
+                f"{r['offered_rps']:>8.1f}{r['served_rps']:>8.1f}"
+                f"{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['p99_ms']:>9.0f}"
+                f"{r['served']:>6.0%}{r['throttled']:>7.0%}{r['shed']:>6.0%}"
+                f"{r['failed']:>6.0%}{r['unfinished']:>7.0%}"
+            )
+    return results
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rates", type=lambda v: [float(x) for x in v.split(",")], default="2,5,10,20"
+    )
+    parser.add_argument("--duration", type=float, default=20, help="seconds per rate")
+    parser.add_argument("--drain", type=float, default=40, help="max wait after")
+    parser.add_argument("--workers", type=int_list, default="2,4,8")
+    parser.add_argument(
+        "--queue-size", type=int, default=bot.Config.EXTRACTION_QUEUE_SIZE
+    )
+    parser.add_argument("--rate-limit", default="3:2,off", help="SECONDS:BURST or off")
+    parser.add_argument("--concurrency", type=int_list, default="1,256")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--extract-ms", type=float, default=800, help="median")
+    parser.add_argument("--extract-sigma", type=float, default=0.5)
+    parser.add_argument("--send-ms", type=float, default=40, help="Bot API delay")
+    parser.add_argument(
+        "--send-rate",
+        type=float,
+        default=bot.Config.SEND_GLOBAL_RATE,
+        help="outbound Bot API calls/s",
+    )
+    parser.add_argument("--csv", metavar="PATH", help="also write results here")
+    args = parser.parse_args()
+
+    labels = args.rate_limit.split(",")
+    args.rate_limits = [parse_rate_limit(v) for v in labels]
+    args.rate_limit_labels = dict(zip(args.rate_limits, labels))
+
+    logging.disable(logging.ERROR)
+    results = asyncio.run(run(args))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main()
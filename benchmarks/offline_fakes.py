@@ -0,0 +1,234 @@
+"""Offline stand-ins for YouTube and the Telegram Bot API.
+
+Importing this module points the bot at in-memory state, disables the
+metrics endpoint and loads the info-dict corpus in benchmarks/corpus.
+Call install_fake_extractor() to replace yt_dlp.YoutubeDL with a replay
+of that corpus, and make_bot() for a Bot whose HTTP layer never leaves
+the process.
+"""
+
+import asyncio
+import copy
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from glob import glob
+from typing import Optional
+
+os.environ.setdefault("METADATA_DB_PATH", ":memory:")
+os.environ.setdefault("SNAPSHOT_PATH", "")
+os.environ.setdefault("WATCH_DB_PATH", ":memory:")
+os.environ.setdefault("STATE_BACKEND", "memory")
+os.environ.setdefault("METRICS_PORT", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import yt_dlp  # noqa: E402
+from telegram import Bot, Update  # noqa: E402
+from telegram.request import BaseRequest  # noqa: E402
+
+import YoutubeStats_bot as bot  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Video IDs starting with this prefix make the fake extractor fail
+ERROR_PREFIX = "ERR"
+
+
+def load_corpus(directory: str = CORPUS_DIR) -> dict[str, dict]:
+    """Load every recorded extract_info result, keyed by file name"""
+    corpus = {}
+    for path in sorted(glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            corpus[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+    if not corpus:
+        raise SystemExit(f"No corpus files found in {directory}")
+    return corpus
+
+
+CORPUS = load_corpus()
+
+
+class VideoIds:
+    """Hands out unique 11-character video IDs mapped to corpus entries"""
+
+    def __init__(self):
+        self._counter = itertools.count()
+        self.template: dict[str, str] = {}
+
+    def new(self, template: str) -> str:
+        video_id = f"v{next(self._counter):010d}"
+        self.template[video_id] = template
+        return video_id
+
+    def error(self) -> str:
+        return f"{ERROR_PREFIX}{next(self._counter):08d}"
+
+
+video_ids = VideoIds()
+
+
+class FakeYoutubeDL:
+    """Replays corpus entries in place of yt_dlp.YoutubeDL"""
+
+    # Simulated extraction time in seconds, spent blocking like real yt-dlp;
+    # a non-zero sigma draws it from a lognormal with that median instead
+    latency = 0.0
+    sigma = 0.0
+    calls = 0
+
+    def __init__(self, params=None, auto_init=True):
+        self.params = params or {}
+
+    def get_info_extractor(self, ie_key):
+        return None
+
+    def extract_info(self, url, download=True, ie_key=None, process=True, **kwargs):
+        FakeYoutubeDL.calls += 1
+        if self.latency:
+            if self.sigma:
+                time.sleep(random.lognormvariate(math.log(self.latency), self.sigma))
+            else:
+                time.sleep(self.latency)
+
+        video_id = bot.URLValidator.extract_video_id(url)
+        if video_id.startswith(ERROR_PREFIX):
+            raise yt_dlp.utils.DownloadError(
+                f"ERROR: [youtube] {video_id}: Video unavailable"
+            )
+
+        # yt-dlp builds a fresh dict for every call, so hand out a copy
+        info = copy.deepcopy(CORPUS[video_ids.template.get(video_id, "standard")])
+        info["id"] = video_id
+        return info
+
+    def close(self):
+        pass
+
+
+def install_fake_extractor(latency: float = 0.0, sigma: float = 0.0):
+    """Route every YoutubeDLPool through FakeYoutubeDL"""
+    FakeYoutubeDL.latency = latency
+    FakeYoutubeDL.sigma = sigma
+    bot.yt_dlp.YoutubeDL = FakeYoutubeDL
+    for pool in bot._ydl_pools.values():
+        pool.close()
+    bot._ydl_pools.clear()
+
+
+class FakeTelegramRequest(BaseRequest):
+    """Answers Bot API calls locally with minimal valid results"""
+
+    BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        # Text of the most recent message sent or edited, per chat
+        self.last_text: dict[int, str] = {}
+        self._message_ids = itertools.count(1_000_000)
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        # Abstract from python-telegram-bot 22; nothing here ever blocks on I/O
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(
+        self,
+        url,
+        method,
+        request_data=None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        params = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result = self.BOT_USER
+        elif endpoint in ("sendMessage", "editMessageText", "sendPhoto"):
+            chat_id = int(params.get("chat_id", 0))
+            text = params.get("text") or params.get("caption") or ""
+            self.last_text[chat_id] = text
+            message_id = params.get("message_id") or next(self._message_ids)
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": self.BOT_USER,
+                "text": text,
+            }
+            if endpoint == "sendPhoto":
+                file_id = f"photo-{message_id}"
+                result["photo"] = [
+                    {
+                        "file_id": file_id,
+                        "file_unique_id": file_id,
+                        "width": 480,
+                        "height": 360,
+                    }
+                ]
+        else:
+            # deleteMessage, sendChatAction, answerInlineQuery, ...
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+async def make_bot(latency: float = 0.0) -> Bot:
+    """Build and initialize a Bot backed by FakeTelegramRequest"""
+    fake_bot = Bot(
+        "123456:offline-benchmark",
+        request=FakeTelegramRequest(latency),
+        get_updates_request=FakeTelegramRequest(),
+    )
+    await fake_bot.initialize()
+    return fake_bot
+
+
+_update_ids = itertools.count(1)
+
+
+def make_update(
+    fake_bot: Bot, user_id: int, text: str, chat_id: Optional[int] = None
+) -> Update:
+    """Build a text message Update with URL entities
+
+    chat_id defaults to the user's private chat.
+    """
+    entities = []
+    offset = 0
+    for word in text.split(" "):
+        if word.startswith("http"):
+            entities.append({"type": "url", "offset": offset, "length": len(word)})
+        offset += len(word) + 1
+
+    update_id = next(_update_ids)
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id or user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "User"},
+                "text": text,
+                "entities": entities,
+            },
+        },
+        fake_bot,
+    )
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+# Keep the bot's module-level stores in memory and off the network
+os.environ.setdefault("METADATA_DB_PATH", ":memory:")
+os.environ.setdefault("WATCH_DB_PATH", ":memory:")
+os.environ.setdefault("SNAPSHOT_PATH", "")
+os.environ.setdefault("STATE_BACKEND", "memory")
+os.environ.setdefault("METRICS_PORT", "0")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Fresh bot state with yt-dlp replaced by the benchmark corpus
+
+    Returns the offline_fakes module, whose make_bot() answers Bot API
+    calls locally.
+    """
+    import offline_fakes as fakes
+    import YoutubeStats_bot as bot
+
+    monkeypatch.setattr(bot.yt_dlp, "YoutubeDL", fakes.FakeYoutubeDL)
+    monkeypatch.setattr(bot, "_ydl_pools", {})
+    monkeypatch.setattr(bot, "metrics", bot.Metrics())
+    monkeypatch.setattr(bot, "state_backend", bot.MemoryStateBackend())
+    monkeypatch.setattr(bot, "metadata_store", bot.MetadataStore(":memory:"))
+    monkeypatch.setattr(bot, "snapshot_store", bot.SnapshotStore(""))
+    monkeypatch.setattr(bot, "watch_store", bot.WatchStore(":memory:"))
+    monkeypatch.setattr(bot, "extraction_breaker", bot.CircuitBreaker())
+    monkeypatch.setattr(bot, "extraction_flights", bot.SingleFlight())
+    monkeypatch.setattr(
+        bot, "extraction_pool", bot.ExtractionPool(2, executor_type="thread")
+    )
+    monkeypatch.setattr(
+        bot, "rate_limiter", bot.RateLimiter(bot.state_backend, 1e-9, 10**9)
+    )
+    monkeypatch.setattr(
+        bot,
+        "send_queue",
+        bot.SendQueue(
+            global_rate=1e6,
+            global_burst=1e6,
+            chat_rate=1e6,
+            group_rate=1e6,
+            chat_burst=1e6,
+        ),
+    )
+    yield fakes
+    bot.extraction_pool.shutdown()
+    bot.metadata_store.close()
+    bot.watch_store.close()
@@ -0,0 +1,42 @@
+import asyncio
+
+import YoutubeStats_bot as bot
+
+
+def analyze_twice(fakes):
+    async def scenario():
+        fake_bot = await fakes.make_bot()
+        url = f"https://youtu.be/{fakes.video_ids.new('standard')}"
+        for _ in range(2):
+            await bot.analyze_video(fakes.make_update(fake_bot, 7, url), url)
+        await bot.send_queue.close()
+        return fake_bot.request
+
+    return asyncio.run(scenario())
+
+
+def test_miss_then_hit_is_counted_once_each(offline):
+    request = analyze_twice(offline)
+
+    assert (bot.state_backend.cache_hits, bot.state_backend.cache_misses) == (1, 1)
+    # Miss: processing message edited into the report; hit: one plain reply
+    assert request.calls["sendMessage"] == 2
+    assert request.calls["editMessageText"] == 1
+    assert request.calls["sendChatAction"] == 0
+    assert "VIDEO UNAVAILABLE" not in request.last_text[7]
+
+
+def test_cache_hit_render_error_is_reported(offline, monkeypatch):
+    rendered = []
+
+    def build_video_report(info, url, history=None):
+        if rendered:
+            raise ValueError("bad <data>")
+        rendered.append(info)
+        return "report"
+
+    monkeypatch.setattr(bot, "build_video_report", build_video_report)
+    request = analyze_twice(offline)
+
+    assert "UNEXPECTED ERROR" in request.last_text[7]
+    assert "bad &lt;data&gt;" in request.last_text[7]
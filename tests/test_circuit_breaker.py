@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import pytest
+import yt_dlp
+
+import YoutubeStats_bot as bot
+
+
+def throttled():
+    raise yt_dlp.utils.DownloadError("ERROR: HTTP Error 429: Too Many Requests")
+
+
+def unavailable():
+    raise yt_dlp.utils.DownloadError("ERROR: Video unavailable")
+
+
+def queue_full():
+    raise bot.ExtractionQueueFull("busy")
+
+
+def call(breaker, outcome=lambda: "ok"):
+    async def factory():
+        return outcome()
+
+    return asyncio.run(breaker.call(factory))
+
+
+def fail(breaker, outcome, times=1):
+    for _ in range(times):
+        with pytest.raises(
+            bot.ExtractionQueueFull if outcome is queue_full else Exception
+        ):
+            call(breaker, outcome)
+
+
+def expire(breaker):
+    breaker.opened_until = 0.0
+
+
+def test_classify():
+    classify = bot.CircuitBreaker.classify
+    assert (
+        classify(yt_dlp.utils.DownloadError("Sign in to confirm you're not a bot"))
+        == "throttled"
+    )
+    assert classify(yt_dlp.utils.DownloadError("Private video")) == "unavailable"
+    assert classify(ValueError("boom")) == "error"
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = bot.CircuitBreaker(threshold=3, ratio=0.5)
+    fail(breaker, throttled, 2)
+    assert breaker.state == breaker.CLOSED
+
+    fail(breaker, throttled)
+    assert breaker.state == breaker.OPEN
+    with pytest.raises(bot.CircuitOpen) as raised:
+        call(breaker)
+    assert raised.value.retry_after >= 1
+    assert breaker.rejected == 1
+
+
+def test_ratio_keeps_circuit_closed_when_most_calls_succeed():
+    breaker = bot.CircuitBreaker(threshold=3, ratio=0.5)
+    for _ in range(4):
+        call(breaker)
+    fail(breaker, throttled, 3)
+    assert breaker.state == breaker.CLOSED
+
+
+def test_unavailable_videos_and_local_overload_never_open():
+    breaker = bot.CircuitBreaker(threshold=2, ratio=0.5)
+    fail(breaker, unavailable, 5)
+    fail(breaker, queue_full, 5)
+    assert breaker.state == breaker.CLOSED
+    assert breaker.counts() == {"unavailable": 5}
+
+
+def test_successful_probe_closes():
+    breaker = bot.CircuitBreaker(threshold=1, open_seconds=30)
+    fail(breaker, throttled)
+    expire(breaker)
+
+    assert call(breaker) == "ok"
+    assert breaker.state == breaker.CLOSED
+    assert breaker.backoff == 30
+    assert breaker.counts() == {}
+
+
+def test_throttled_probe_doubles_backoff():
+    breaker = bot.CircuitBreaker(threshold=1, open_seconds=30, max_open_seconds=100)
+    fail(breaker, throttled)
+    for backoff in (60, 100, 100):
+        expire(breaker)
+        fail(breaker, throttled)
+        assert breaker.state == breaker.OPEN
+        assert breaker.backoff == backoff
+
+
+def test_half_open_admits_only_the_probes():
+    async def scenario():
+        breaker = bot.CircuitBreaker(threshold=1, probes=1)
+        with pytest.raises(Exception):
+            await breaker.call(lambda: asyncio.to_thread(throttled))
+        expire(breaker)
+
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+        assert breaker.state == breaker.HALF_OPEN
+        with pytest.raises(bot.CircuitOpen):
+            await breaker.call(slow)
+
+        release.set()
+        assert await probe == "ok"
+        assert breaker.state == breaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def reply_while_open(fakes, handler, text):
+    """Last text a handler sends while the extraction circuit is open"""
+
+    async def scenario():
+        breaker = bot.extraction_breaker
+        breaker.state, breaker.opened_until = breaker.OPEN, time.monotonic() + 600
+        fake_bot = await fakes.make_bot()
+        await handler(fakes.make_update(fake_bot, 7, text))
+        await bot.send_queue.close()
+        return fake_bot.request.last_text[7]
+
+    return asyncio.run(scenario())
+
+
+def test_open_circuit_reports_throttling_for_playlists(offline):
+    url = "https://www.youtube.com/playlist?list=PL0123456789abcdef"
+    text = reply_while_open(
+        offline, lambda update: bot.analyze_collection(update, url), url
+    )
+    assert "YOUTUBE IS LIMITING US" in text
+    assert "about 10 minute" in text
+
+
+def test_open_circuit_reports_throttling_for_compare(offline):
+    ids = [offline.video_ids.new("standard") for _ in range(2)]
+    text = reply_while_open(
+        offline,
+        lambda update: bot.compare_command(update, None),
+        "/compare " + " ".join(f"https://youtu.be/{v}" for v in ids),
+    )
+    assert "YOUTUBE IS LIMITING US" in text
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+
+import YoutubeStats_bot as bot
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+@pytest.fixture
+def fake_ydl(monkeypatch):
+    """Fake yt-dlp: the stats profile (process=False) may omit view_count"""
+    calls = []
+    stats_info = {"id": "abcdefghijk", "title": "Title", "view_count": 5}
+
+    def extract_info(ydl, url, download=False, ie_key=None, process=True):
+        calls.append(process)
+        info = dict(stats_info)
+        if process:
+            info["formats"] = []
+        return info
+
+    monkeypatch.setattr(bot.yt_dlp.YoutubeDL, "extract_info", extract_info)
+    return SimpleNamespace(calls=calls, stats_info=stats_info)
+
+
+def test_stats_profile_skips_processing(fake_ydl):
+    info = bot.extract_video_info(URL, profile="stats")
+    assert fake_ydl.calls == [False]
+    assert "formats" not in info
+
+
+def test_incomplete_stats_profile_falls_back_to_full(fake_ydl):
+    fake_ydl.stats_info["view_count"] = None
+    info = bot.extract_video_info(URL, profile="stats")
+    assert fake_ydl.calls == [False, True]
+    assert "formats" in info
+
+
+def test_full_profile(fake_ydl):
+    bot.extract_video_info(URL, profile="full")
+    assert fake_ydl.calls == [True]
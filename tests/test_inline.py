@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import YoutubeStats_bot as bot
+
+
+def ask(text, user_id=7):
+    """Run inline_query for text; return the answers it gave"""
+    answers = []
+
+    async def answer(results, **kwargs):
+        answers.append((results, kwargs))
+
+    query = SimpleNamespace(
+        query=text, from_user=SimpleNamespace(id=user_id), answer=answer
+    )
+    update = SimpleNamespace(inline_query=query)
+    asyncio.run(bot.inline_query(update, SimpleNamespace()))
+    return answers
+
+
+def test_non_link_gets_a_hint():
+    [(results, kwargs)] = ask("hello")
+    assert results == []
+    assert kwargs["button"].start_parameter == "inline"
+
+
+def test_cached_video_is_answered_without_extracting(offline):
+    stats = bot.VideoStats(id="abcdefghijk", title="Cached", view_count=1_500)
+    asyncio.run(bot.state_backend.cache_set(stats.id, stats, 60))
+    calls = offline.FakeYoutubeDL.calls
+
+    [([article], kwargs)] = ask("https://youtu.be/abcdefghijk")
+    assert article.title == "Cached"
+    assert kwargs["cache_time"] == bot.Config.INLINE_CACHE_TIME
+    assert offline.FakeYoutubeDL.calls == calls
+
+
+def test_miss_is_extracted_within_the_deadline(offline):
+    video_id = offline.video_ids.new("standard")
+    [([article], kwargs)] = ask(f"youtu.be/{video_id}")
+    assert article.id == video_id
+    assert "Views:" in article.input_message_content.message_text
+    assert bot.state_backend.cache_misses == 1
+
+
+def test_misses_are_rate_limited(offline, monkeypatch):
+    monkeypatch.setattr(bot, "rate_limiter", bot.RateLimiter(bot.state_backend, 60, 1))
+    calls = offline.FakeYoutubeDL.calls
+    ask(f"youtu.be/{offline.video_ids.new('standard')}")
+    [([notice], kwargs)] = ask(f"youtu.be/{offline.video_ids.new('standard')}")
+
+    assert notice.title == "⏳ Slow down!"
+    assert kwargs["cache_time"] == bot.Config.INLINE_RETRY_CACHE_TIME
+    assert offline.FakeYoutubeDL.calls == calls + 1
+    # Another user still gets through
+    [([article], _)] = ask(f"youtu.be/{offline.video_ids.new('standard')}", 8)
+    assert article.title != "⏳ Slow down!"
+
+
+def test_card_survives_null_fields():
+    stats = bot.VideoStats(
+        id="abcdefghijk",
+        title=None,
+        channel=None,
+        channel_url=None,
+        view_count=10,
+        like_count=None,
+        comment_count=None,
+        duration=None,
+    )
+    card = bot.build_inline_card(stats, bot.URLValidator.canonical_url(stats.id))
+    assert "🎬 <b>N/A</b>" in card
+    assert "📺 N/A" in card
+    article = bot.inline_article(stats, bot.URLValidator.canonical_url(stats.id))
+    assert article.title == "N/A"
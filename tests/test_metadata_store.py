@@ -0,0 +1,67 @@
+import asyncio
+import sqlite3
+import time
+
+import YoutubeStats_bot as bot
+
+
+def video():
+    return bot.VideoStats(id="abcdefghijk", title="Title", view_count=1_234)
+
+
+def round_trip(store, **get_kwargs):
+    async def scenario():
+        await store.put("abcdefghijk", video())
+        return await store.get("abcdefghijk", **get_kwargs)
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        store.close()
+
+
+def test_fresh_copy_is_not_stale():
+    stats, is_stale = round_trip(bot.MetadataStore(":memory:"))
+    assert stats == video()
+    assert not is_stale
+
+
+def test_copy_past_soft_ttl_is_served_stale():
+    stats, is_stale = round_trip(bot.MetadataStore(":memory:", soft_ttl_seconds=-1))
+    assert stats.view_count == 1_234
+    assert is_stale
+
+
+def test_copy_past_hard_ttl_is_gone_unless_expired_allowed():
+    store = bot.MetadataStore(":memory:", hard_ttl_seconds=-1)
+    assert round_trip(store) is None
+    store = bot.MetadataStore(":memory:", hard_ttl_seconds=-1)
+    assert round_trip(store, allow_expired=True)[0] == video()
+
+
+def test_missing_video():
+    store = bot.MetadataStore(":memory:")
+    assert asyncio.run(store.get("zzzzzzzzzzz")) is None
+    store.close()
+
+
+def test_locked_database_does_not_block_event_loop(tmp_path):
+    path = str(tmp_path / "metadata.db")
+    store = bot.MetadataStore(path)
+    # Another process holding the write lock
+    peer = sqlite3.connect(path, isolation_level=None)
+    peer.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        write = asyncio.create_task(store.put("abcdefghijk", video()))
+        start = time.perf_counter()
+        await asyncio.sleep(0.05)
+        assert time.perf_counter() - start < 0.5
+        assert not write.done()
+        peer.execute("COMMIT")
+        await write
+        return await store.get("abcdefghijk")
+
+    assert asyncio.run(scenario())[0] == video()
+    peer.close()
+    store.close()
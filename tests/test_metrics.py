@@ -0,0 +1,46 @@
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import YoutubeStats_bot as bot
+
+
+def test_render_prometheus_types():
+    metrics = bot.Metrics()
+    metrics.inc("ytbot_requests_total", kind="video")
+    metrics.observe("ytbot_phase_seconds", 0.2, phase="request")
+    metrics.gauge("ytbot_send_queued", lambda: 3)
+    metrics.sampled_counter("ytbot_cache_hits_total", lambda: 7)
+
+    text = metrics.render_prometheus()
+    assert 'ytbot_requests_total{kind="video"} 1' in text
+    assert 'ytbot_phase_seconds_bucket{phase="request",le="0.25"} 1' in text
+    assert "# TYPE ytbot_send_queued gauge\nytbot_send_queued 3.0" in text
+    assert "# TYPE ytbot_cache_hits_total counter\nytbot_cache_hits_total 7.0" in text
+
+
+def test_render_prometheus_coerces_bool_gauges():
+    metrics = bot.Metrics()
+    metrics.gauge("ytbot_breaker_open", lambda: True)
+    assert "ytbot_breaker_open 1.0\n" in metrics.render_prometheus()
+
+
+def test_histogram_quantile():
+    histogram = bot.Histogram()
+    for value in (0.001, 0.02, 0.02, 3):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.025
+    assert histogram.quantile(1.0) == 5
+
+
+def test_startup_survives_metrics_port_in_use(monkeypatch):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        monkeypatch.setattr(bot.Config, "METRICS_LISTEN", "127.0.0.1")
+        monkeypatch.setattr(bot.Config, "METRICS_PORT", taken.getsockname()[1])
+        app = SimpleNamespace(bot_data={})
+
+        asyncio.run(bot.on_startup(app))
+
+    assert "metrics_server" not in app.bot_data
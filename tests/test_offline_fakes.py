@@ -0,0 +1,21 @@
+import asyncio
+
+import offline_fakes as fakes
+
+
+def test_fake_request_is_instantiable():
+    request = fakes.FakeTelegramRequest()
+    assert request.read_timeout is None
+
+
+def test_fake_bot_answers_locally():
+    async def scenario():
+        fake_bot = await fakes.make_bot()
+        message = await fake_bot.send_message(42, "hello")
+        await fake_bot.shutdown()
+        return fake_bot, message
+
+    fake_bot, message = asyncio.run(scenario())
+    assert message.chat_id == 42
+    assert fake_bot.request.calls["sendMessage"] == 1
+    assert fake_bot.request.last_text[42] == "hello"
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import YoutubeStats_bot as bot
+
+VIDEO = bot.VideoStats.from_info(
+    {"id": "abcdefghijk", "title": "Title", "thumbnail": "https://i.ytimg.com/t.jpg"}
+)
+
+
+def send_reports(fakes, count, reject_file_ids=False):
+    """Send count photo reports for VIDEO; returns the photos sent"""
+
+    async def scenario():
+        fake_bot = await fakes.make_bot()
+        request = fake_bot.request
+        answer = request.do_request
+        sent = []
+
+        async def do_request(url, method, request_data=None, **kwargs):
+            if url.endswith("/sendPhoto"):
+                photo = request_data.parameters["photo"]
+                sent.append(photo)
+                if reject_file_ids and photo.startswith("photo-"):
+                    body = {"ok": False, "description": "Wrong file identifier"}
+                    return 400, json.dumps(body).encode()
+            return await answer(url, method, request_data, **kwargs)
+
+        request.do_request = do_request
+        results = []
+        for _ in range(count):
+            message = fakes.make_update(fake_bot, 7, "hi").message
+            results.append(await bot.send_photo_report(message, VIDEO, "report"))
+        await bot.send_queue.close()
+        return sent, results
+
+    return asyncio.run(scenario())
+
+
+def stored_file_id():
+    return asyncio.run(
+        bot.metadata_store.get_file_id(VIDEO.id, bot.report_photo_url(VIDEO))
+    )
+
+
+def test_first_report_uploads_url_then_reuses_file_id(offline):
+    sent, results = send_reports(offline, 2)
+
+    assert results == [True, True]
+    assert sent[0] == "https://i.ytimg.com/t.jpg"
+    assert sent[1] == stored_file_id()
+    assert sent[1].startswith("photo-")
+
+
+def test_rejected_file_id_is_forgotten_and_url_resent(offline):
+    sent, results = send_reports(offline, 2, reject_file_ids=True)
+
+    assert results == [True, True]
+    url, stale, retry = sent
+    assert stale.startswith("photo-")
+    assert retry == url
+    # The retry's upload replaced the rejected file_id
+    assert stored_file_id() not in (None, stale)
@@ -0,0 +1,69 @@
+import YoutubeStats_bot as bot
+
+
+def video(n, views):
+    return bot.VideoStats(
+        id=f"video{n:06d}",
+        title=f"Video {n}",
+        view_count=views,
+        like_count=views // 10 if views is not None else None,
+        comment_count=1,
+        duration=60,
+    )
+
+
+def test_totals_median_and_top_videos():
+    agg = bot.PlaylistAggregate("Mix", expected=5, top_n=2)
+    for n, views in enumerate([300, None, 100, 500, 200]):
+        agg.add(video(n, views))
+
+    assert agg.analyzed == 5
+    assert agg.total_views == 1_100
+    assert agg.total_likes == 110
+    assert (agg.total_comments, agg.total_duration) == (5, 300)
+    assert agg.median_views == 200
+    assert agg.top_videos() == [
+        (500, "video000003", "Video 3"),
+        (300, "video000000", "Video 0"),
+    ]
+
+
+def test_report_shows_progress_until_done():
+    agg = bot.PlaylistAggregate("A &amp; B", expected=4)
+    agg.add(video(0, 1_000))
+    agg.failed = 1
+
+    progress = bot.build_playlist_report(agg, done=False)
+    assert "2/4" in progress
+    assert "A &amp;amp; B" in progress
+    assert "1 unavailable" in progress
+    assert "Analyzing" not in bot.build_playlist_report(agg, done=True)
+
+
+def test_report_says_when_listing_was_truncated():
+    limit = f"{bot.Config.PLAYLIST_MAX_VIDEOS:,}"
+    agg = bot.PlaylistAggregate("Big", expected=1, truncated=True, total=25_000)
+    assert f"first {limit} of 25,000 videos" in bot.build_playlist_report(agg, True)
+
+    agg = bot.PlaylistAggregate("Channel", expected=1, truncated=True)
+    assert f"first {limit} of {limit}+ videos" in bot.build_playlist_report(agg, True)
+
+    agg = bot.PlaylistAggregate("Small", expected=1)
+    assert "Only the first" not in bot.build_playlist_report(agg, True)
+
+
+def test_listing_stops_at_the_limit(monkeypatch):
+    entries = [{"id": f"video{n:06d}"} for n in range(4)] + [
+        {"id": "UCchannel", "ie_key": "YoutubeTab"}
+    ]
+    info = {"title": "Mix", "entries": iter(entries), "playlist_count": None}
+    monkeypatch.setattr(bot.Config, "PLAYLIST_MAX_VIDEOS", 3)
+    monkeypatch.setattr(bot.yt_dlp.YoutubeDL, "extract_info", lambda *a, **k: info)
+
+    listing = bot.extract_collection_entries("https://www.youtube.com/@mix/videos")
+    assert listing == {
+        "title": "Mix",
+        "video_ids": ["video000000", "video000001", "video000002"],
+        "truncated": True,
+        "total": None,
+    }
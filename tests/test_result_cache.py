@@ -0,0 +1,42 @@
+import YoutubeStats_bot as bot
+
+
+def video(video_id):
+    return bot.VideoStats(id=video_id)
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(bot.time, "monotonic", lambda: now[0])
+    cache = bot.ResultCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", video("a"))
+
+    now[0] += 60
+    assert cache.get("a").id == "a"
+    now[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_ratio == 0.5
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = bot.ResultCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", video("a"))
+    cache.set("b", video("b"))
+    cache.get("a")
+    cache.set("c", video("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert len(cache) == 2
+
+
+def test_untracked_lookups_leave_counters_alone():
+    cache = bot.ResultCache()
+    cache.get("a", track=False)
+    cache.set("a", video("a"))
+    cache.get("a", track=False)
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert cache.hit_ratio == 0.0
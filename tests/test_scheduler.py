@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+import YoutubeStats_bot as bot
+
+
+async def hold(scheduler, owner, started, release):
+    async with scheduler.slot(owner):
+        started.append(owner)
+        await release.wait()
+
+
+def test_owners_take_turns():
+    async def scenario():
+        scheduler = bot.FairScheduler(1, 10, 5, max_per_owner=2)
+        started, release = [], asyncio.Event()
+        order = []
+
+        async def job(owner):
+            async with scheduler.slot(owner):
+                order.append(owner)
+
+        blocker = asyncio.create_task(hold(scheduler, "x", started, release))
+        await asyncio.sleep(0)
+        jobs = [asyncio.create_task(job(owner)) for owner in ("a", "a", "a", "b")]
+        await asyncio.sleep(0)
+        assert scheduler.waiting == 4
+        assert scheduler.queue_status("b") == (2, 2 * scheduler.avg_job_seconds)
+
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "a", "a"]
+
+
+def test_owner_cap_leaves_capacity_to_others():
+    async def scenario():
+        scheduler = bot.FairScheduler(3, 10, 5, max_per_owner=1)
+        started, release = [], asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(scheduler, owner, started, release))
+            for owner in ("a", "a", "b")
+        ]
+        await asyncio.sleep(0.01)
+        assert sorted(started) == ["a", "b"]
+        assert (scheduler.active, scheduler.waiting) == (2, 1)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert (scheduler.active, scheduler.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_sheds_when_queue_is_full():
+    async def scenario():
+        scheduler = bot.FairScheduler(1, 1, 5)
+        started, release = [], asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(scheduler, owner, started, release))
+            for owner in ("a", "b")
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(bot.ExtractionQueueFull):
+            async with scheduler.slot("c"):
+                pass
+        assert scheduler.shed == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started == ["a", "b"]
+
+    asyncio.run(scenario())
+
+
+def test_sheds_after_queue_timeout():
+    async def scenario():
+        scheduler = bot.FairScheduler(1, 10, 0.05)
+        started, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(scheduler, "a", started, release))
+        await asyncio.sleep(0)
+        with pytest.raises(bot.ExtractionQueueFull):
+            async with scheduler.slot("b"):
+                pass
+        assert (scheduler.shed, scheduler.waiting) == (1, 0)
+        assert scheduler.queue_status("b") is None
+
+        release.set()
+        await blocker
+        assert scheduler.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        scheduler = bot.FairScheduler(1, 10, 5)
+        started, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(scheduler, "a", started, release))
+        waiter = asyncio.create_task(hold(scheduler, "b", started, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.waiting == 0
+
+        release.set()
+        await blocker
+        assert started == ["a"]
+        assert scheduler.active == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,192 @@
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+import YoutubeStats_bot as bot
+
+
+def fast_queue(**overrides):
+    """A queue whose buckets never make the test wait"""
+    limits = dict(
+        global_rate=1e6,
+        global_burst=1e6,
+        chat_rate=1e6,
+        group_rate=1e6,
+        chat_burst=1e6,
+    )
+    limits.update(overrides)
+    return bot.SendQueue(**limits)
+
+
+def test_dispatches_by_priority():
+    async def scenario():
+        queue = fast_queue()
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+
+        async def record(name):
+            order.append(name)
+
+        # Occupy the chat so the others queue up behind it
+        first = asyncio.create_task(queue.submit(1, blocker))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(queue.submit(1, lambda n=name: record(n), priority))
+            for name, priority in [
+                ("progress", bot.SendQueue.PROGRESS),
+                ("reply", bot.SendQueue.REPLY),
+                ("result", bot.SendQueue.RESULT),
+            ]
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, *tasks)
+        await queue.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["result", "reply", "progress"]
+
+
+def test_keyed_call_supersedes_pending_progress():
+    async def scenario():
+        queue = fast_queue()
+        release = asyncio.Event()
+        calls = []
+
+        async def blocker():
+            await release.wait()
+
+        async def edit(text):
+            calls.append(text)
+            return text
+
+        first = asyncio.create_task(queue.submit(1, blocker))
+        await asyncio.sleep(0)
+        progress = asyncio.create_task(
+            queue.submit(1, lambda: edit("50%"), bot.SendQueue.PROGRESS, key="m")
+        )
+        await asyncio.sleep(0)
+        final = asyncio.create_task(
+            queue.submit(1, lambda: edit("done"), bot.SendQueue.RESULT, key="m")
+        )
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(first, progress, final)
+        await queue.close()
+        return results, calls, queue.dropped
+
+    results, calls, dropped = asyncio.run(scenario())
+    assert results[1:] == [None, "done"]
+    assert calls == ["done"]
+    assert dropped == 1
+
+
+def test_cancelled_submit_is_not_sent():
+    async def scenario():
+        queue = fast_queue()
+        release = asyncio.Event()
+        calls = []
+
+        async def blocker():
+            await release.wait()
+
+        async def send():
+            calls.append(1)
+
+        first = asyncio.create_task(queue.submit(1, blocker))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(queue.submit(1, send))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await first
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return calls, len(queue)
+
+    assert asyncio.run(scenario()) == ([], 0)
+
+
+def test_per_chat_rate_is_paced():
+    async def scenario():
+        queue = fast_queue(chat_rate=20, chat_burst=1)
+        sent_at = []
+
+        async def send():
+            sent_at.append(time.monotonic())
+
+        await asyncio.gather(*(queue.submit(7, send) for _ in range(3)))
+        await queue.close()
+        return sent_at
+
+    sent_at = asyncio.run(scenario())
+    assert sent_at[2] - sent_at[0] >= 2 / 20 * 0.9
+
+
+def test_retry_after_block_survives_idle_eviction():
+    async def scenario():
+        # Buckets refill almost at once, so idle eviction runs constantly
+        queue = fast_queue(chat_rate=1000, group_rate=1000, chat_burst=1)
+        attempts = []
+
+        async def flooded():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(1)
+            return "sent"
+
+        async def other():
+            return "other"
+
+        start = time.monotonic()
+        result = asyncio.create_task(queue.submit(-100, flooded))
+        await asyncio.sleep(0.1)
+        # Another chat dispatching evicts idle state
+        assert await queue.submit(555, other) == "other"
+        assert await result == "sent"
+        await queue.close()
+        return attempts[1] - start, queue.retries
+
+    waited, retries = asyncio.run(scenario())
+    assert waited >= 0.95
+    assert retries == 1
+
+
+def test_progress_is_dropped_on_retry_after():
+    async def scenario():
+        queue = fast_queue()
+
+        async def flooded():
+            raise RetryAfter(1)
+
+        result = await queue.submit(1, flooded, bot.SendQueue.PROGRESS)
+        await queue.close()
+        return result, queue.dropped
+
+    assert asyncio.run(scenario()) == (None, 1)
+
+
+def test_close_waits_for_in_flight_sends():
+    async def scenario():
+        queue = fast_queue()
+        sent = []
+
+        async def slow_send():
+            await asyncio.sleep(0.05)
+            sent.append("in flight")
+
+        in_flight = asyncio.create_task(queue.submit(1, slow_send))
+        await asyncio.sleep(0.01)
+        assert len(queue._running) == 1
+
+        await queue.close()
+        assert sent == ["in flight"]
+        assert not queue._running
+        await in_flight
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import YoutubeStats_bot as bot
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights = bot.SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def extract():
+            calls.append(1)
+            await release.wait()
+            return "stats"
+
+        callers = [asyncio.create_task(flights.do("v", extract)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(flights) == 1
+        release.set()
+        assert await asyncio.gather(*callers) == ["stats"] * 3
+        assert (len(calls), flights.coalesced, len(flights)) == (1, 2, 0)
+
+        # The key is free again once the flight lands
+        assert await flights.do("v", extract) == "stats"
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_caller():
+    async def scenario():
+        flights = bot.SingleFlight()
+
+        async def extract():
+            await asyncio.sleep(0)
+            raise ValueError("unavailable")
+
+        results = await asyncio.gather(
+            flights.do("v", extract), flights.do("v", extract), return_exceptions=True
+        )
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flights = bot.SingleFlight()
+        release = asyncio.Event()
+
+        async def extract():
+            await release.wait()
+            return "stats"
+
+        quitter = asyncio.create_task(flights.do("v", extract))
+        stayer = asyncio.create_task(flights.do("v", extract))
+        await asyncio.sleep(0)
+        quitter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await quitter
+
+        release.set()
+        assert await stayer == "stats"
+
+    asyncio.run(scenario())
@@ -0,0 +1,133 @@
+import time
+
+import YoutubeStats_bot as bot
+
+
+def opened(path, **kwargs):
+    store = bot.SnapshotStore(path, **kwargs)
+    store.open()
+    return store
+
+
+def video(video_id, views, likes=None, comments=None):
+    return bot.VideoStats(
+        id=video_id, view_count=views, like_count=likes, comment_count=comments
+    )
+
+
+def test_second_process_loads_read_only(tmp_path):
+    path = str(tmp_path / "snapshots.bin")
+    now = int(time.time())
+    writer = opened(path, min_interval=0)
+    writer.record(video("abcdefghijk", 100), at=now + 1)
+
+    reader = opened(path, min_interval=0)
+    assert reader._file is None
+    assert len(reader.history("abcdefghijk")) == 1
+    reader.record(video("abcdefghijk", 200), at=now + 2)
+    reader.close()
+
+    writer.record(video("abcdefghijk", 300), at=now + 3)
+    writer.close()
+    reloaded = opened(path, min_interval=0)
+    assert list(reloaded.history("abcdefghijk").views) == [100, 300]
+    reloaded.close()
+
+
+def test_read_only_store_never_compacts(tmp_path):
+    path = str(tmp_path / "snapshots.bin")
+    writer = opened(path, min_interval=0)
+    for n in range(10):
+        writer.record(video("abcdefghijk", n), at=1_000 + n)
+    size = (tmp_path / "snapshots.bin").stat().st_size
+
+    reader = opened(path, min_interval=0)
+    assert len(reader) == 0
+    assert (tmp_path / "snapshots.bin").stat().st_size == size
+    reader.close()
+    writer.close()
+
+
+def test_records_survive_reload(tmp_path):
+    path = str(tmp_path / "snapshots.bin")
+    now = int(time.time())
+    store = opened(path, min_interval=60)
+    store.record(video("abcdefghijk", 100, 10, None), at=now)
+    store.record(video("abcdefghijk", 150, 12, 3), at=now + 30)
+    store.record(video("abcdefghijk", 200, 15, 4), at=now + 60)
+    store.record(video("short", 1), at=now)
+    store.close()
+
+    reloaded = opened(path)
+    series = reloaded.history("abcdefghijk")
+    assert list(series.times) == [now, now + 60]
+    assert list(series.views) == [100, 200]
+    assert list(series.comments) == [-1, 4]
+    assert len(reloaded) == 2
+    reloaded.close()
+
+
+def test_torn_tail_is_dropped_and_compacted(tmp_path):
+    path = tmp_path / "snapshots.bin"
+    now = int(time.time())
+    store = opened(str(path), min_interval=0)
+    store.record(video("abcdefghijk", 100), at=now)
+    store.close()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    reloaded = opened(str(path))
+    assert len(reloaded) == 1
+    assert path.stat().st_size == bot.SnapshotStore.RECORD.size
+    reloaded.close()
+
+
+def test_expired_records_are_compacted_away(tmp_path):
+    path = tmp_path / "snapshots.bin"
+    now = int(time.time())
+    store = opened(str(path), retention_seconds=3600, min_interval=0)
+    for n in range(3):
+        store.record(video("abcdefghijk", n), at=now - 7200 + n)
+    store.record(video("abcdefghijk", 10), at=now)
+    store.close()
+
+    reloaded = opened(str(path), retention_seconds=3600)
+    assert list(reloaded.history("abcdefghijk").views) == [10]
+    assert path.stat().st_size == bot.SnapshotStore.RECORD.size
+    reloaded.close()
+
+
+def test_velocity():
+    series = bot.VideoSeries()
+    for hour, views in enumerate([0, 100, 200, 400, 600]):
+        series.append(hour * 3600, views, -1, -1)
+
+    assert series.views_gained(7200) == (400, 7200)
+    assert series.views_gained(10**6) == (600, 4 * 3600)
+    assert series.views_gained(7200, min_span=10**6) is None
+    # 400 views in the last 2h against 200 in the 2h before
+    assert series.acceleration(7200) == 100.0
+    series.append(5 * 3600, -1, -1, -1)
+    assert series.views_gained(7200) is None
+
+
+def test_import_leaves_the_log_closed(tmp_path):
+    store = bot.SnapshotStore(str(tmp_path / "snapshots.bin"))
+    store.record(video("abcdefghijk", 1))
+    assert list(tmp_path.iterdir()) == []
+    assert len(store) == 1
+
+
+def test_expired_snapshots_are_pruned_while_running():
+    store = bot.SnapshotStore("", retention_seconds=3600, min_interval=0)
+    start = int(time.time())
+    store.record(video("video000001", 1), at=start)
+    store.record(video("video000002", 1), at=start)
+    store.record(video("video000002", 2), at=start + 3000)
+
+    store.record(
+        video("video000003", 1), at=start + bot.Config.SNAPSHOT_PRUNE_INTERVAL + 1
+    )
+    assert store.history("video000001") is None
+    assert list(store.history("video000002").views) == [2]
+    assert len(store) == 2
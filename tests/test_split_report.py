@@ -0,0 +1,47 @@
+import YoutubeStats_bot as bot
+
+
+def report(sections=40):
+    lines = ["🎬 <b>VIDEO REPORT</b>"]
+    for n in range(sections):
+        lines.append(
+            f"<b>Section {n}</b> · <code>{n * 1_000:,}</code> views &amp; more"
+        )
+        lines.append(
+            f"<blockquote expandable>line one of {n}\nline two of {n}</blockquote>"
+        )
+    return "\n".join(lines)
+
+
+def balanced(part):
+    depth = 0
+    for closing, _ in bot.HTML_TAG.findall(part):
+        depth += -1 if closing else 1
+        assert depth >= 0
+    return depth == 0
+
+
+def test_short_report_is_one_part():
+    text = report(2)
+    assert bot.split_report(text) == [text]
+
+
+def test_parts_fit_caption_and_message_limits():
+    text = report()
+    parts = bot.split_report(text, first_limit=300, limit=700)
+    assert len(parts) > 2
+    assert bot.visible_length(parts[0]) <= 300
+    assert all(bot.visible_length(part) <= 700 for part in parts[1:])
+    assert all(balanced(part) for part in parts)
+    assert "\n".join(parts) == text
+
+
+def test_first_part_may_be_empty():
+    text = "<blockquote>" + "\n".join(["x" * 50] * 4) + "</blockquote>"
+    parts = bot.split_report(text, first_limit=20, limit=1_000)
+    assert parts == ["", text]
+
+
+def test_visible_length_ignores_tags_and_counts_utf16():
+    assert bot.visible_length("<b>a&amp;b</b>") == 3
+    assert bot.visible_length("🎬") == 2
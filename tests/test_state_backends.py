@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+import YoutubeStats_bot as bot
+
+
+def make_stats(video_id="dQw4w9WgXcQ"):
+    return bot.VideoStats(id=video_id, title="Video", view_count=1000)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = bot.MemoryStateBackend()
+    else:
+        backend = bot.SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+
+def test_state_backend_is_abstract():
+    with pytest.raises(TypeError):
+        bot.StateBackend()
+
+
+def test_rate_limit_bucket(backend):
+    async def scenario():
+        limiter = bot.RateLimiter(backend, seconds_per_token=3, burst=2)
+        assert (await limiter.is_allowed(1))[0]
+        assert (await limiter.is_allowed(1))[0]
+        assert await limiter.is_allowed(1) == (False, 3)
+        # Other users have their own bucket
+        assert (await limiter.is_allowed(2))[0]
+
+    asyncio.run(scenario())
+
+
+def test_cache_round_trip_and_counters(backend):
+    async def scenario():
+        assert await backend.cache_get("missing") is None
+        await backend.cache_set("dQw4w9WgXcQ", make_stats(), 60)
+        assert (await backend.cache_get("dQw4w9WgXcQ")).title == "Video"
+        # Untracked lookups, like peer polling, leave the counters alone
+        assert await backend.cache_get("missing", track=False) is None
+        assert await backend.cache_get("dQw4w9WgXcQ", track=False) is not None
+        assert (backend.cache_hits, backend.cache_misses) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_locks_are_exclusive_and_expire(backend):
+    async def scenario():
+        assert await backend.acquire_lock("extract:a", 60)
+        assert not await backend.acquire_lock("extract:a", 60)
+        await backend.release_lock("extract:a")
+        assert await backend.acquire_lock("extract:a", 0.01)
+        await asyncio.sleep(0.02)
+        assert await backend.acquire_lock("extract:a", 60)
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_cache_sweep_keeps_rate_limit_buckets(tmp_path):
+    async def scenario():
+        backend = bot.SQLiteStateBackend(str(tmp_path / "state.db"))
+        limiter = bot.RateLimiter(backend, seconds_per_token=3, burst=2)
+        await limiter.is_allowed(1)
+        await limiter.is_allowed(1)
+        assert not (await limiter.is_allowed(1))[0]
+
+        # Enough cache writes to trigger the periodic sweep
+        for i in range(bot.SQLiteStateBackend.SWEEP_EVERY):
+            await backend.cache_set(f"v{i:010d}", make_stats(), 60)
+
+        assert not (await limiter.is_allowed(1))[0]
+        backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_busy_database_does_not_block_event_loop(tmp_path):
+    path = str(tmp_path / "state.db")
+    backend = bot.SQLiteStateBackend(path)
+    # Another process holding the write lock
+    peer = bot.sqlite3.connect(path, isolation_level=None)
+    peer.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        write = asyncio.create_task(backend.cache_set("a", make_stats(), 60))
+        start = time.perf_counter()
+        await asyncio.sleep(0.05)
+        assert time.perf_counter() - start < 0.5
+        assert not write.done()
+        peer.execute("COMMIT")
+        await write
+
+    asyncio.run(scenario())
+    peer.close()
+    backend.close()
@@ -0,0 +1,67 @@
+import pytest
+
+import YoutubeStats_bot as bot
+
+URLValidator = bot.URLValidator
+
+
+def test_finds_distinct_links_in_text():
+    text = (
+        "Look: https://www.youtube.com/watch?v=abcdefghijk, and "
+        "youtu.be/abcdefghijk (same video) plus https://youtu.be/ABCDEFGHIJK."
+    )
+    assert URLValidator.find_youtube_urls(text) == [
+        "https://www.youtube.com/watch?v=abcdefghijk",
+        "https://youtu.be/ABCDEFGHIJK",
+    ]
+
+
+def test_link_entities_and_limit():
+    extra = ["https://www.youtube.com/watch?v=zzzzzzzzzzz", "https://example.com/x"]
+    text = " ".join(f"youtu.be/video{n:06d}" for n in range(5))
+    assert URLValidator.find_youtube_urls(text, extra, limit=3) == [
+        "youtu.be/video000000",
+        "youtu.be/video000001",
+        "youtu.be/video000002",
+    ]
+    assert URLValidator.find_youtube_urls("", extra) == [extra[0]]
+
+
+def test_no_links():
+    assert URLValidator.find_youtube_urls(None) == []
+    assert URLValidator.find_youtube_urls("youtube is great") == []
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "https://www.youtube.com/playlist?list=PLabc_123-x",
+            "https://www.youtube.com/playlist?list=PLabc_123-x",
+        ),
+        (
+            "https://youtube.com/playlist?si=x&list=PLabc",
+            "https://www.youtube.com/playlist?list=PLabc",
+        ),
+        (
+            "https://www.youtube.com/@some.channel",
+            "https://www.youtube.com/@some.channel/videos",
+        ),
+        (
+            "youtube.com/channel/UC123-abc/featured",
+            "https://www.youtube.com/channel/UC123-abc/videos",
+        ),
+        (
+            "https://www.youtube.com/user/old_name",
+            "https://www.youtube.com/user/old_name/videos",
+        ),
+        ("https://www.youtube.com/watch?v=abcdefghijk", None),
+        ("https://youtu.be/abcdefghijk", None),
+    ],
+)
+def test_collection_url(url, expected):
+    assert URLValidator.collection_url(url) == expected
+    if expected:
+        assert URLValidator.extract_video_id(url) is None
+    else:
+        assert URLValidator.extract_video_id(url) == "abcdefghijk"
@@ -0,0 +1,68 @@
+import math
+import random
+
+import numpy as np
+
+import YoutubeStats_bot as bot
+
+VA = bot.VideoAnalyzer
+
+
+def sample_videos(n=2_000, seed=1):
+    rng = random.Random(seed)
+    views = [
+        (
+            rng.choice([0, 999, 1_000, 100_000, 100_000_000])
+            if rng.random() < 0.1
+            else int(10 ** rng.uniform(0, 10.5))
+        )
+        for _ in range(n)
+    ]
+    likes = [int(v * rng.uniform(0, 0.2)) for v in views]
+    comments = [int(v * rng.uniform(0, 0.05)) for v in views]
+    dates = [
+        rng.choice(
+            [
+                "",
+                None,
+                "2024x101",
+                "20240230",
+                "20991231",
+                f"20{rng.randint(10, 25)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            ]
+        )
+        for _ in range(n)
+    ]
+    return views, likes, comments, dates
+
+
+def test_array_methods_match_scalar_methods():
+    views, likes, comments, dates = sample_videos()
+    V, L, C = (np.array(a, dtype=np.int64) for a in (views, likes, comments))
+
+    rates = VA.calculate_engagement_rate_array(L, C, V)
+    assert list(rates) == [
+        VA.calculate_engagement_rate(*video) for video in zip(likes, comments, views)
+    ]
+    assert list(VA.calculate_like_percentage_array(L, V)) == [
+        VA.calculate_like_percentage(l, v) for l, v in zip(likes, views)
+    ]
+    assert VA.get_performance_grade_array(rates) == [
+        VA.get_performance_grade(rate) for rate in rates
+    ]
+    assert VA.get_quality_badge_array(V) == [VA.get_quality_badge(v) for v in views]
+
+    per_day = VA.calculate_views_per_day_array(V, dates)
+    for value, (v, date) in zip(per_day, zip(views, dates)):
+        expected = VA.calculate_views_per_day(v, date)
+        if expected is None:
+            assert math.isnan(value)
+        else:
+            assert value == expected
+
+
+def test_grade_boundaries():
+    rates = [0.0, 0.999999, 1, 2.5, 3, 5, 7, 9.99, 10, 250]
+    assert VA.get_performance_grade_array(np.array(rates)) == [
+        VA.get_performance_grade(rate) for rate in rates
+    ]
@@ -0,0 +1,48 @@
+import json
+
+import YoutubeStats_bot as bot
+
+
+def test_from_info_keeps_only_report_fields():
+    info = {
+        "id": "abcdefghijk",
+        "title": "Title",
+        "view_count": 10,
+        "description": "x" * 5_000,
+        "categories": ["Music", "Entertainment"],
+        "tags": [f"tag{n}" for n in range(50)],
+        "formats": [{"url": "https://example.com"}] * 100,
+        "heatmap": [],
+    }
+    stats = bot.VideoStats.from_info(info)
+
+    assert not hasattr(stats, "__dict__")
+    assert len(stats.description) == bot.Config.MAX_DESCRIPTION_LENGTH + 1
+    assert stats.categories == ("Music",)
+    assert len(stats.tags) == bot.Config.MAX_TAGS_DISPLAY
+    assert stats.channel == "N/A"
+
+
+def test_from_info_derives_fields_missing_from_stats_profile():
+    info = {
+        "id": "abcdefghijk",
+        "timestamp": 1_700_000_000,
+        "thumbnails": [
+            {"url": "small.jpg", "width": 120},
+            {"url": "best.jpg", "width": 1280, "preference": 1},
+            {"url": "wide.jpg", "width": 1920},
+        ],
+    }
+    stats = bot.VideoStats.from_info(info)
+    assert stats.thumbnail == "best.jpg"
+    assert stats.upload_date == "20231114"
+
+
+def test_dict_round_trip_through_json():
+    stats = bot.VideoStats(
+        id="abcdefghijk", title="Título", tags=("a", "b"), like_count=None
+    )
+    data = json.loads(json.dumps(stats.to_dict()))
+    data["removed_field"] = 1
+
+    assert bot.VideoStats.from_dict(data) == stats
@@ -0,0 +1,134 @@
+import asyncio
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import NetworkError
+
+import YoutubeStats_bot as bot
+
+from test_send_queue import fast_queue
+
+
+def video(video_id, views):
+    return bot.VideoStats(id=video_id, title=video_id, view_count=views)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "watch.db")
+
+
+def test_processes_never_claim_the_same_video(db_path):
+    first, second = bot.WatchStore(db_path), bot.WatchStore(db_path)
+
+    async def scenario():
+        for n in range(5):
+            await first.add(1, video(f"video{n:06d}", 500), None)
+
+        now = time.time() + bot.Config.WATCH_MIN_INTERVAL
+        claimed_first = await first.due(now, 3)
+        claimed_second = await second.due(now, 3)
+        assert len(claimed_first) == 3
+        assert len(claimed_second) == 2
+        ids = {row[0] for row in claimed_first + claimed_second}
+        assert len(ids) == 5
+        assert await first.due(now, 10) == []
+        assert len(await second.due(now + bot.Config.WATCH_CLAIM_LEASE, 10)) == 5
+        assert first.watched == second.watched == 5
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        first.close()
+        second.close()
+
+
+def test_released_claim_is_due_again(db_path):
+    store = bot.WatchStore(db_path)
+
+    async def scenario():
+        await store.add(1, video("abcdefghijk", 500), None)
+        now = time.time() + bot.Config.WATCH_MIN_INTERVAL
+        [(video_id, _, checked_at, interval)] = await store.due(now, 10)
+
+        await store.release(video_id, checked_at + interval)
+        assert [row[0] for row in await store.due(now, 10)] == [video_id]
+
+    asyncio.run(scenario())
+    store.close()
+
+
+def test_failed_alert_is_retried_on_next_refresh(monkeypatch):
+    store = bot.WatchStore(":memory:")
+    monkeypatch.setattr(bot, "watch_store", store)
+    sent = []
+
+    class FlakyBot:
+        async def send_message(self, chat_id, text, **kwargs):
+            if chat_id == 2:
+                raise NetworkError("connection reset")
+            sent.append(chat_id)
+
+    async def scenario():
+        monkeypatch.setattr(bot, "send_queue", fast_queue())
+        await store.add(1, video("abcdefghijk", 500), None)
+        await store.add(2, video("abcdefghijk", 500), None)
+        stats = video("abcdefghijk", 1_500)
+        notified = await bot.notify_watchers(
+            FlakyBot(), stats, await store.watchers(stats.id)
+        )
+        await store.update(stats, time.time(), 600, notified)
+        return await store.watchers("abcdefghijk")
+
+    watchers = asyncio.run(scenario())
+    store.close()
+    assert sent == [1]
+    assert sorted(watchers) == [(1, None, 1_500), (2, None, 500)]
+
+
+def test_locked_database_does_not_block_event_loop(db_path):
+    store = bot.WatchStore(db_path)
+    # Another process holding the write lock
+    peer = sqlite3.connect(db_path, isolation_level=None)
+    peer.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        claim = asyncio.create_task(store.due(time.time(), 10))
+        start = time.perf_counter()
+        await asyncio.sleep(0.05)
+        assert time.perf_counter() - start < 0.5
+        assert not claim.done()
+        peer.execute("COMMIT")
+        assert await claim == []
+
+    asyncio.run(scenario())
+    peer.close()
+    store.close()
+
+
+def test_watch_alert_end_to_end(offline, monkeypatch):
+    fakes = offline
+
+    async def scenario():
+        fake_bot = await fakes.make_bot()
+        video_id = fakes.video_ids.new("standard")
+        url = f"https://youtu.be/{video_id}"
+        context = SimpleNamespace(bot=fake_bot, args=[url, "1"])
+        await bot.watch_command(fakes.make_update(fake_bot, 7, "/watch"), context)
+        assert "Pick a higher target" in fake_bot.request.last_text[7]
+
+        context.args = [url]
+        await bot.watch_command(fakes.make_update(fake_bot, 7, "/watch"), context)
+        assert bot.watch_store.watched == 1
+
+        # Pretend the video was at 0 views when watched and is now due
+        await bot.watch_store.update(
+            bot.VideoStats(id=video_id, view_count=0), 0, 0, [7]
+        )
+        await bot.refresh_watchlist(context)
+        await bot.send_queue.close()
+        return fake_bot.request.last_text[7]
+
+    assert "WATCHLIST ALERT" in asyncio.run(scenario())
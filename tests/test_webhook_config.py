@@ -0,0 +1,56 @@
+import pytest
+
+import YoutubeStats_bot as bot
+
+
+class FakeApp:
+    def __init__(self):
+        self.runs = []
+
+    def run_webhook(self, **kwargs):
+        self.runs.append(("webhook", kwargs))
+
+    def run_polling(self, **kwargs):
+        self.runs.append(("polling", kwargs))
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = FakeApp()
+    monkeypatch.setattr(bot, "build_application", lambda: app)
+    monkeypatch.setattr(bot.Config, "BOT_TOKEN", "123:token")
+    monkeypatch.setattr(bot.Config, "WEBHOOK_URL", "https://bot.example.com/hooks/")
+    monkeypatch.setattr(bot.Config, "WEBHOOK_SECRET_TOKEN", "s3cret")
+    return app
+
+
+def test_polling_is_the_default(app, monkeypatch):
+    monkeypatch.setattr(bot.Config, "BOT_MODE", "polling")
+    bot.main()
+    assert app.runs == [("polling", {})]
+
+
+def test_webhook_mode(app, monkeypatch):
+    monkeypatch.setattr(bot.Config, "BOT_MODE", "webhook")
+    bot.main()
+    [(mode, kwargs)] = app.runs
+    assert mode == "webhook"
+    assert kwargs["webhook_url"] == "https://bot.example.com/hooks/telegram"
+    assert kwargs["url_path"] == bot.Config.WEBHOOK_PATH
+    assert kwargs["secret_token"] == "s3cret"
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [
+        ("BOT_MODE", "webhooks"),
+        ("WEBHOOK_URL", ""),
+        ("WEBHOOK_SECRET_TOKEN", ""),
+        ("BOT_TOKEN", ""),
+    ],
+)
+def test_invalid_config_refuses_to_start(app, monkeypatch, setting, value):
+    monkeypatch.setattr(bot.Config, "BOT_MODE", "webhook")
+    monkeypatch.setattr(bot.Config, setting, value)
+    bot.main()
+    assert app.runs == []
@@ -0,0 +1,41 @@
+import threading
+
+import YoutubeStats_bot as bot
+
+
+def test_instances_are_reused_then_recycled(monkeypatch):
+    closed = []
+    monkeypatch.setattr(bot.yt_dlp.YoutubeDL, "close", lambda ydl: closed.append(ydl))
+    pool = bot.YoutubeDLPool(bot.STATS_YDL_OPTS, size=1, recycle_after=2)
+
+    with pool.checkout() as first:
+        assert bot.VIDEO_IE_KEY in first._ies_instances
+    with pool.checkout() as second:
+        pass
+    with pool.checkout() as third:
+        pass
+
+    assert second is first
+    assert third is not first
+    assert closed == [first]
+    pool.close()
+    assert closed == [first, third]
+
+
+def test_checkout_waits_when_every_instance_is_busy():
+    pool = bot.YoutubeDLPool(bot.STATS_YDL_OPTS, size=1)
+    borrowed = []
+
+    def borrow():
+        with pool.checkout() as ydl:
+            borrowed.append(ydl)
+
+    with pool.checkout() as held:
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+    waiter.join(1)
+
+    assert borrowed == [held]
+    pool.close()